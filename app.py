@@ -1,12 +1,12 @@
 import os
-from flask import Flask, request, jsonify
+import json
+import time
+from concurrent.futures import Future
+from functools import partial
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
-from transformers import MarianTokenizer, TFMarianMTModel
 from pymongo import MongoClient
-from datetime import datetime
 from dotenv import load_dotenv
-from datetime import datetime
-import pytz
 from flask_bcrypt import Bcrypt
 import jwt
 from routes.auth_routes import auth_routes 
@@ -16,6 +16,23 @@ from routes.history_routes import history_routes
 from routes.voice_routes import voice_routes
 from routes.language_routes import language_routes
 from routes.admin_routes import admin_routes
+from routes.translation_jobs_routes import translation_jobs_routes
+from services.decoding import (
+    DecodingPlan, build_profile_schedulers, choose_decoding, length_buckets_from_env, profiles_from_env,
+)
+from services.translation_cache import TieredTranslationCache, TranslationCache
+from services.translation_history import history_entry
+from services.translation_memory import TranslationMemory
+from services.admission import AdmissionController, Overloaded, RequestCancelled, client_disconnected
+from services.engines import load_engine, engine_options_from_env
+from services.cpu_threads import cpu_threads_from_env
+from services.metrics import TRANSLATE_STAGE_SECONDS, current_timings, metrics, start_timings, timed
+from services.model_registry import ModelRegistry, ModelUnavailable, ServedModel, registry_config_from_env
+from services.shared_cache import SharedTranslationCache
+from services.segmentation import segment_text
+from services.batching import stream_in_order
+from services.warmup import warmup_from_env
+from middlewares.auth_decorator import admin_required
 
 
 load_dotenv()
@@ -32,17 +49,281 @@ app.register_blueprint(history_routes)
 app.register_blueprint(voice_routes)
 app.register_blueprint(language_routes)
 app.register_blueprint(admin_routes)
+app.register_blueprint(translation_jobs_routes)
 #MongoDB setup
 mongo_uri = "mongodb://localhost:27017/"
-client = MongoClient(mongo_uri)
+# connect=False: no sockets or monitor threads until first use, so the
+# client is safe to create in the gunicorn master before workers fork
+client = MongoClient(mongo_uri, connect=False)
 db = client["somali_translator_db"]
 translations = db["translations"]
 users = db["users"] 
 
-#Load translation model
+#Load translation models
 model_dir = "./amiin_model"
-tokenizer = MarianTokenizer.from_pretrained(model_dir, local_files_only=True)
-model = TFMarianMTModel.from_pretrained(model_dir, local_files_only=True)
+engine_name = os.getenv("TRANSLATION_ENGINE", "tf")
+
+# Callers choose a decoding profile ("fast" greedy or "quality" beam search)
+decoding_profiles = profiles_from_env()
+default_decoding_profile = os.getenv("DECODING_PROFILE", "quality")
+
+def build_served_model(spec):
+    """
+    Engine, batch schedulers and warmup for one registry model.
+    Concurrent requests are grouped into micro-batches, one batch queue
+    per decoding profile and token-length bucket; long inputs are split
+    into sentences/clauses of at most max_segment_tokens.
+    """
+    model_engine = load_engine(spec.engine, spec.model_dir, **{**engine_options_from_env(spec.engine), **spec.options})
+    schedulers = build_profile_schedulers(
+        model_engine,
+        decoding_profiles,
+        length_buckets_from_env(),
+        max_batch_size=int(os.getenv("TRANSLATE_MAX_BATCH_SIZE", "16")),
+        batch_window_ms=float(os.getenv("TRANSLATE_BATCH_WINDOW_MS", "5")),
+    )
+    return ServedModel(
+        spec,
+        model_engine,
+        schedulers,
+        warmup=warmup_from_env(model_engine, schedulers.values()),
+        max_segment_tokens=min(int(os.getenv("TRANSLATE_MAX_SEGMENT_TOKENS", "256")), model_engine.max_length),
+    )
+
+# Models are declared in models.json (MODEL_REGISTRY_PATH); without it
+# ./amiin_model is the only one. Unpinned models load on first use and are
+# unloaded least recently used first when MODEL_MEMORY_BUDGET_MB is reached.
+model_specs, default_model_name, model_memory_budget_mb = registry_config_from_env(model_dir, engine_name)
+model_registry = ModelRegistry(model_specs, build_served_model, model_memory_budget_mb, default_model_name)
+
+# The default model, used when a request names none
+default_model = model_registry.get()
+engine = default_model.engine
+translation_schedulers = default_model.schedulers
+max_segment_tokens = default_model.max_segment_tokens
+
+# Pinned models go through every shape bucket with representative inputs
+# before the worker reports ready on /ready. Under gunicorn (see
+# gunicorn.conf.py) the master only prepares fork-safe state; every worker
+# loads and warms up the pinned models after fork.
+warmup = default_model.warmup
+
+# TensorFlow thread pools sized to this process's share of the cores, set
+# before the first model loads (per worker after fork under gunicorn)
+cpu_threads = cpu_threads_from_env(int(os.getenv("WEB_CONCURRENCY", "1")))
+uses_tensorflow = any(spec.engine == "tf" for spec in model_specs)
+if os.getenv("DEFER_MODEL_LOAD") != "1":
+    cpu_threads.apply(tensorflow=uses_tensorflow)
+    for served_model in model_registry.load_pinned():
+        served_model.warmup.start()
+
+# Repeated phrases are served from memory without touching the model
+model_version = default_model.fingerprint
+translation_cache = TranslationCache(
+    model_version,
+    max_bytes=int(float(os.getenv("TRANSLATION_CACHE_MAX_MB", "64")) * 1024 * 1024),
+)
+
+# Second cache level shared by all gunicorn workers and kept across restarts
+shared_cache_mb = float(os.getenv("TRANSLATION_SHARED_CACHE_MB", "256"))
+shared_translation_cache = None
+if shared_cache_mb > 0:
+    shared_translation_cache = SharedTranslationCache(
+        os.getenv("TRANSLATION_SHARED_CACHE_PATH", "./cache/translation_cache.bin"),
+        model_version,
+        max_bytes=int(shared_cache_mb * 1024 * 1024),
+    )
+translation_caches = TieredTranslationCache(translation_cache, shared_translation_cache)
+
+# Fuzzy matches against past translations (near-duplicate inputs). Off
+# unless enabled: every worker holds its own copy next to the model.
+TRANSLATION_MEMORY_ENABLED = os.getenv("TRANSLATION_MEMORY_ENABLED", "0") == "1"
+translation_memory = TranslationMemory(
+    max_entries=int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", "20000")) if TRANSLATION_MEMORY_ENABLED else 0,
+    threshold=float(os.getenv("TRANSLATION_MEMORY_THRESHOLD", "0.8")),
+)
+TRANSLATION_MEMORY_MODES = ("off", "suggest", "use")
+
+def load_translation_memory():
+    """
+    Index the most recent history of the default model in the background
+    (per worker under gunicorn)
+    """
+    translation_memory.start_loading(lambda: translations.find(
+        {"model": {"$in": [default_model.spec.name, None]}}, {"original_text": 1, "translated_text": 1}
+    ).sort("_id", -1).limit(translation_memory.max_entries))
+
+if os.getenv("DEFER_MODEL_LOAD") != "1":
+    load_translation_memory()
+
+def lookup_cached_translation(text):
+    """Return a translation from the local or shared cache, or None"""
+    return translation_caches.get(text)
+
+def store_cached_translation(text, translated_text):
+    translation_caches.put(text, translated_text)
+
+def default_decoding():
+    return DecodingPlan(decoding_profiles[default_decoding_profile])
+
+def cache_key(text, decoding, model=None):
+    # "quality" output of the default model keeps the plain text as key;
+    # other profiles and other models get their own entries
+    if decoding.profile.name != "quality":
+        text = f"\x00{decoding.profile.name}\x00{text}"
+    if model is not None and model is not default_model:
+        text = f"\x00{model.fingerprint}\x00{text}"
+    return text
+
+def submit_segments(texts, decoding=None, priority=False, model=None):
+    """
+    Start translating several texts and return one Future per text.
+    Cache hits come back as completed futures; all misses go to the
+    scheduler together (ahead of ordinary work with `priority`) and are
+    cached as they finish. Output generated under a latency-budget cap may
+    be cut short and is not cached.
+    """
+    decoding = decoding or default_decoding()
+    model = model or default_model
+    futures = []
+    for text in texts:
+        key = cache_key(text, decoding, model)
+        translated_text = lookup_cached_translation(key)
+        if translated_text is not None:
+            futures.append(completed_future(translated_text))
+        else:
+            futures.append(submit_uncached(text, key, decoding, priority, model))
+    return futures
+
+def submit_uncached(text, key, decoding, priority, model):
+    """Send a cache miss to the scheduler; it is cached under `key` when done (unless capped)"""
+    future = model.schedulers[decoding.profile.name].submit(text, decoding.max_new_tokens, priority)
+    if decoding.max_new_tokens is None:
+        future.add_done_callback(partial(_cache_finished_translation, key))
+    return future
+
+def completed_future(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+def _cache_finished_translation(key, future):
+    if not future.cancelled() and future.exception() is None:
+        store_cached_translation(key, future.result())
+
+def translate_texts(texts, decoding=None, ticket=None, model=None):
+    """
+    Translate several texts through sentence segmentation and the caches.
+    Only segments are cached: a text of several sentences is rebuilt from
+    its segments with its own whitespace, which the normalized cache keys
+    do not keep. A text is looked up whole first, so a cached
+    single-segment text never reaches the tokenizer. The uncached segments of all texts are submitted to the
+    scheduler together so they share padded batches. With an admission
+    `ticket` the work gets its priority, and is cancelled
+    (RequestCancelled) once its deadline passes or its client disconnects.
+    `model` is a registry model (the default model if None) that the
+    caller holds loaded.
+    """
+    decoding = decoding or default_decoding()
+    model = model or default_model
+    priority = ticket is not None and ticket.priority
+    pending = []
+    for text in texts:
+        key = cache_key(text.strip(), decoding, model)
+        with timed(TRANSLATE_STAGE_SECONDS, "cache"):
+            translated_text = lookup_cached_translation(key)
+        if translated_text is not None:
+            pending.append((None, [completed_future(translated_text)]))
+            continue
+        with timed(TRANSLATE_STAGE_SECONDS, "segment"):
+            segmented = segment_text(text, length_fn=model.engine.count_tokens, max_length=model.max_segment_tokens)
+        if len(segmented) > 1:
+            with timed(TRANSLATE_STAGE_SECONDS, "cache"):
+                futures = submit_segments(segmented.segments, decoding, priority, model)
+        else:
+            futures = [submit_uncached(text.strip(), key, decoding, priority, model)]
+        pending.append((segmented, futures))
+
+    # Queueing plus model time; the batches' own stages are merged below
+    with timed(TRANSLATE_STAGE_SECONDS, "inference"):
+        if ticket is not None:
+            ticket.wait([future for _, futures in pending for future in futures])
+        else:
+            for _, futures in pending:
+                for future in futures:
+                    future.result()
+    timings = current_timings()
+    if timings is not None:
+        for _, futures in pending:
+            for future in futures:
+                timings.merge_slowest(getattr(future, "stage_timings", {}))
+
+    results = []
+    for segmented, futures in pending:
+        translations = [future.result() for future in futures]
+        results.append(segmented.join(translations) if segmented is not None and len(segmented) > 1 else translations[0])
+    return results
+
+def translate_text(text, decoding=None, ticket=None, model=None):
+    """Translate one text, going through the caches and sentence segmentation"""
+    return translate_texts([text], decoding, ticket, model)[0]
+
+def resolve_decoding(data, texts, model=None):
+    """
+    Decoding plan for a request body with optional `profile` and
+    `latency_budget_ms`. The budget is checked against the longest text
+    (segments are translated in parallel, so that bounds the latency). A
+    max_new_tokens cap is rounded down to a bucket bound of the profile's
+    scheduler.
+    """
+    latency_budget_ms = data.get("latency_budget_ms")
+    input_tokens = 0
+    if latency_budget_ms is not None:
+        model = model or default_model
+        input_tokens = min(max(model.engine.count_tokens(text) for text in texts), model.max_segment_tokens)
+    decoding = choose_decoding(
+        decoding_profiles,
+        input_tokens,
+        requested=data.get("profile"),
+        latency_budget_ms=latency_budget_ms,
+        default=default_decoding_profile,
+    )
+    if decoding.max_new_tokens is not None:
+        # Report the cap the scheduler actually runs (a warmed bucket bound)
+        decoding.max_new_tokens = model.schedulers[decoding.profile.name].warmed_cap(decoding.max_new_tokens)
+    return decoding
+
+# Stage timers of the translate pipeline: always recorded in the
+# /metrics histograms, and returned as a Server-Timing header when the
+# request has an X-Debug-Timing header
+TIMED_ENDPOINTS = ("translate", "translate_batch")
+
+@app.before_request
+def start_request_timings():
+    g.request_started = time.perf_counter()
+    start_timings()
+
+@app.after_request
+def add_request_timings(response):
+    started = getattr(g, "request_started", None)
+    if started is None or request.endpoint not in TIMED_ENDPOINTS:
+        return response
+    total = time.perf_counter() - started
+    if request.endpoint == "translate":
+        TRANSLATE_STAGE_SECONDS.observe(total, "total")
+    timings = current_timings()
+    if request.headers.get("X-Debug-Timing") and timings is not None:
+        timings.add("total", total)
+        response.headers["Server-Timing"] = timings.server_timing()
+    return response
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Stage latency histograms of this worker in the Prometheus text format"""
+    token = os.getenv("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return jsonify({"error": "Invalid metrics token"}), 401
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
 @app.route("/")
 def home():
@@ -56,6 +337,134 @@ def voice_demo():
 def language_demo():
     return app.send_static_file('language-detection-demo.html')
 
+def get_request_user_id():
+    """Return the user_id of a valid Bearer token, or None for anonymous calls"""
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        try:
+            token = auth_header.split(' ')[1]
+            from middlewares.auth_decorator import decode_token
+            claims = decode_token(token)
+            return claims.get("user_id")
+        except:
+            pass  # Continue without user_id if token is invalid
+    return None
+
+def detect_input_language(input_text):
+    """Run Somali detection and return the language_detection block"""
+    from routes.language_detection import somali_detector
+    with timed(TRANSLATE_STAGE_SECONDS, "detect"):
+        language_detection = somali_detector.detect_text_language(input_text)
+    detected_language = language_detection['language']
+    return {
+        "detected_language": detected_language,
+        "language_confidence": language_detection['confidence'],
+        "detection_method": language_detection['method'],
+        "is_somali": detected_language == 'so'
+    }
+
+def is_translatable(language_detection):
+    return language_detection["detected_language"] == 'so' and language_detection["language_confidence"] >= 0.2
+
+def not_somali_body(language_detection):
+    return {
+        "error": "Qoraalka aad galisay ma aha afka Soomaaliga. Fadlan gali qoraal Soomaali ah.",
+        "language_detection": {**language_detection, "is_somali": False},
+    }
+
+def build_history_entry(input_text, translated_text, language_detection, user_id, model=None):
+    return history_entry(input_text, translated_text, language_detection, user_id, (model or default_model).spec.name)
+
+def save_translation(input_text, translated_text, language_detection, user_id, remember=True, model=None):
+    """
+    Store a translation in the history collection and return its id.
+    With `remember` it is also added to the translation memory (output cut
+    short by a latency budget is not); the memory only holds translations
+    of the default model.
+    """
+    model = model or default_model
+    new_entry = build_history_entry(input_text, translated_text, language_detection, user_id, model)
+    with timed(TRANSLATE_STAGE_SECONDS, "save"):
+        result = translations.insert_one(new_entry)
+    if remember and model is default_model:
+        translation_memory.add(input_text, translated_text, str(result.inserted_id))
+    return str(result.inserted_id)
+
+def resolve_translation_memory(data):
+    """
+    `translation_memory` option of /translate: "off" (default), "suggest"
+    (translate and also return the best match) or "use" (return the match
+    instead of running the model). `tm_threshold` overrides the minimum
+    similarity.
+    """
+    mode = data.get("translation_memory") or "off"
+    if mode not in TRANSLATION_MEMORY_MODES:
+        raise ValueError(f"translation_memory must be one of: {', '.join(TRANSLATION_MEMORY_MODES)}")
+    if mode != "off" and not translation_memory.enabled:
+        raise ValueError("translation memory is disabled on this server")
+    return mode, parse_similarity_threshold(data.get("tm_threshold"), "tm_threshold")
+
+def parse_similarity_threshold(value, field):
+    if value is None:
+        return None
+    value = float(value)
+    if not 0 < value <= 1:
+        raise ValueError(f"{field} must be between 0 and 1")
+    return value
+
+# Bounded queue in front of the schedulers: fast 503s instead of
+# requests piling up, and queued work dropped once nobody waits for it
+admission = AdmissionController(
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "32")),
+    anonymous_share=float(os.getenv("ADMISSION_ANONYMOUS_SHARE", "0.75")),
+    queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30")),
+    max_timeout=float(os.getenv("ADMISSION_MAX_TIMEOUT", "120")),
+)
+
+def request_timeout():
+    """Deadline requested with the X-Request-Timeout header (seconds), or None"""
+    value = request.headers.get("X-Request-Timeout")
+    if value is None:
+        return None
+    value = float(value)
+    if value <= 0:
+        raise ValueError("X-Request-Timeout must be a positive number of seconds")
+    return value
+
+def admit_request(count, user_id, timeout=None):
+    """Admission ticket for `count` texts; authenticated users get priority"""
+    return admission.admit(
+        count,
+        priority=user_id is not None,
+        timeout=timeout,
+        is_disconnected=partial(client_disconnected, request.environ),
+    )
+
+def overloaded_response(e):
+    response = jsonify({"error": "Translation service is busy, please retry later.", "retry_after": e.retry_after})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response
+
+def cancelled_message(e):
+    if e.reason == "deadline":
+        return "Request deadline passed before the translation finished."
+    return "Client closed the request."
+
+def cancelled_response(e):
+    # Nobody reads a 499; it marks dropped work in the access log
+    return jsonify({"error": cancelled_message(e)}), 504 if e.reason == "deadline" else 499
+
+def model_unavailable_response(e):
+    response = jsonify({"error": str(e)})
+    response.status_code = 503
+    response.headers["Retry-After"] = "5"
+    return response
+
+def needs_somali_input(model, language_detection):
+    """Only models translating from Somali reject non-Somali input"""
+    return model.spec.source == "so" and not is_translatable(language_detection)
+
 @app.route("/translate", methods=["POST"])
 def translate():
     data = request.get_json()
@@ -64,77 +473,335 @@ def translate():
     if not input_text.strip():
         return jsonify({"translation": "No input text provided."})
 
+    try:
+        model = model_registry.get(data.get("model"))
+        decoding = resolve_decoding(data, [input_text], model)
+        tm_mode, tm_threshold = resolve_translation_memory(data)
+        timeout = request_timeout()
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except ModelUnavailable as e:
+        return model_unavailable_response(e)
+
     # Check if user is authenticated
-    user_id = None
-    auth_header = request.headers.get('Authorization')
-    if auth_header and auth_header.startswith('Bearer '):
-        try:
-            token = auth_header.split(' ')[1]
-            from middlewares.auth_decorator import decode_token
-            claims = decode_token(token)
-            user_id = claims.get("user_id")
-        except:
-            pass  # Continue without user_id if token is invalid
+    user_id = get_request_user_id()
+
+    try:
+        ticket = admit_request(1, user_id, timeout)
+    except Overloaded as e:
+        return overloaded_response(e)
 
     try:
         # Detect language of input text
-        from routes.language_detection import somali_detector
-        language_detection = somali_detector.detect_text_language(input_text)
-        detected_language = language_detection['language']
-        language_confidence = language_detection['confidence']
-        detection_method = language_detection['method']
+        language_detection = detect_input_language(input_text)
 
         # Check if the text is Somali - if not, return error message
-        if detected_language != 'so' or language_confidence < 0.2:
-            return jsonify({
-                "error": "Qoraalka aad galisay ma aha afka Soomaaliga. Fadlan gali qoraal Soomaali ah.",
-                "language_detection": {
-                    "detected_language": detected_language,
-                    "language_confidence": language_confidence,
-                    "detection_method": detection_method,
-                    "is_somali": False
-                },
-            })
+        if needs_somali_input(model, language_detection):
+            return jsonify(not_somali_body(language_detection))
 
-        inputs = tokenizer(input_text, return_tensors="tf", padding=True, truncation=True)
-        outputs = model.generate(**inputs)
-        translated_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
+        # The translation memory holds translations of the default model
+        tm_match = None
+        if tm_mode != "off" and model is default_model:
+            with timed(TRANSLATE_STAGE_SECONDS, "translation_memory"):
+                matches = translation_memory.lookup(input_text, threshold=tm_threshold)
+            tm_match = matches[0] if matches else None
 
-        # Define Somalia timezone
-        somalia_tz = pytz.timezone('Africa/Mogadishu')
+        if tm_mode == "use" and tm_match is not None:
+            translated_text = tm_match["translated_text"]
+        else:
+            with model_registry.use(model.spec.name):
+                translated_text = translate_text(input_text, decoding, ticket, model)
 
         # Save to MongoDB
-        new_entry = {
-            "original_text": input_text,
+        translation_id = save_translation(
+            input_text, translated_text, language_detection, user_id,
+            remember=decoding.max_new_tokens is None, model=model,
+        )
+
+        body = {
             "translated_text": translated_text,
-            "timestamp": datetime.now(somalia_tz).isoformat(),
-            "is_favorite": False,
-            "detected_language": detected_language,
-            "language_confidence": language_confidence,
-            "detection_method": detection_method
+            "id": translation_id,  # Return MongoDB document ID
+            "language_detection": language_detection,
+            "decoding": decoding.to_dict(),
+            "model": model.spec.name
         }
-        
-        # Add user_id if authenticated
-        if user_id:
-            from bson import ObjectId
-            new_entry["user_id"] = ObjectId(user_id)
-            
-        result = translations.insert_one(new_entry)
-        new_entry["_id"] = str(result.inserted_id)
+        if tm_mode != "off":
+            body["translation_memory"] = (
+                {**tm_match, "used": tm_mode == "use"} if tm_match is not None else None
+            )
+        return jsonify(body)
+
+    except RequestCancelled as e:
+        ticket.release(completed=False)
+        return cancelled_response(e)
+    except ModelUnavailable as e:
+        ticket.release(completed=False)
+        return model_unavailable_response(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        ticket.release()
+
+MAX_BATCH_TEXTS = int(os.getenv("TRANSLATE_BATCH_MAX_TEXTS", "500"))
+
+@app.route("/translate/batch", methods=["POST"])
+def translate_batch():
+    """
+    Translate a list of texts in one request.
+    Results (or per-item errors) come back in input order, and all history
+    rows are written with a single insert_many.
+    """
+    data = request.get_json() or {}
+    texts = data.get("texts")
+
+    if not isinstance(texts, list) or not texts:
+        return jsonify({"error": "Provide a non-empty 'texts' list"}), 400
+    if len(texts) > MAX_BATCH_TEXTS:
+        return jsonify({"error": f"At most {MAX_BATCH_TEXTS} texts per batch"}), 413
+
+    try:
+        model = model_registry.get(data.get("model"))
+        decoding = resolve_decoding(data, [text for text in texts if isinstance(text, str) and text.strip()] or [""], model)
+        timeout = request_timeout()
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except ModelUnavailable as e:
+        return model_unavailable_response(e)
+
+    user_id = get_request_user_id()
+
+    try:
+        ticket = admit_request(len(texts), user_id, timeout)
+    except Overloaded as e:
+        return overloaded_response(e)
+
+    try:
+        results = [None] * len(texts)
+        somali_indexes = []
+        for i, text in enumerate(texts):
+            if not isinstance(text, str) or not text.strip():
+                results[i] = {"index": i, "error": "No input text provided."}
+                continue
+            language_detection = detect_input_language(text)
+            if needs_somali_input(model, language_detection):
+                results[i] = {"index": i, **not_somali_body(language_detection)}
+                continue
+            results[i] = {"index": i, "language_detection": language_detection}
+            somali_indexes.append(i)
+
+        translated = []
+        if somali_indexes:
+            with model_registry.use(model.spec.name):
+                translated = translate_texts([texts[i] for i in somali_indexes], decoding, ticket, model)
+
+        entries = []
+        for i, translated_text in zip(somali_indexes, translated):
+            results[i]["translated_text"] = translated_text
+            entries.append(build_history_entry(texts[i], translated_text, results[i]["language_detection"], user_id, model))
+
+        if entries:
+            with timed(TRANSLATE_STAGE_SECONDS, "save"):
+                inserted = translations.insert_many(entries, ordered=True)
+            for i, inserted_id in zip(somali_indexes, inserted.inserted_ids):
+                results[i]["id"] = str(inserted_id)
+                if decoding.max_new_tokens is None and model is default_model:
+                    translation_memory.add(texts[i], results[i]["translated_text"], str(inserted_id))
 
         return jsonify({
-            "translated_text": translated_text,
-            "id": str(result.inserted_id),  # Return MongoDB document ID
-            "language_detection": {
-                "detected_language": detected_language,
-                "language_confidence": language_confidence,
-                "detection_method": detection_method,
-                "is_somali": detected_language == 'so'
-            }
+            "results": results,
+            "total": len(texts),
+            "translated": len(somali_indexes),
+            "failed": len(texts) - len(somali_indexes),
+            "decoding": decoding.to_dict(),
+            "model": model.spec.name
         })
 
+    except RequestCancelled as e:
+        ticket.release(completed=False)
+        return cancelled_response(e)
+    except ModelUnavailable as e:
+        ticket.release(completed=False)
+        return model_unavailable_response(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    finally:
+        ticket.release()
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route("/translate/stream", methods=["POST"])
+def translate_stream():
+    """
+    Server-Sent Events variant of /translate: one `segment` event per
+    translated sentence, in order, then a `done` event with the history id
+    and the language_detection block.
+    """
+    data = request.get_json() or {}
+    input_text = data.get("text", "")
+
+    if not input_text.strip():
+        return jsonify({"error": "No input text provided."}), 400
+
+    try:
+        model = model_registry.get(data.get("model"))
+        decoding = resolve_decoding(data, [input_text], model)
+        timeout = request_timeout()
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except ModelUnavailable as e:
+        return model_unavailable_response(e)
+
+    user_id = get_request_user_id()
+
+    try:
+        language_detection = detect_input_language(input_text)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    if needs_somali_input(model, language_detection):
+        return jsonify(not_somali_body(language_detection))
+
+    try:
+        ticket = admit_request(1, user_id, timeout)
+    except Overloaded as e:
+        return overloaded_response(e)
+
+    def generate():
+        futures = []
+        acquired = False
+        try:
+            model_registry.acquire(model.spec.name)
+            acquired = True
+            parts = []
+            # A cached text is sent as one segment without segmenting it
+            cached = lookup_cached_translation(cache_key(input_text.strip(), decoding, model))
+            if cached is not None:
+                parts.append(cached)
+                yield sse_event("segment", {"index": 0, "total": 1, "text": cached})
+            else:
+                segmented = segment_text(input_text, length_fn=model.engine.count_tokens, max_length=model.max_segment_tokens)
+                submit = partial(submit_segments, decoding=decoding, priority=ticket.priority, model=model)
+                for index, translation in enumerate(stream_in_order(submit, segmented.segments, ticket.wait, futures)):
+                    part = segmented.render(index, translation)
+                    parts.append(part)
+                    yield sse_event("segment", {"index": index, "total": len(segmented.segments), "text": part})
+
+            translated_text = "".join(parts).strip()
+            translation_id = save_translation(
+                input_text, translated_text, language_detection, user_id,
+                remember=decoding.max_new_tokens is None, model=model,
+            )
+            yield sse_event("done", {
+                "translated_text": translated_text,
+                "id": translation_id,
+                "language_detection": language_detection,
+                "decoding": decoding.to_dict(),
+                "model": model.spec.name
+            })
+        except RequestCancelled as e:
+            for future in futures:
+                future.cancel()
+            ticket.release(completed=False)
+            yield sse_event("error", {"error": cancelled_message(e)})
+        except ModelUnavailable as e:
+            ticket.release(completed=False)
+            yield sse_event("error", {"error": str(e)})
+        except GeneratorExit:
+            # The client went away between two events
+            for future in futures:
+                future.cancel()
+            ticket.release(completed=False)
+            raise
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+        finally:
+            if acquired:
+                model_registry.release(model)
+            ticket.release()
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Frees the slots even if the stream is closed before it starts
+    response.call_on_close(ticket.release)
+    return response
+
+@app.route("/translate/cache/stats", methods=["GET"])
+@admin_required
+def translation_cache_stats():
+    from routes.language_detection import somali_detector
+    return jsonify({
+        "local": translation_cache.stats(),
+        "shared": shared_translation_cache.stats() if shared_translation_cache else {"enabled": False},
+        "translation_memory": translation_memory.stats(),
+        "admission": admission.stats(),
+        "models": model_registry.stats(),
+        "google_detect": somali_detector.google_detect.stats(),
+    })
+
+@app.route("/translate/models", methods=["GET"])
+def translation_models():
+    """Models that can be passed as `model` to the translate routes"""
+    return jsonify(model_registry.stats())
+
+MAX_TM_MATCHES = 20
+
+@app.route("/translation-memory/lookup", methods=["POST"])
+def translation_memory_lookup():
+    """Past translations similar to `text`, best first"""
+    if not translation_memory.enabled:
+        return jsonify({"error": "Translation memory is disabled on this server."}), 503
+    data = request.get_json() or {}
+    text = data.get("text", "")
+    if not isinstance(text, str) or not text.strip():
+        return jsonify({"error": "No input text provided."}), 400
+
+    try:
+        threshold = parse_similarity_threshold(data.get("threshold"), "threshold")
+        limit = int(data.get("limit", 5))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    if not 1 <= limit <= MAX_TM_MATCHES:
+        return jsonify({"error": f"limit must be between 1 and {MAX_TM_MATCHES}"}), 400
+
+    matches = translation_memory.lookup(text, threshold=threshold, limit=limit)
+    return jsonify({
+        "matches": matches,
+        "threshold": translation_memory.threshold if threshold is None else threshold,
+        "entries": len(translation_memory),
+    })
+
+@app.route("/ready", methods=["GET"])
+def ready():
+    """
+    Readiness probe: 503 until every pinned model is loaded and warmed up
+    in this worker. The top-level warmup fields are the default model's.
+    """
+    models = {
+        served.spec.name: {"loaded": served.engine.loaded, **served.warmup.status()}
+        for served in model_registry.pinned_models()
+    }
+    body = {**warmup.status(), "models": models}
+    if all(status["loaded"] and status["ready"] for status in models.values()):
+        return jsonify({"status": "ready", **body})
+    failed = any(
+        status["total"] and status["completed"] == status["total"] and not status["ready"]
+        for status in models.values()
+    )
+    return jsonify({"status": "failed" if failed else "warming_up", **body}), 503
+
+@app.route("/translate/pool/stats", methods=["GET"])
+@admin_required
+def inference_pool_stats():
+    if engine.name != "remote":
+        return jsonify({"enabled": False, "engine": engine.name})
+    try:
+        return jsonify({"enabled": True, **engine.client.stats()})
+    except Exception as e:
+        return jsonify({"enabled": True, "error": str(e)}), 503
 
 # Legacy endpoints for backward compatibility (public access)
 @app.route("/history", methods=["GET"])
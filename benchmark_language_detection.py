@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark the scoring stages of SomaliLanguageDetector against the
+original list/regex implementation, and check that both give identical
+results.
+
+The reference implementation below is the scoring code before the
+detector was rebuilt on precompiled structures (list membership, one
+startswith/endswith per affix, one re.search per grammar marker). The
+Google Translate fallback is disabled so no network calls are timed.
+
+Usage:
+    python benchmark_language_detection.py
+    python benchmark_language_detection.py --test-set data/somali_corpus.txt --repeat 20
+    python benchmark_language_detection.py --extra-affixes 20000
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from langdetect import detect
+from routes.language_detection import SomaliLanguageDetector, somali_detector
+from services.ngram_classifier import NgramClassifier
+
+ENGLISH_TEXTS = [
+    "Hello, how are you?",
+    "I am here today",
+    "The meeting was moved to next Tuesday afternoon.",
+    "Please send the report before the end of the week.",
+    "Thank you for your help with the translation.",
+]
+
+
+def reference_pattern_ratio(detector, text):
+    """Pattern-matching ratio as computed before (None without words)"""
+    somali_word_count = 0
+    total_words = len(text.split())
+    if total_words == 0:
+        return None
+    for word in text.split():
+        clean_word = re.sub(r'[^\w\s]', '', word)
+        if clean_word in detector.somali_patterns['common_words']:
+            somali_word_count += 1
+        elif any(clean_word.startswith(prefix) for prefix in detector.somali_patterns['common_prefixes']):
+            somali_word_count += 0.5
+        elif any(clean_word.endswith(suffix) for suffix in detector.somali_patterns['common_suffixes']):
+            somali_word_count += 0.3
+    return somali_word_count / total_words
+
+
+def reference_characteristics(detector, text):
+    """_analyze_somali_characteristics as computed before"""
+    if not text:
+        return 0.0
+    somali_indicators = 0
+    total_indicators = 0
+    for phrase in detector.somali_phrases:
+        if phrase in text.lower():
+            somali_indicators += 1
+        total_indicators += 1
+    somali_patterns = [
+        r'\bwaa\b', r'\bwaxaa\b', r'\bwaxay\b', r'\bwaxuu\b',
+        r'\bku\b', r'\bka\b', r'\bla\b', r'\bsi\b', r'\boo\b',
+        r'\biyo\b', r'\bama\b', r'\bhadday\b', r'\bhaddii\b'
+    ]
+    for pattern in somali_patterns:
+        if re.search(pattern, text.lower()):
+            somali_indicators += 1
+        total_indicators += 1
+    if 'waa' in text.lower() and ('ku' in text.lower() or 'ka' in text.lower()):
+        somali_indicators += 2
+        total_indicators += 2
+    if total_indicators == 0:
+        return 0.0
+    return somali_indicators / total_indicators
+
+
+def time_per_text(fn, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - start) / (repeat * len(texts)) * 1e6
+
+
+def synthetic_affixes(count, seed=0):
+    """`count` random 2-6 letter affixes, standing in for a large lexicon file"""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnoqrstuwxy"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(2, 6))) for _ in range(count)]
+
+
+class NoNetworkTranslator:
+    def detect(self, text):
+        raise RuntimeError("network disabled for the benchmark")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Speed of the Somali detector's scoring stages")
+    parser.add_argument("--test-set", default=os.path.join("data", "somali_corpus.txt"))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--extra-affixes", type=int, default=5000,
+                        help="Prefixes and suffixes added for the large-lexicon comparison")
+    args = parser.parse_args()
+
+    with open(args.test_set, encoding="utf-8") as f:
+        texts = [line.strip().lower() for line in f if line.strip()]
+    texts += [text.lower() for text in ENGLISH_TEXTS]
+    somali_detector.translator = NoNetworkTranslator()
+
+    mismatches = [
+        text for text in texts
+        if reference_pattern_ratio(somali_detector, text) != somali_detector._pattern_ratio(text.split())
+        or reference_characteristics(somali_detector, text) != somali_detector._analyze_somali_characteristics(text)
+    ]
+    if mismatches:
+        print(f"Results differ for {len(mismatches)} texts, e.g. {mismatches[0]!r}")
+        sys.exit(1)
+
+    stages = [
+        ("pattern matching", lambda t: reference_pattern_ratio(somali_detector, t),
+         lambda t: somali_detector._pattern_ratio(t.split())),
+        ("characteristics", lambda t: reference_characteristics(somali_detector, t),
+         somali_detector._analyze_somali_characteristics),
+    ]
+    print(f"{len(texts)} texts, identical results\n")
+    print(f"{'stage':<20}{'before us':>11}{'after us':>10}{'speedup':>9}")
+    for name, before, after in stages:
+        before_us = time_per_text(before, texts, args.repeat)
+        after_us = time_per_text(after, texts, args.repeat)
+        print(f"{name:<20}{before_us:>11.2f}{after_us:>10.2f}{before_us / after_us:>8.1f}x")
+
+    # A large affix lexicon: the tries keep pattern matching flat
+    large = SomaliLanguageDetector(lexicon_path="")
+    large.translator = NoNetworkTranslator()
+    large.somali_patterns['common_prefixes'].extend(synthetic_affixes(args.extra_affixes, seed=1))
+    large.somali_patterns['common_suffixes'].extend(synthetic_affixes(args.extra_affixes, seed=2))
+    large._compile_patterns()
+    before_us = time_per_text(lambda t: reference_pattern_ratio(large, t), texts, max(1, args.repeat // 10))
+    after_us = time_per_text(lambda t: large._pattern_ratio(t.split()), texts, args.repeat)
+    print(f"{'+' + str(args.extra_affixes) + ' affixes':<20}{before_us:>11.2f}{after_us:>10.2f}{before_us / after_us:>8.1f}x")
+
+    # Method 1: langdetect against the local n-gram classifier
+    classifier = NgramClassifier.load()
+    detect(texts[0])  # load the language profiles before timing
+    before_us = time_per_text(detect, texts, max(1, args.repeat // 10))
+    after_us = time_per_text(classifier.probability, texts, args.repeat)
+    print(f"{'langdetect -> ngram':<20}{before_us:>11.2f}{after_us:>10.2f}{before_us / after_us:>8.1f}x")
+    batch_us = time_per_text(classifier.scores, [texts], args.repeat) / len(texts)
+    print(f"ngram classifier, whole list in one scores() call: {batch_us:.2f} us per text")
+
+    # The whole detector, langdetect included, for scale
+    full_us = time_per_text(somali_detector.detect_text_language, texts, max(1, args.repeat // 10))
+    print(f"\ndetect_text_language (langdetect included): {full_us:.1f} us per text")
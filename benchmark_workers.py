@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Sweep gunicorn worker counts x TensorFlow intra-op thread counts and
+report /translate throughput (requests/sec) and latency (p50/p99).
+
+Every combination starts its own gunicorn server (gunicorn.conf.py, so
+models load and warm up per worker) and is measured only after every
+worker finished its warmup. Caches, the translation memory and admission
+control are switched off so every request runs the model. Load comes from
+`--concurrency` keep-alive clients posting Somali sentences from the test
+set for `--duration` seconds.
+
+/translate writes to history, so MongoDB must be running.
+
+Usage:
+    python benchmark_workers.py --workers 1,2,4 --threads 1,2,4 --output benchmark_workers.json
+    python benchmark_workers.py --workers 2,4 --threads 2 --affinity
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+WARMUP_DONE = re.compile(r"Worker (\d+): .*warmup done")
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def start_server(workers, threads, port, affinity):
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "TF_INTRA_OP_THREADS": str(threads),
+        "CPU_AFFINITY": "1" if affinity else "0",
+        "TRANSLATION_CACHE_MAX_MB": "0",
+        "TRANSLATION_SHARED_CACHE_MB": "0",
+        "TRANSLATION_MEMORY_MAX_ENTRIES": "0",
+        "ADMISSION_MAX_QUEUE": "0",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app:app", "--bind", f"127.0.0.1:{port}", "--workers", str(workers)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    warmed = set()
+    all_warm = threading.Event()
+
+    def read_log():
+        for line in process.stderr:
+            match = WARMUP_DONE.search(line)
+            if match:
+                warmed.add(match.group(1))
+                if len(warmed) >= workers:
+                    all_warm.set()
+        # The server exited: stop waiting (the caller sees poll() set)
+        process.wait()
+        all_warm.set()
+
+    threading.Thread(target=read_log, daemon=True).start()
+    return process, all_warm
+
+
+def stop_server(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def run_load(port, texts, concurrency, duration, profile):
+    """Post texts from `concurrency` clients for `duration` seconds"""
+    next_text = itertools.cycle(texts).__next__
+    text_lock = threading.Lock()
+    latencies = []
+    errors = []
+    deadline = time.monotonic() + duration
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        while time.monotonic() < deadline:
+            with text_lock:
+                text = next_text()
+            body = {"text": text}
+            if profile:
+                body["profile"] = profile
+            start = time.perf_counter()
+            try:
+                conn.request("POST", "/translate", json.dumps(body).encode("utf-8"), {"Content-Type": "application/json"})
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException) as e:
+                errors.append(str(e))
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+                continue
+            if status == 200:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors.append(f"HTTP {status}")
+        conn.close()
+
+    started = time.monotonic()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    if not latencies:
+        return {"error": errors[0] if errors else "no requests completed"}
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_second": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.5), 1),
+            "p99": round(percentile(latencies, 0.99), 1),
+        },
+    }
+
+
+def print_table(results):
+    header = f"{'workers':>8}{'threads':>9}{'req/s':>9}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        prefix = f"{result['workers']:>8}{result['threads']:>9}"
+        if "error" in result:
+            print(f"{prefix}  skipped: {result['error']}")
+            continue
+        print(f"{prefix}{result['requests_per_second']:>9.2f}{result['latency_ms']['p50']:>10.1f}"
+              f"{result['latency_ms']['p99']:>10.1f}{result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput and p99 of /translate per workers x threads")
+    parser.add_argument("--workers", default="1,2,4", help="Gunicorn worker counts")
+    parser.add_argument("--threads", default="1,2,4", help="TF intra-op threads per worker")
+    parser.add_argument("--affinity", action="store_true", help="Pin every worker to its own cores (CPU_AFFINITY=1)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load per combination")
+    parser.add_argument("--profile", default=None, help="Decoding profile sent with every request")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--startup-timeout", type=float, default=600, help="Seconds to wait for every worker's warmup")
+    parser.add_argument("--test-set", default=os.path.join("data", "somali_corpus.txt"))
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    with open(args.test_set, encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+
+    results = []
+    for workers in [int(value) for value in args.workers.split(",") if value.strip()]:
+        for threads in [int(value) for value in args.threads.split(",") if value.strip()]:
+            print(f"Running {workers} workers x {threads} threads...", flush=True)
+            process, all_warm = start_server(workers, threads, args.port, args.affinity)
+            try:
+                if not all_warm.wait(args.startup_timeout) or process.poll() is not None:
+                    result = {"error": "server did not become ready"}
+                else:
+                    result = run_load(args.port, texts, args.concurrency, args.duration, args.profile)
+            finally:
+                stop_server(process)
+            results.append({"workers": workers, "threads": threads, **result})
+
+    print()
+    print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"affinity": args.affinity, "concurrency": args.concurrency, "duration": args.duration,
+                       "profile": args.profile, "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Export ./amiin_model to an int8-quantized CTranslate2 model.
+
+The CTranslate2 converter reads PyTorch checkpoints, so the TF weights are
+first converted to a temporary PyTorch copy of the model.
+
+Usage:
+    pip install ctranslate2 torch
+    python export_ctranslate2_model.py --model-dir ./amiin_model --output-dir ./amiin_model_ct2
+
+Serve it with:
+    TRANSLATION_ENGINE=ctranslate2 CT2_MODEL_DIR=./amiin_model_ct2 gunicorn app:app
+"""
+
+import argparse
+import tempfile
+
+
+def export_model(model_dir, output_dir, quantization="int8"):
+    import ctranslate2
+    from transformers import MarianMTModel, MarianTokenizer
+
+    with tempfile.TemporaryDirectory() as pytorch_dir:
+        print(f"Converting TF weights in {model_dir} to PyTorch...")
+        model = MarianMTModel.from_pretrained(model_dir, from_tf=True, local_files_only=True)
+        tokenizer = MarianTokenizer.from_pretrained(model_dir, local_files_only=True)
+        model.save_pretrained(pytorch_dir)
+        tokenizer.save_pretrained(pytorch_dir)
+
+        print(f"Exporting CTranslate2 model ({quantization}) to {output_dir}...")
+        converter = ctranslate2.converters.TransformersConverter(pytorch_dir)
+        converter.convert(output_dir, quantization=quantization, force=True)
+
+    print("✅ Export finished")
+    return output_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the Marian model to CTranslate2")
+    parser.add_argument("--model-dir", default="./amiin_model")
+    parser.add_argument("--output-dir", default="./amiin_model_ct2")
+    parser.add_argument("--quantization", default="int8", choices=["int8", "int8_float32", "int16", "float16", "float32"])
+    args = parser.parse_args()
+    export_model(args.model_dir, args.output_dir, args.quantization)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Export the weights of ./amiin_model to a memory-mappable format.
+
+The TF engine maps amiin_model/mmap_weights/weights.bin with np.memmap
+instead of parsing tf_model.h5, so workers load faster and all of them read
+the weight data from the same page-cache pages.
+
+With --quantize the float weights are stored as float16 or int8 (per
+channel scales) in <model-dir>/mmap_weights_<scheme>. Point
+TF_MMAP_WEIGHTS_DIR at that directory to serve them, and compare against
+float32 with quantization_report.py first.
+
+Usage:
+    python export_mmap_weights.py --model-dir ./amiin_model
+    python export_mmap_weights.py --model-dir ./amiin_model --quantize int8
+"""
+
+import argparse
+import os
+
+from services.model_weights import QUANTIZATION_SCHEMES, export_mmap_weights
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export model weights for memory mapping")
+    parser.add_argument("--model-dir", default="./amiin_model")
+    parser.add_argument("--output-dir", default=None,
+                        help="Defaults to <model-dir>/mmap_weights (or mmap_weights_<scheme> with --quantize)")
+    parser.add_argument("--quantize", choices=QUANTIZATION_SCHEMES, default=None,
+                        help="Store float weights as float16 or int8")
+    args = parser.parse_args()
+
+    from transformers import TFMarianMTModel
+
+    default_name = f"mmap_weights_{args.quantize}" if args.quantize else "mmap_weights"
+    output_dir = args.output_dir or os.path.join(args.model_dir, default_name)
+    print(f"Loading {args.model_dir}...")
+    model = TFMarianMTModel.from_pretrained(args.model_dir, local_files_only=True)
+    export_mmap_weights(model, output_dir, quantization=args.quantize)
+    size_mb = os.path.getsize(os.path.join(output_dir, "weights.bin")) / (1024 * 1024)
+    print(f"✅ Weights exported to {output_dir} ({size_mb:.1f} MB)")
@@ -0,0 +1,47 @@
+import itertools
+import os
+
+# Gunicorn picks this file up automatically from the working directory.
+# Workers default to WEB_CONCURRENCY / 1 and bind defaults to $PORT.
+
+# More threads than admission slots (ADMISSION_MAX_QUEUE): excess requests
+# must reach the app to get a fast 503 instead of waiting for a free thread
+threads = int(os.getenv("GUNICORN_THREADS", "64"))
+
+# Import the app once in the master so every worker shares the tokenizer
+# and the rest of the module state copy-on-write, and rolling restarts only
+# pay for model materialization. Model weights are not shared: each worker
+# loads its own copy in post_fork (TensorFlow copies even mmap'd weights
+# into its variables); the inference pool keeps the copies out of the web
+# workers.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# TensorFlow and CTranslate2 start thread pools that do not survive fork,
+# so the master must not create the runtime model itself.
+os.environ.setdefault("DEFER_MODEL_LOAD", "1")
+
+
+def pre_fork(server, worker):
+    # Every live worker keeps a slot; a replacement worker takes the freed
+    # one, so with CPU_AFFINITY=1 workers never end up sharing cores
+    taken = {getattr(live, "cpu_slot", None) for live in server.WORKERS.values()}
+    worker.cpu_slot = next(slot for slot in itertools.count() if slot not in taken)
+
+
+def post_fork(server, worker):
+    import app
+
+    # Thread pools and CPU placement must be set before TensorFlow starts
+    plan = app.cpu_threads.apply(worker.cpu_slot, server.num_workers, tensorflow=app.uses_tensorflow)
+    server.log.info(f"Worker {worker.pid}: CPU plan {plan}")
+    pinned = app.model_registry.load_pinned()
+    app.load_translation_memory()
+    server.log.info(f"Worker {worker.pid}: translation models loaded "
+                    f"({', '.join(f'{m.spec.name}:{m.engine.name}' for m in pinned)})")
+    # The worker only starts accepting requests after post_fork returns, so
+    # a warming worker never serves the slow first calls. Heartbeats after
+    # every batch keep the arbiter from timing the worker out meanwhile.
+    # Unpinned models load and compile on their first request.
+    for served_model in pinned:
+        served_model.warmup.run(progress=worker.notify)
+        server.log.info(f"Worker {worker.pid}: {served_model.spec.name} warmup done ({served_model.warmup.status()})")
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Run the dedicated inference worker pool.
+
+The pool owns the translation model; web workers started with
+TRANSLATION_ENGINE=remote send their batches here over a Unix socket.
+
+Usage:
+    INFERENCE_POOL_SIZE=2 python inference_server.py
+    TRANSLATION_ENGINE=remote gunicorn app:app
+"""
+
+import os
+from dotenv import load_dotenv
+
+from services.cpu_threads import cpu_threads_from_env
+from services.engines import engine_options_from_env
+from services.inference_pool import DEFAULT_SOCKET_PATH, InferenceServer
+
+load_dotenv()
+
+if __name__ == "__main__":
+    engine_name = os.getenv("INFERENCE_ENGINE", "tf")
+    pool_size = int(os.getenv("INFERENCE_POOL_SIZE", "1"))
+    server = InferenceServer(
+        os.getenv("INFERENCE_SOCKET", DEFAULT_SOCKET_PATH),
+        pool_size=pool_size,
+        engine_name=engine_name,
+        model_dir=os.getenv("MODEL_DIR", "./amiin_model"),
+        engine_options=engine_options_from_env(engine_name),
+        max_batch_size=int(os.getenv("TRANSLATE_MAX_BATCH_SIZE", "16")),
+        batch_window_ms=float(os.getenv("TRANSLATE_BATCH_WINDOW_MS", "5")),
+        cpu_threads=cpu_threads_from_env(pool_size),
+    )
+    server.serve_forever()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Background worker for bulk translation jobs (POST /translate/jobs).
+
+Runs outside the web workers so bulk documents never take interactive
+/translate capacity. Start as many as needed; they share the
+translation_jobs collection safely.
+
+Usage:
+    python job_worker.py
+    TRANSLATION_ENGINE=remote python job_worker.py   # use the inference pool
+"""
+
+import os
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from routes.language_detection import somali_detector
+from services.decoding import build_profile_schedulers, length_buckets_from_env, profiles_from_env
+from services.engines import engine_options_from_env, load_engine
+from services.model_registry import registry_config_from_env
+from services.shared_cache import SharedTranslationCache
+from services.translation_cache import TieredTranslationCache, TranslationCache
+from services.translation_jobs import TranslationJobWorker
+
+load_dotenv()
+
+if __name__ == "__main__":
+    client = MongoClient("mongodb://localhost:27017/")
+    db = client["somali_translator_db"]
+    jobs = db["translation_jobs"]
+    jobs.create_index([("status", 1), ("created_at", 1)])
+
+    engine_name = os.getenv("TRANSLATION_ENGINE", "tf")
+    model_dir = os.getenv("MODEL_DIR", "./amiin_model")
+    engine = load_engine(engine_name, model_dir, **engine_options_from_env(engine_name))
+    engine.load()
+
+    # The same caches as the web workers (their "quality" entries of the
+    # default model), when started with the same engine settings
+    fingerprint = engine.fingerprint
+    cache = TranslationCache(fingerprint, max_bytes=int(float(os.getenv("TRANSLATION_CACHE_MAX_MB", "64")) * 1024 * 1024))
+    shared_cache = None
+    shared_cache_mb = float(os.getenv("TRANSLATION_SHARED_CACHE_MB", "256"))
+    if shared_cache_mb > 0:
+        shared_cache = SharedTranslationCache(
+            os.getenv("TRANSLATION_SHARED_CACHE_PATH", "./cache/translation_cache.bin"),
+            fingerprint,
+            max_bytes=int(shared_cache_mb * 1024 * 1024),
+        )
+
+    # Batched like the web workers' "quality" requests: the same batch size,
+    # length buckets and generation bounds as the cache entries they share
+    quality_scheduler = build_profile_schedulers(
+        engine,
+        {"quality": profiles_from_env()["quality"]},
+        length_buckets_from_env(),
+        max_batch_size=int(os.getenv("TRANSLATE_MAX_BATCH_SIZE", "16")),
+        batch_window_ms=float(os.getenv("TRANSLATE_BATCH_WINDOW_MS", "5")),
+    )["quality"]
+
+    worker = TranslationJobWorker(
+        jobs,
+        engine,
+        somali_detector,
+        batch_size=int(os.getenv("TRANSLATION_JOB_BATCH_SIZE", "64")),
+        poll_interval=float(os.getenv("TRANSLATION_JOB_POLL_INTERVAL", "1")),
+        cache=TieredTranslationCache(cache, shared_cache),
+        history=db["translations"],
+        max_segment_tokens=int(os.getenv("TRANSLATE_MAX_SEGMENT_TOKENS", "256")),
+        scheduler=quality_scheduler,
+        model_name=registry_config_from_env(model_dir, engine_name)[1],
+    )
+    worker.run_forever()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Compare quantized variants of ./amiin_model against the float32 baseline.
+
+Every configuration runs in its own process so resident memory is measured
+cleanly. For each one the report gives the weight file size, RSS after the
+model is loaded and after the test set, per-request latency (one text per
+call, like /translate) and translation drift against float32 on a fixed
+Somali test set (data/somali_corpus.txt by default).
+
+Configurations:
+    float32        baseline (tf_model.h5, or mmap_weights when exported)
+    float16        float16 weights file, float16 variables
+    int8           int8 weights file, dequantized into float32 variables
+    int8-float16   int8 weights file, dequantized into float16 variables
+    ct2-int8       CTranslate2 int8 engine (needs export_ctranslate2_model.py)
+
+Create the weight files first:
+    python export_mmap_weights.py --quantize float16
+    python export_mmap_weights.py --quantize int8
+
+Usage:
+    python quantization_report.py --model-dir ./amiin_model --output quantization_report.json
+"""
+
+import argparse
+import difflib
+import json
+import os
+import subprocess
+import sys
+import time
+
+CONFIGS = {
+    "float32": {"engine": "tf", "weights": None, "weights_dtype": "float32"},
+    "float16": {"engine": "tf", "weights": "mmap_weights_float16", "weights_dtype": "float16"},
+    "int8": {"engine": "tf", "weights": "mmap_weights_int8", "weights_dtype": "float32"},
+    "int8-float16": {"engine": "tf", "weights": "mmap_weights_int8", "weights_dtype": "float16"},
+    "ct2-int8": {"engine": "ctranslate2", "compute_type": "int8"},
+}
+
+
+def rss_mb():
+    """Current resident set size of this process in MB"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return None
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def weights_size(model_dir, config):
+    if config["engine"] == "ctranslate2":
+        path = os.path.join(f"{model_dir.rstrip('/')}_ct2", "model.bin")
+    elif config["weights"]:
+        path = os.path.join(model_dir, config["weights"], "weights.bin")
+    elif os.path.exists(os.path.join(model_dir, "mmap_weights", "weights.bin")):
+        path = os.path.join(model_dir, "mmap_weights", "weights.bin")
+    else:
+        path = os.path.join(model_dir, "tf_model.h5")
+    return os.path.getsize(path) if os.path.exists(path) else None
+
+
+def run_config(name, model_dir, texts, num_beams):
+    """Measure one configuration in the current process"""
+    from services.engines import load_engine
+    from services.model_weights import has_mmap_weights
+
+    config = CONFIGS[name]
+    if config["engine"] == "ctranslate2":
+        options = {"compute_type": config["compute_type"]}
+    else:
+        options = {"weights_dtype": config["weights_dtype"]}
+        if config["weights"]:
+            weights_dir = os.path.join(model_dir, config["weights"])
+            if not has_mmap_weights(weights_dir):
+                raise FileNotFoundError(f"{weights_dir} not found; run export_mmap_weights.py --quantize first")
+            options["weights_dir"] = weights_dir
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    engine = load_engine(config["engine"], model_dir, **options)
+    engine.load()
+    load_seconds = time.perf_counter() - start
+    rss_loaded = rss_mb()
+
+    engine.translate_batch([texts[0]], num_beams=num_beams)  # first-call costs are not part of the comparison
+    latencies = []
+    translations = []
+    for text in texts:
+        start = time.perf_counter()
+        translations.append(engine.translate_batch([text], num_beams=num_beams)[0])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "weights_bytes": weights_size(model_dir, config),
+        "load_seconds": round(load_seconds, 2),
+        "rss_mb_before_load": round(rss_before, 1),
+        "rss_mb_loaded": round(rss_loaded, 1),
+        "rss_mb_after_test_set": round(rss_mb(), 1),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 1),
+            "p50": round(percentile(latencies, 0.5), 1),
+            "p95": round(percentile(latencies, 0.95), 1),
+        },
+        "translations": translations,
+    }
+
+
+def drift(baseline, translations):
+    exact = sum(a == b for a, b in zip(baseline, translations))
+    similarity = [difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(baseline, translations)]
+    return {
+        "exact_match": round(exact / len(baseline), 3),
+        "mean_similarity": round(sum(similarity) / len(similarity), 3),
+        "min_similarity": round(min(similarity), 3),
+    }
+
+
+def print_table(results):
+    header = f"{'config':<14}{'weights MB':>11}{'RSS MB':>9}{'p50 ms':>9}{'p95 ms':>9}{'exact':>8}{'similar':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name:<14}skipped: {result['error']}")
+            continue
+        size = f"{result['weights_bytes'] / (1024 * 1024):.1f}" if result["weights_bytes"] else "-"
+        d = result.get("drift", {})
+        print(f"{name:<14}{size:>11}{result['rss_mb_loaded']:>9.0f}{result['latency_ms']['p50']:>9.1f}"
+              f"{result['latency_ms']['p95']:>9.1f}{d.get('exact_match', 1.0):>8.1%}{d.get('mean_similarity', 1.0):>9.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Size, memory, latency and drift of quantized models")
+    parser.add_argument("--model-dir", default="./amiin_model")
+    parser.add_argument("--test-set", default=os.path.join("data", "somali_corpus.txt"))
+    parser.add_argument("--configs", default=",".join(CONFIGS))
+    parser.add_argument("--num-beams", type=int, default=None, help="Defaults to the model's generation config")
+    parser.add_argument("--output", default=None, help="Write the full report (with translations) as JSON")
+    parser.add_argument("--run-config", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    with open(args.test_set, encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+
+    if args.run_config:
+        # Child process: measure one configuration and print it as JSON
+        print(json.dumps(run_config(args.run_config, args.model_dir, texts, args.num_beams)))
+        sys.exit(0)
+
+    names = [name.strip() for name in args.configs.split(",") if name.strip()]
+    if "float32" in names:
+        names.remove("float32")
+    names.insert(0, "float32")
+
+    results = {}
+    for name in names:
+        print(f"Running {name}...", flush=True)
+        command = [sys.executable, os.path.abspath(__file__), "--run-config", name,
+                   "--model-dir", args.model_dir, "--test-set", args.test_set]
+        if args.num_beams:
+            command += ["--num-beams", str(args.num_beams)]
+        process = subprocess.run(command, capture_output=True, text=True)
+        if process.returncode != 0:
+            results[name] = {"error": process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "failed"}
+            continue
+        results[name] = json.loads(process.stdout.strip().splitlines()[-1])
+
+    baseline = results.get("float32", {}).get("translations")
+    for name, result in results.items():
+        if baseline and "translations" in result and name != "float32":
+            result["drift"] = drift(baseline, result["translations"])
+
+    print()
+    print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"model_dir": args.model_dir, "test_set": args.test_set, "texts": texts, "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\nFull report written to {args.output}")
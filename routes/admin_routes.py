@@ -7,7 +7,7 @@ import pytz
 from flask import make_response
 import calendar
 
-client = MongoClient("mongodb://localhost:27017/")
+client = MongoClient("mongodb://localhost:27017/", connect=False)
 db = client["somali_translator_db"]
 users = db["users"]
 translations = db["translations"]
@@ -10,7 +10,7 @@ bcrypt = Bcrypt()
 auth_routes = Blueprint("auth_routes", __name__)
 
 # MongoDB
-client = MongoClient("mongodb://localhost:27017/")
+client = MongoClient("mongodb://localhost:27017/", connect=False)
 db = client["somali_translator_db"]
 users = db["users"]
 
@@ -4,7 +4,7 @@ from pymongo import MongoClient
 from datetime import datetime
 from middlewares.auth_decorator import token_required
 
-client = MongoClient("mongodb://localhost:27017/")
+client = MongoClient("mongodb://localhost:27017/", connect=False)
 db = client["somali_translator_db"]
 favorites = db["favorites"]
 translations = db["translations"]
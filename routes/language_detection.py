@@ -1,16 +1,68 @@
+import json
+import os
 import re
 import langdetect
 from langdetect import detect, DetectorFactory
 from googletrans import Translator
 import numpy as np
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from services.affix_trie import AffixTrie
+from services.circuit_breaker import ExternalCall
+from services.metrics import DETECTION_STAGE_SECONDS, timed
+from services.ngram_classifier import DEFAULT_MODEL_PATH, NgramClassifier
 
 # Set seed for consistent language detection
 DetectorFactory.seed = 0
 
+# Punctuation removed from a word before it is scored, and the whole words
+# of a text (what `\b<word>\b` matches)
+NON_WORD_PATTERN = re.compile(r'[^\w\s]')
+WORD_PATTERN = re.compile(r'\w+')
+
+# Somali grammar markers, counted when they appear as whole words
+GRAMMAR_MARKERS = (
+    'waa', 'waxaa', 'waxay', 'waxuu',
+    'ku', 'ka', 'la', 'si', 'oo',
+    'iyo', 'ama', 'hadday', 'haddii'
+)
+
+# First method of the cascade: "langdetect" or "ngram" (local classifier)
+PRIMARY_METHODS = ('langdetect', 'ngram')
+
+def load_lexicon(path):
+    """
+    Extra Somali vocabulary from a JSON file with any of "common_words",
+    "prefixes" and "suffixes" (lists of lower-case strings). Returns
+    {} when the file does not exist.
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        lexicon = json.load(f)
+    unknown = set(lexicon) - {'common_words', 'prefixes', 'suffixes'}
+    if unknown:
+        raise ValueError(f"Unknown lexicon keys in {path}: {sorted(unknown)}")
+    return {key: [entry.lower() for entry in entries] for key, entries in lexicon.items()}
+
+def clean_word(word):
+    """A whitespace-separated word without its punctuation"""
+    # \w is exactly isalnum() plus "_": most words need no regex
+    return word if word.isalnum() else NON_WORD_PATTERN.sub('', word)
+
 class SomaliLanguageDetector:
-    def __init__(self):
-        self.translator = Translator()
+    def __init__(self, lexicon_path=None, primary=None, ngram_model_path=None):
+        # Google Translate is the last, external method: every call has a
+        # time budget and repeated failures skip it for a cool-down period
+        self.google_detect = ExternalCall(
+            "google_translate",
+            timeout=float(os.getenv("GOOGLE_DETECT_TIMEOUT", "2")),
+            failure_threshold=int(os.getenv("GOOGLE_DETECT_FAILURE_THRESHOLD", "5")),
+            cooldown=float(os.getenv("GOOGLE_DETECT_COOLDOWN", "30")),
+            max_concurrent=int(os.getenv("GOOGLE_DETECT_MAX_CONCURRENT", "4")),
+            enabled=os.getenv("GOOGLE_DETECT_ENABLED", "1") == "1",
+        )
+        self.translator = Translator(timeout=self.google_detect.timeout)
         
         # Somali language patterns and characteristics
         self.somali_patterns = {
@@ -46,6 +98,46 @@ class SomaliLanguageDetector:
             'qof', 'qofka', 'qofkaas',
             'wax', 'waxa', 'waxay', 'waxuu'
         ]
+        
+        # Larger vocabularies come from a lexicon file (SOMALI_LEXICON_PATH)
+        if lexicon_path is None:
+            lexicon_path = os.getenv("SOMALI_LEXICON_PATH", "./somali_lexicon.json")
+        lexicon = load_lexicon(lexicon_path)
+        self.somali_patterns['common_words'].extend(lexicon.get('common_words', []))
+        self.somali_patterns['common_prefixes'].extend(lexicon.get('prefixes', []))
+        self.somali_patterns['common_suffixes'].extend(lexicon.get('suffixes', []))
+        
+        self._compile_patterns()
+        
+        # The local n-gram classifier can replace langdetect as method 1
+        # (no language profiles to load, no per-call overhead of langdetect)
+        self.primary = primary or os.getenv("LANGUAGE_DETECTION_PRIMARY", "langdetect")
+        if self.primary not in PRIMARY_METHODS:
+            raise ValueError(f"LANGUAGE_DETECTION_PRIMARY must be one of {PRIMARY_METHODS}")
+        self.ngram_threshold = float(os.getenv("NGRAM_SOMALI_THRESHOLD", "0.6"))
+        self.ngram_classifier = None
+        if self.primary == 'ngram':
+            ngram_model_path = ngram_model_path or os.getenv("NGRAM_MODEL_PATH", DEFAULT_MODEL_PATH)
+            if os.path.exists(ngram_model_path):
+                self.ngram_classifier = NgramClassifier.load(ngram_model_path)
+            else:
+                print(f"N-gram model {ngram_model_path} not found (train_ngram_classifier.py), using langdetect")
+                self.primary = 'langdetect'
+    
+    def _compile_patterns(self):
+        """
+        Lookup structures for scoring, built once from the lists above:
+        sets instead of list scans, prefix and reversed-suffix tries that
+        score a word in O(len(word)) however many affixes there are, and
+        every phrase checked once with the number of times it is listed
+        (each listing counts).
+        """
+        self.common_words = frozenset(self.somali_patterns['common_words'])
+        self.prefix_trie = AffixTrie(self.somali_patterns['common_prefixes'])
+        self.suffix_trie = AffixTrie(self.somali_patterns['common_suffixes'], reverse=True)
+        self.phrase_counts = tuple(Counter(self.somali_phrases).items())
+        self.grammar_markers = frozenset(GRAMMAR_MARKERS)
+        self.characteristics_total = len(self.somali_phrases) + len(GRAMMAR_MARKERS)
     
     def detect_text_language(self, text):
         """
@@ -56,51 +148,174 @@ class SomaliLanguageDetector:
             return {'language': 'unknown', 'confidence': 0.0, 'method': 'empty_text'}
         
         text = text.strip().lower()
+        return self._detect(text, text.split())[0]
+    
+    def _detect(self, text, words):
+        """
+        Detection for stripped, lower-cased text and its words. Returns the
+        result and the characteristics score (None when an earlier method
+        already decided).
+        """
+        # Every method is timed (language_detection_stage_seconds metric)
+        if self.primary == 'ngram':
+            # Method 1: Local character n-gram classifier
+            with timed(DETECTION_STAGE_SECONDS, 'ngram', name='detect.ngram'):
+                result = self._ngram_result(self.ngram_classifier.probability(text))
+        else:
+            # Method 1: Use langdetect library
+            with timed(DETECTION_STAGE_SECONDS, 'langdetect', name='detect.langdetect'):
+                result = self._langdetect_result(text)
+        if result:
+            return result, None
+        
+        # Method 2: Pattern matching for Somali words
+        with timed(DETECTION_STAGE_SECONDS, 'pattern_matching', name='detect.patterns'):
+            result = self._pattern_result(words)
+        if result:
+            return result, None
+        
+        # Method 3: Character frequency analysis
+        with timed(DETECTION_STAGE_SECONDS, 'character_analysis', name='detect.characters'):
+            somali_char_ratio = self._analyze_somali_characteristics(text)
+            result = self._character_result(somali_char_ratio)
+        if result:
+            return result, somali_char_ratio
+        
+        # Method 4: Google Translate API (fallback, skipped when disabled)
+        if self.google_detect.enabled:
+            with timed(DETECTION_STAGE_SECONDS, 'google_translate', name='detect.google'):
+                result = self._google_result(text)
+            if result:
+                return result, somali_char_ratio
+        
+        # If none of the methods detect Somali, it's likely not Somali
+        return self._other_result(), somali_char_ratio
+    
+    def detect_many(self, texts):
+        """
+        detect_text_language() of every text, in order, with the same
+        result for each: the methods run in the same order as for one
+        text, each over all the texts still undecided. Identical texts
+        (after stripping and lower-casing) are detected once, the n-gram
+        classifier scores the whole batch in one vectorized call, and
+        Google Translate is called concurrently (within the fallback's
+        in-flight limit). langdetect has no batch form: as the primary
+        method it still runs once per text, at the cost of a single call.
+        """
+        results = [None] * len(texts)
+        positions = {}
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = {'language': 'unknown', 'confidence': 0.0, 'method': 'empty_text'}
+            else:
+                positions.setdefault(text.strip().lower(), []).append(i)
+        pending = list(positions)
+        decided = {}
         
-        # Method 1: Use langdetect library
+        def run(stage, name, decide):
+            # One method over every undecided text; keeps the still undecided ones
+            nonlocal pending
+            if not pending:
+                return
+            with timed(DETECTION_STAGE_SECONDS, stage, name=name):
+                decisions = decide(pending)
+            undecided = []
+            for text, result in zip(pending, decisions):
+                if result:
+                    decided[text] = result
+                else:
+                    undecided.append(text)
+            pending = undecided
+        
+        if self.primary == 'ngram':
+            run('ngram', 'detect.ngram', lambda batch: [
+                self._ngram_result(float(p)) for p in 1.0 / (1.0 + np.exp(-self.ngram_classifier.scores(batch)))])
+        else:
+            run('langdetect', 'detect.langdetect', lambda batch: [self._langdetect_result(text) for text in batch])
+        run('pattern_matching', 'detect.patterns', lambda batch: [
+            self._pattern_result(text.split()) for text in batch])
+        run('character_analysis', 'detect.characters', lambda batch: [
+            self._character_result(self._analyze_somali_characteristics(text)) for text in batch])
+        if self.google_detect.enabled and pending:
+            with ThreadPoolExecutor(self.google_detect.max_concurrent) as executor:
+                run('google_translate', 'detect.google', lambda batch: list(executor.map(self._google_result, batch)))
+        
+        for text in pending:
+            decided[text] = self._other_result()
+        for text, indexes in positions.items():
+            for i in indexes:
+                results[i] = dict(decided[text])
+        return results
+    
+    def _ngram_result(self, probability):
+        if probability >= self.ngram_threshold:
+            return {'language': 'so', 'confidence': probability, 'method': 'ngram'}
+        return None
+    
+    def _langdetect_result(self, text):
         try:
-            detected_lang = detect(text)
-            if detected_lang == 'so':
+            if detect(text) == 'so':
                 return {'language': 'so', 'confidence': 0.9, 'method': 'langdetect'}
         except:
             pass
-        
-        # Method 2: Pattern matching for Somali words
-        somali_word_count = 0
-        total_words = len(text.split())
-        
-        if total_words > 0:
-            words = text.split()
-            for word in words:
-                # Clean word (remove punctuation)
-                clean_word = re.sub(r'[^\w\s]', '', word)
-                if clean_word in self.somali_patterns['common_words']:
-                    somali_word_count += 1
-                elif any(clean_word.startswith(prefix) for prefix in self.somali_patterns['common_prefixes']):
-                    somali_word_count += 0.5
-                elif any(clean_word.endswith(suffix) for suffix in self.somali_patterns['common_suffixes']):
-                    somali_word_count += 0.3
-            
-            somali_ratio = somali_word_count / total_words
-            if somali_ratio > 0.2:  # Lowered threshold for better detection
-                return {'language': 'so', 'confidence': min(somali_ratio, 0.8), 'method': 'pattern_matching'}
-        
-        # Method 3: Character frequency analysis
-        somali_char_ratio = self._analyze_somali_characteristics(text)
+        return None
+    
+    def _pattern_result(self, words):
+        somali_ratio = self._pattern_ratio(words)
+        if somali_ratio is not None and somali_ratio > 0.2:  # Lowered threshold for better detection
+            return {'language': 'so', 'confidence': min(somali_ratio, 0.8), 'method': 'pattern_matching'}
+        return None
+    
+    def _character_result(self, somali_char_ratio):
         if somali_char_ratio > 0.6:
             return {'language': 'so', 'confidence': somali_char_ratio * 0.7, 'method': 'character_analysis'}
-        
-        # Method 4: Google Translate API (fallback)
+        return None
+    
+    def _google_result(self, text):
         try:
-            detected = self.translator.detect(text)
+            detected = self.google_detect(self.translator.detect, text)
             if detected.lang == 'so':
                 return {'language': 'so', 'confidence': detected.confidence, 'method': 'google_translate'}
         except:
             pass
-        
-        # If none of the methods detect Somali, it's likely not Somali
+        return None
+    
+    def _other_result(self):
         return {'language': 'other', 'confidence': 0.8, 'method': 'combined_analysis'}
     
+    def _pattern_ratio(self, words):
+        """Somali word score per word (None without words)"""
+        if not words:
+            return None
+        somali_word_count = 0
+        common_words = self.common_words
+        has_prefix = self.prefix_trie.matches
+        has_suffix = self.suffix_trie.matches
+        for word in words:
+            # Clean word (remove punctuation)
+            word = clean_word(word)
+            if word in common_words:
+                somali_word_count += 1
+            elif has_prefix(word):
+                somali_word_count += 0.5
+            elif has_suffix(word):
+                somali_word_count += 0.3
+        return somali_word_count / len(words)
+    
+    def analyze_text(self, text):
+        """
+        Detection result, lower-cased words and characteristics score of
+        `text` (what /analyze-text reports) from a single tokenization
+        """
+        text = text.strip().lower()
+        words = text.split()
+        if not text:
+            return {'language': 'unknown', 'confidence': 0.0, 'method': 'empty_text'}, words, 0.0
+        detection, characteristics = self._detect(text, words)
+        if characteristics is None:
+            characteristics = self._analyze_somali_characteristics(text)
+        return detection, words, characteristics
+    
     def _analyze_somali_characteristics(self, text):
         """
         Analyze text for Somali language characteristics
@@ -108,30 +323,17 @@ class SomaliLanguageDetector:
         if not text:
             return 0.0
         
-        # Count Somali-specific patterns
-        somali_indicators = 0
-        total_indicators = 0
+        text = text.lower()
+        total_indicators = self.characteristics_total
         
         # Check for common Somali word patterns
-        for phrase in self.somali_phrases:
-            if phrase in text.lower():
-                somali_indicators += 1
-            total_indicators += 1
-        
-        # Check for Somali grammar patterns
-        somali_patterns = [
-            r'\bwaa\b', r'\bwaxaa\b', r'\bwaxay\b', r'\bwaxuu\b',
-            r'\bku\b', r'\bka\b', r'\bla\b', r'\bsi\b', r'\boo\b',
-            r'\biyo\b', r'\bama\b', r'\bhadday\b', r'\bhaddii\b'
-        ]
+        somali_indicators = sum(count for phrase, count in self.phrase_counts if phrase in text)
         
-        for pattern in somali_patterns:
-            if re.search(pattern, text.lower()):
-                somali_indicators += 1
-            total_indicators += 1
+        # Check for Somali grammar patterns (whole words)
+        somali_indicators += len(self.grammar_markers.intersection(WORD_PATTERN.findall(text)))
         
         # Check for Somali sentence structure
-        if 'waa' in text.lower() and ('ku' in text.lower() or 'ka' in text.lower()):
+        if 'waa' in text and ('ku' in text or 'ka' in text):
             somali_indicators += 2
             total_indicators += 2
         
@@ -1,8 +1,21 @@
+import os
 from flask import Blueprint, jsonify, request
 from routes.language_detection import somali_detector
 
 language_routes = Blueprint("language_routes", __name__)
 
+MAX_DETECT_BATCH_TEXTS = int(os.getenv("DETECT_LANGUAGE_BATCH_MAX_TEXTS", "10000"))
+
+def language_detection_body(detection_result):
+    """The language_detection block of the /detect-language responses"""
+    return {
+        "detected_language": detection_result['language'],
+        "language_confidence": detection_result['confidence'],
+        "detection_method": detection_result['method'],
+        "is_somali": detection_result['language'] == 'so',
+        "language_name": "Somali" if detection_result['language'] == 'so' else "Other"
+    }
+
 @language_routes.route("/detect-language", methods=["POST"])
 def detect_text_language():
     """
@@ -23,13 +36,51 @@ def detect_text_language():
     
     return jsonify({
         "text": text,
-        "language_detection": {
-            "detected_language": detection_result['language'],
-            "language_confidence": detection_result['confidence'],
-            "detection_method": detection_result['method'],
-            "is_somali": detection_result['language'] == 'so',
-            "language_name": "Somali" if detection_result['language'] == 'so' else "Other"
+        "language_detection": language_detection_body(detection_result)
+    })
+
+@language_routes.route("/detect-language/batch", methods=["POST"])
+def detect_text_language_batch():
+    """
+    Detect the language of a list of texts in one request.
+    Results (or per-item errors) come back in input order with the same
+    fields as /detect-language. Each method runs over the texts still
+    undecided. With the default langdetect primary every text still goes
+    through langdetect one by one, so the batch only saves HTTP round trips
+    and repeated texts; LANGUAGE_DETECTION_PRIMARY=ngram scores the whole
+    batch in one call.
+    """
+    data = request.get_json()
+    texts = data.get("texts") if data else None
+    
+    if not isinstance(texts, list) or not texts:
+        return jsonify({"error": "Provide a non-empty 'texts' list"}), 400
+    if len(texts) > MAX_DETECT_BATCH_TEXTS:
+        return jsonify({"error": f"At most {MAX_DETECT_BATCH_TEXTS} texts per batch"}), 413
+    
+    results = [None] * len(texts)
+    valid_indexes = []
+    for i, text in enumerate(texts):
+        if not isinstance(text, str):
+            results[i] = {"index": i, "error": "Text is required"}
+        elif not text.strip():
+            results[i] = {"index": i, "error": "Text cannot be empty"}
+        else:
+            valid_indexes.append(i)
+    
+    detections = somali_detector.detect_many([texts[i] for i in valid_indexes])
+    for i, detection_result in zip(valid_indexes, detections):
+        results[i] = {
+            "index": i,
+            "text": texts[i],
+            "language_detection": language_detection_body(detection_result)
         }
+    
+    return jsonify({
+        "results": results,
+        "total": len(texts),
+        "somali": sum(detection['language'] == 'so' for detection in detections),
+        "failed": len(texts) - len(valid_indexes)
     })
 
 @language_routes.route("/is-somali", methods=["POST"])
@@ -72,23 +123,19 @@ def analyze_text():
     if not text or not text.strip():
         return jsonify({"error": "Text cannot be empty"}), 400
     
-    # Get detailed analysis
-    detection_result = somali_detector.detect_text_language(text)
+    # Get detailed analysis (detection, words and characteristics share one tokenization)
+    detection_result, words, characteristics = somali_detector.analyze_text(text)
     
     # Count Somali words
-    words = text.lower().split()
     somali_word_count = 0
     somali_words_found = []
     
     for word in words:
         clean_word = word.strip('.,!?;:')
-        if clean_word in somali_detector.somali_patterns['common_words']:
+        if clean_word in somali_detector.common_words:
             somali_word_count += 1
             somali_words_found.append(clean_word)
     
-    # Analyze characteristics
-    characteristics = somali_detector._analyze_somali_characteristics(text)
-    
     return jsonify({
         "text": text,
         "analysis": {
@@ -0,0 +1,89 @@
+from flask import Blueprint, jsonify, request
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import MongoClient
+import os
+from middlewares.auth_decorator import decode_token
+from services.segmentation import segment_text
+from services.translation_jobs import create_job, serialize_job
+
+client = MongoClient("mongodb://localhost:27017/", connect=False)
+db = client["somali_translator_db"]
+translation_jobs = db["translation_jobs"]
+
+translation_jobs_routes = Blueprint("translation_jobs_routes", __name__)
+
+MAX_JOB_TEXTS = int(os.getenv("TRANSLATION_JOB_MAX_TEXTS", "10000"))
+# Documents are split into segments of at most this many characters
+DOCUMENT_SEGMENT_CHARS = int(os.getenv("TRANSLATION_JOB_SEGMENT_CHARS", "400"))
+
+def get_optional_user_id():
+    """Return the user_id of a valid Bearer token, or None"""
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        try:
+            return decode_token(auth_header).get("user_id")
+        except Exception:
+            pass
+    return None
+
+@translation_jobs_routes.route("/translate/jobs", methods=["POST"])
+def create_translation_job():
+    """
+    Queue a bulk translation job.
+    Body: {"texts": ["...", ...]} for a list of phrases, or
+          {"document": "..."} for one long document.
+    """
+    data = request.get_json() or {}
+    texts = data.get("texts")
+    document = data.get("document")
+    document_layout = None
+
+    if document is not None:
+        if not isinstance(document, str) or not document.strip():
+            return jsonify({"error": "Document cannot be empty"}), 400
+        segmented = segment_text(document, max_length=DOCUMENT_SEGMENT_CHARS)
+        texts = segmented.segments
+        document_layout = {"leading": segmented.leading, "separators": segmented.separators}
+    elif not isinstance(texts, list) or not texts:
+        return jsonify({"error": "Provide a non-empty 'texts' list or a 'document'"}), 400
+    elif not all(isinstance(text, str) for text in texts):
+        return jsonify({"error": "Every item in 'texts' must be a string"}), 400
+
+    if len(texts) > MAX_JOB_TEXTS:
+        return jsonify({"error": f"A job can contain at most {MAX_JOB_TEXTS} texts"}), 413
+
+    try:
+        job_id = create_job(translation_jobs, texts, get_optional_user_id(), document_layout)
+        return jsonify({
+            "id": job_id,
+            "status": "queued",
+            "total": len(texts),
+            "status_url": f"/translate/jobs/{job_id}"
+        }), 202
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@translation_jobs_routes.route("/translate/jobs/<job_id>", methods=["GET"])
+def get_translation_job(job_id):
+    """
+    Return job progress, plus results once available.
+    Jobs created with a token can only be read with the same user's token.
+    Use ?results=false to fetch progress only.
+    """
+    try:
+        job = translation_jobs.find_one({"_id": ObjectId(job_id)})
+    except InvalidId:
+        return jsonify({"error": "Invalid job id"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    owner = job.get("user_id")
+    if owner is not None and str(owner) != get_optional_user_id():
+        return jsonify({"error": "Job not found"}), 404
+
+    include_results = request.args.get("results", "true").lower() != "false"
+    return jsonify(serialize_job(job, include_results=include_results))
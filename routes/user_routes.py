@@ -5,7 +5,7 @@ from middlewares.auth_decorator import token_required, admin_required
 from datetime import datetime, timedelta
 import pytz
 
-client = MongoClient("mongodb://localhost:27017/")
+client = MongoClient("mongodb://localhost:27017/", connect=False)
 db = client["somali_translator_db"]
 users = db["users"]
 translations = db["translations"]
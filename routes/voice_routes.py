@@ -4,14 +4,18 @@ from pymongo import MongoClient
 from datetime import datetime
 from middlewares.auth_decorator import token_required
 from langdetect import detect
+from services.inference_pool import client_from_env
 import base64
 import gridfs
 
-client = MongoClient("mongodb://localhost:27017/")
+client = MongoClient("mongodb://localhost:27017/", connect=False)
 db = client["somali_translator_db"]
 voice_recordings = db["voice_recordings"]
 fs = gridfs.GridFS(db)
 
+# Local inference pool (inference_server.py), when configured
+inference_client = client_from_env()
+
 voice_routes = Blueprint("voice_routes", __name__)
 
 def parse_data_url_audio(data_url: str):
@@ -98,6 +102,14 @@ def save_voice_recording():
         except Exception as e:
             return jsonify({"error": "Waxaa dhacay khalad markii la hubinayay luqadda"}), 400
 
+        # Auto-translate with the local model pool when it is running
+        if not translation and inference_client is not None:
+            try:
+                translation = inference_client.translate_batch([transcription])[0]
+            except Exception as e:
+                print(f"Inference pool error: {e}")
+                translation = ""
+
         # Auto-translate the transcription if no translation provided
         if not translation:
             try:
@@ -0,0 +1,173 @@
+import math
+import select
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import wait as wait_futures
+
+
+class Overloaded(Exception):
+    """The inference queue is full; retry after `retry_after` seconds"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Translation queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class RequestCancelled(Exception):
+    """Queued work was dropped because its deadline passed or its client left"""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Bounded admission in front of the translation schedulers.
+
+    Every request takes as many queue slots as it has texts (a batch
+    larger than its limit takes all of it) and gives them back when it
+    finishes. Anonymous requests may fill only `anonymous_share` of the
+    queue, so authenticated users still get in (and ahead in the batch
+    queues) when anonymous traffic spikes. A full queue raises Overloaded
+    with a Retry-After estimate from the recent completion rate.
+    """
+
+    def __init__(self, max_queue=32, anonymous_share=0.75, queue_timeout=30.0, max_timeout=120.0,
+                 poll_interval=0.1, rate_window=10.0):
+        self.max_queue = int(max_queue)
+        self.anonymous_limit = max(1, int(self.max_queue * anonymous_share)) if self.max_queue > 0 else 0
+        self.queue_timeout = float(queue_timeout)
+        self.max_timeout = float(max_timeout)
+        self.poll_interval = float(poll_interval)
+        self.rate_window = float(rate_window)
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.expired = 0
+        self.disconnected = 0
+        self._completions = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_queue > 0
+
+    def admit(self, count, priority=False, timeout=None, is_disconnected=None):
+        """
+        Reserve queue slots for `count` texts and return a Ticket.
+        `timeout` (seconds, capped at max_timeout) sets the request's
+        deadline; `is_disconnected()` reports whether the client is gone.
+        """
+        timeout = self.queue_timeout if timeout is None else min(float(timeout), self.max_timeout)
+        limit = self.max_queue if priority else self.anonymous_limit
+        cost = min(max(1, int(count)), limit) if self.enabled else 0
+        with self._lock:
+            if self.enabled:
+                if self.queued + cost > limit:
+                    self.rejected += 1
+                    raise Overloaded(self._retry_after())
+            self.queued += cost
+            self.admitted += 1
+        return Ticket(self, cost, priority, time.monotonic() + timeout, is_disconnected)
+
+    def _release(self, cost, completed):
+        now = time.monotonic()
+        with self._lock:
+            self.queued -= cost
+            if completed:
+                self._completions.append((now, cost))
+            self._trim(now)
+
+    def _trim(self, now):
+        while self._completions and now - self._completions[0][0] > self.rate_window:
+            self._completions.popleft()
+
+    def _retry_after(self):
+        """Seconds until the queue has drained at the recent completion rate (1-60)"""
+        self._trim(time.monotonic())
+        completed = sum(cost for _, cost in self._completions)
+        if not completed:
+            return 5
+        rate = completed / self.rate_window
+        return max(1, min(60, math.ceil(self.queued / rate)))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "queued": self.queued,
+                "max_queue": self.max_queue,
+                "anonymous_limit": self.anonymous_limit,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "disconnected": self.disconnected,
+            }
+
+
+class Ticket:
+    """An admitted request: holds its queue slots until released"""
+
+    def __init__(self, controller, cost, priority, deadline, is_disconnected=None):
+        self.controller = controller
+        self.cost = cost
+        self.priority = priority
+        self.deadline = deadline
+        self.is_disconnected = is_disconnected
+        self._released = False
+
+    def release(self, completed=True):
+        if not self._released:
+            self._released = True
+            self.controller._release(self.cost, completed)
+
+    def check(self):
+        """Raise RequestCancelled if the deadline passed or the client disconnected"""
+        if time.monotonic() >= self.deadline:
+            self.controller.expired += 1
+            raise RequestCancelled("deadline")
+        if self.is_disconnected is not None and self.is_disconnected():
+            self.controller.disconnected += 1
+            raise RequestCancelled("client disconnected")
+
+    def wait(self, futures):
+        """
+        Results of `futures` in order. While waiting the deadline and the
+        client connection are checked every poll interval; when either
+        fails, every future still queued is cancelled (the schedulers skip
+        cancelled work) and RequestCancelled is raised.
+        """
+        try:
+            for future in futures:
+                while not future.done():
+                    self.check()
+                    wait_futures([future], timeout=min(self.controller.poll_interval,
+                                                       max(0.0, self.deadline - time.monotonic())))
+        except RequestCancelled:
+            for future in futures:
+                future.cancel()
+            raise
+        return [future.result() for future in futures]
+
+
+def client_disconnected(environ):
+    """
+    Whether the client of a WSGI request closed its connection, checked
+    without blocking on the server's socket (gunicorn and the Werkzeug
+    development server expose it). Unknown servers report False.
+    """
+    sock = environ.get("gunicorn.socket") or environ.get("werkzeug.socket")
+    if sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        if not readable:
+            return False
+        return sock.recv(1, socket.MSG_PEEK) == b""
+    except ConnectionError:
+        return True
+    except (OSError, ValueError):
+        return False
@@ -0,0 +1,43 @@
+# Key marking a node where an affix ends (never a character)
+_END = None
+
+
+class AffixTrie:
+    """
+    Set of prefixes (or suffixes, with reverse=True) that answers "does
+    this word start (end) with any of them" in O(len(word)), however many
+    affixes it holds. Nodes are plain dicts keyed by character; a node
+    that ends an affix holds the `_END` key.
+    """
+
+    def __init__(self, affixes=(), reverse=False):
+        self.reverse = reverse
+        self._root = {}
+        self._size = 0
+        for affix in affixes:
+            self.add(affix)
+
+    def add(self, affix):
+        node = self._root
+        for char in (reversed(affix) if self.reverse else affix):
+            node = node.setdefault(char, {})
+        if _END not in node:
+            node[_END] = True
+            self._size += 1
+
+    def __len__(self):
+        return self._size
+
+    def matches(self, word):
+        """Same as word.startswith(affixes) (endswith for a suffix trie)"""
+        node = self._root
+        if _END in node:
+            # The empty affix matches every word
+            return True
+        for char in (reversed(word) if self.reverse else word):
+            node = node.get(char)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
@@ -0,0 +1,216 @@
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from functools import partial
+
+from services.metrics import start_timings
+
+
+class BatchScheduler:
+    """
+    Micro-batching scheduler for model inference.
+
+    Concurrent callers submit single texts; a background thread holds them
+    for up to `batch_window_ms` (or until `max_batch_size` texts are waiting)
+    and hands the whole group to `batch_fn` in one call. `batch_fn` takes a
+    list of texts and returns a list of results in the same order.
+
+    Priority submissions are batched ahead of ordinary ones, and texts
+    whose future was cancelled while queued are dropped without running.
+    Every future of a batch gets the batch's `stage_timings` (seconds per
+    stage timed inside `batch_fn`).
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, batch_window_ms=5):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.batch_window = max(0.0, float(batch_window_ms)) / 1000.0
+        self._queue = deque()
+        self._priority_queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+
+    def submit(self, text, priority=False):
+        """Queue a text for the next batch and return a Future for its result"""
+        future = Future()
+        with self._cond:
+            self._ensure_worker()
+            (self._priority_queue if priority else self._queue).append((text, future))
+            self._cond.notify()
+        return future
+
+    def pending(self):
+        return len(self._queue) + len(self._priority_queue)
+
+    def translate(self, text, timeout=None):
+        """Submit a single text and wait for its result"""
+        return self.submit(text).result(timeout=timeout)
+
+    def translate_many(self, texts, timeout=None):
+        """Submit several texts at once and wait for all results, in order"""
+        futures = [self.submit(text) for text in texts]
+        return [future.result(timeout=timeout) for future in futures]
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so a worker started in a parent
+        # process must be restarted in each child.
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="batch-scheduler", daemon=True)
+        self._thread.start()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self.pending():
+                self._cond.wait()
+
+            # Hold the first request for the batch window so that requests
+            # arriving at almost the same time share one forward pass.
+            deadline = time.monotonic() + self.batch_window
+            while self.pending() < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = []
+            for queue in (self._priority_queue, self._queue):
+                while queue and len(batch) < self.max_batch_size:
+                    text, future = queue.popleft()
+                    if not future.cancelled():
+                        batch.append((text, future))
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            timings = start_timings()
+            try:
+                results = self.batch_fn([text for text, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"Batch function returned {len(results)} results for {len(batch)} inputs"
+                    )
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.stage_timings = timings.stages
+                future.set_result(result)
+
+
+class BucketedBatchScheduler:
+    """
+    Length-aware batching: texts are routed by token length into buckets,
+    and every bucket has its own BatchScheduler (and worker thread).
+
+    Short phrases are therefore never padded up to a long paragraph, and do
+    not wait behind one. Each bucket calls `batch_fn(texts,
+    max_new_tokens=..., **batch_options)` with a generation bound derived
+    from the bucket's upper length; the last, open-ended bucket uses the
+    model default. A text submitted with a lower `max_new_tokens` cap
+    stays in its bucket and is generated with the cap: within a batch,
+    texts are grouped by their effective bound, one `batch_fn` call each.
+    Caps are rounded down to one of the bucket bounds (never below the
+    smallest), so a capped batch reuses a shape the warmup has already
+    compiled instead of tracing a new graph per cap.
+    """
+
+    def __init__(self, batch_fn, length_fn, boundaries=(8, 16, 32, 64, 128), max_batch_size=16,
+                 batch_window_ms=5, new_tokens_ratio=1.5, new_tokens_margin=10, batch_options=None):
+        self.batch_fn = batch_fn
+        self.batch_options = dict(batch_options or {})
+        self.length_fn = length_fn
+        self.boundaries = sorted(int(boundary) for boundary in boundaries)
+        self.new_tokens = []
+        self.batch_fns = []
+        self.schedulers = []
+        for upper in self.boundaries + [None]:
+            max_new_tokens = None if upper is None else int(upper * new_tokens_ratio) + new_tokens_margin
+            self.new_tokens.append(max_new_tokens)
+            # The bucket's own (uncapped) batch function, e.g. for warmup
+            self.batch_fns.append(partial(batch_fn, max_new_tokens=max_new_tokens, **self.batch_options))
+            self.schedulers.append(BatchScheduler(
+                self._run_capped,
+                max_batch_size=max_batch_size,
+                batch_window_ms=batch_window_ms,
+            ))
+
+    def bucket_for(self, text):
+        """Index of the bucket whose upper bound fits the text's length"""
+        return bisect.bisect_left(self.boundaries, self.length_fn(text))
+
+    def warmed_cap(self, max_new_tokens):
+        """`max_new_tokens` rounded down to the nearest bucket bound, at least the smallest"""
+        bounds = [bound for bound in self.new_tokens if bound is not None]
+        if max_new_tokens is None or not bounds:
+            return max_new_tokens
+        index = bisect.bisect_right(bounds, max_new_tokens)
+        return bounds[max(index - 1, 0)]
+
+    def max_new_tokens_for(self, bucket, max_new_tokens=None):
+        """Generation bound for a text in `bucket`: the bucket's bound, lowered to the warmed cap"""
+        bound = self.new_tokens[bucket]
+        max_new_tokens = self.warmed_cap(max_new_tokens)
+        if max_new_tokens is None:
+            return bound
+        return max_new_tokens if bound is None else min(bound, max_new_tokens)
+
+    def _run_capped(self, items):
+        """Batch function of every bucket: (text, bound) items, one batch_fn call per bound"""
+        groups = {}
+        for i, (text, max_new_tokens) in enumerate(items):
+            groups.setdefault(max_new_tokens, []).append(i)
+        results = [None] * len(items)
+        for max_new_tokens, indexes in groups.items():
+            translated = self.batch_fn(
+                [items[i][0] for i in indexes], max_new_tokens=max_new_tokens, **self.batch_options)
+            if len(translated) != len(indexes):
+                raise RuntimeError(
+                    f"Batch function returned {len(translated)} results for {len(indexes)} inputs"
+                )
+            for i, result in zip(indexes, translated):
+                results[i] = result
+        return results
+
+    def submit(self, text, max_new_tokens=None, priority=False):
+        bucket = self.bucket_for(text)
+        return self.schedulers[bucket].submit((text, self.max_new_tokens_for(bucket, max_new_tokens)), priority)
+
+    def translate(self, text, timeout=None, max_new_tokens=None):
+        return self.submit(text, max_new_tokens).result(timeout=timeout)
+
+    def translate_many(self, texts, timeout=None, max_new_tokens=None):
+        futures = [self.submit(text, max_new_tokens) for text in texts]
+        return [future.result(timeout=timeout) for future in futures]
+
+
+def stream_in_order(submit, texts, wait, futures=None):
+    """
+    Yield the result of every text, in order, as soon as it is ready.
+    `submit(texts)` returns one Future per text and `wait(futures)` their
+    results. The first text is submitted on its own and the rest once it
+    is done, so the first result comes from a one-text batch instead of
+    waiting for a batch that holds the whole input. Submitted futures are
+    appended to `futures`, e.g. to cancel them.
+    """
+    futures = [] if futures is None else futures
+    if not texts:
+        return
+    futures.extend(submit(texts[:1]))
+    first = wait(futures[:1])[0]
+    futures.extend(submit(texts[1:]))
+    yield first
+    for future in futures[1:]:
+        yield wait([future])[0]
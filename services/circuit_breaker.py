@@ -0,0 +1,150 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+
+class CallSkipped(Exception):
+    """The external call was not made (disabled, circuit open, too many in flight) or ran out of time"""
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go through. After `failure_threshold` consecutive
+    failures the circuit opens and calls are skipped for `cooldown`
+    seconds; then one trial call is let through (half-open) and its
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30.0, clock=time.monotonic):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = float(cooldown)
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def allow(self):
+        """Whether a call may be made now (a half-open circuit allows one at a time)"""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        """Count a failure; True when it (re-)opened the circuit"""
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+                return True
+            return False
+
+
+class ExternalCall:
+    """
+    Calls to one external service under a time budget and a circuit
+    breaker. The call runs on a small thread pool so the caller waits at
+    most `timeout` seconds; a call that overruns keeps its thread until
+    the upstream gives up, and at most `max_concurrent` may be in flight,
+    so a hanging upstream cannot tie up more threads than that.
+    """
+
+    def __init__(self, name, timeout=2.0, failure_threshold=5, cooldown=30.0, max_concurrent=4, enabled=True,
+                 clock=time.monotonic):
+        self.name = name
+        self.timeout = float(timeout)
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.enabled = enabled
+        self.breaker = CircuitBreaker(failure_threshold, cooldown, clock)
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.skipped = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _pool(self):
+        # Created on first use: threads do not survive a gunicorn fork
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_concurrent, thread_name_prefix=self.name)
+            return self._executor
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _skip(self, reason):
+        self._count("skipped")
+        raise CallSkipped(f"{self.name}: {reason}")
+
+    def __call__(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs), or CallSkipped; errors from fn count as failures and are re-raised"""
+        if not self.enabled:
+            self._skip("disabled")
+        if not self._slots.acquire(blocking=False):
+            self._skip(f"{self.max_concurrent} calls already in flight")
+        if not self.breaker.allow():
+            self._slots.release()
+            self._skip("circuit open")
+
+        self._count("calls")
+        try:
+            future = self._pool().submit(fn, *args, **kwargs)
+        except RuntimeError:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self._count("timeouts")
+            self._failed()
+            raise CallSkipped(f"{self.name}: no answer within {self.timeout:g}s")
+        except Exception:
+            self._count("errors")
+            self._failed()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def _failed(self):
+        if self.breaker.record_failure():
+            print(f"{self.name} failing, skipping it for {self.breaker.cooldown:g}s")
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "state": self.breaker.state,
+            "timeout_seconds": self.timeout,
+            "calls": self.calls,
+            "skipped": self.skipped,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
@@ -0,0 +1,78 @@
+import os
+
+
+def available_cpus():
+    """CPUs this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cpu_share(cpus, slot, slots):
+    """The `slot`-th of `slots` contiguous, near-equal shares of `cpus`"""
+    if slots >= len(cpus):
+        return [cpus[slot % len(cpus)]]
+    slot %= slots
+    return cpus[slot * len(cpus) // slots:(slot + 1) * len(cpus) // slots]
+
+
+class CpuThreadConfig:
+    """
+    Thread pools and CPU placement of one inference process out of
+    `processes` on the node (gunicorn workers or inference pool workers).
+
+    By default every TensorFlow runtime sizes its intra-op and inter-op
+    pools to all cores, so several workers on one box oversubscribe the
+    CPU. Thread counts of 0 mean auto: intra-op threads get the process's
+    share of the cores and inter-op threads at most 2 (generation runs few
+    independent ops at a time). With `affinity` every process is pinned to
+    its own contiguous share of the cores, picked by its slot.
+    """
+
+    def __init__(self, intra_op_threads=0, inter_op_threads=0, affinity=False, processes=1):
+        self.intra_op_threads = int(intra_op_threads)
+        self.inter_op_threads = int(inter_op_threads)
+        self.affinity = bool(affinity)
+        self.processes = max(1, int(processes))
+
+    def plan(self, slot=None, processes=None):
+        """CPUs (None = unchanged) and thread counts for the process in `slot`"""
+        processes = max(1, int(processes or self.processes))
+        cpus = available_cpus()
+        pinned = None
+        if self.affinity and slot is not None:
+            pinned = cpu_share(cpus, slot, processes)
+            share = len(pinned)
+        else:
+            share = max(1, len(cpus) // processes)
+        intra = self.intra_op_threads or share
+        inter = self.inter_op_threads or min(2, intra)
+        return {"cpus": pinned, "intra_op_threads": intra, "inter_op_threads": inter}
+
+    def apply(self, slot=None, processes=None, tensorflow=True):
+        """
+        Pin this process and size the TensorFlow thread pools. Must run
+        before TensorFlow executes its first op; later calls only change
+        the affinity. Returns the applied plan.
+        """
+        plan = self.plan(slot, processes)
+        if plan["cpus"] is not None and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, plan["cpus"])
+        if tensorflow:
+            import tensorflow as tf
+
+            try:
+                tf.config.threading.set_intra_op_parallelism_threads(plan["intra_op_threads"])
+                tf.config.threading.set_inter_op_parallelism_threads(plan["inter_op_threads"])
+            except RuntimeError as e:
+                print(f"TensorFlow thread pools already created, keeping them: {e}")
+        return plan
+
+
+def cpu_threads_from_env(processes=1):
+    return CpuThreadConfig(
+        intra_op_threads=int(os.getenv("TF_INTRA_OP_THREADS", "0")),
+        inter_op_threads=int(os.getenv("TF_INTER_OP_THREADS", "0")),
+        affinity=os.getenv("CPU_AFFINITY", "0") == "1",
+        processes=processes,
+    )
@@ -0,0 +1,117 @@
+import os
+
+from services.batching import BucketedBatchScheduler
+
+
+class DecodingProfile:
+    """
+    A named set of generation settings.
+
+    `num_beams` is passed to the engine (None = the model's
+    generation_config default). `new_tokens_ratio` and `new_tokens_margin`
+    bound generation length relative to the input length, and
+    `ms_per_token` is a rough cost of one decoding step, used to check a
+    request against its latency budget.
+    """
+
+    def __init__(self, name, num_beams=None, new_tokens_ratio=1.5, new_tokens_margin=10, ms_per_token=20.0):
+        self.name = name
+        self.num_beams = num_beams
+        self.new_tokens_ratio = new_tokens_ratio
+        self.new_tokens_margin = new_tokens_margin
+        self.ms_per_token = ms_per_token
+
+    def expected_new_tokens(self, input_tokens):
+        return int(input_tokens * self.new_tokens_ratio) + self.new_tokens_margin
+
+    def estimate_ms(self, input_tokens):
+        return self.expected_new_tokens(input_tokens) * self.ms_per_token
+
+
+class DecodingPlan:
+    """The profile chosen for one request, plus an optional generation cap"""
+
+    def __init__(self, profile, max_new_tokens=None, latency_budget_ms=None):
+        self.profile = profile
+        self.max_new_tokens = max_new_tokens
+        self.latency_budget_ms = latency_budget_ms
+
+    def to_dict(self):
+        return {
+            "profile": self.profile.name,
+            "max_new_tokens": self.max_new_tokens,
+            "latency_budget_ms": self.latency_budget_ms,
+        }
+
+
+def profiles_from_env():
+    """The "fast" (greedy, tight length bound) and "quality" (beam search) profiles"""
+    return {
+        "fast": DecodingProfile(
+            "fast",
+            num_beams=1,
+            new_tokens_ratio=1.2,
+            new_tokens_margin=4,
+            ms_per_token=float(os.getenv("DECODING_FAST_MS_PER_TOKEN", "5")),
+        ),
+        "quality": DecodingProfile(
+            "quality",
+            num_beams=int(os.getenv("DECODING_QUALITY_NUM_BEAMS", "0")) or None,
+            new_tokens_ratio=1.5,
+            new_tokens_margin=10,
+            ms_per_token=float(os.getenv("DECODING_QUALITY_MS_PER_TOKEN", "20")),
+        ),
+    }
+
+
+def length_buckets_from_env():
+    return [int(b) for b in os.getenv("TRANSLATE_LENGTH_BUCKETS", "8,16,32,64,128").split(",") if b.strip()]
+
+
+def build_profile_schedulers(engine, profiles, boundaries, max_batch_size=16, batch_window_ms=5):
+    """One length-bucketed batch scheduler per decoding profile, keyed by profile name"""
+    return {
+        name: BucketedBatchScheduler(
+            engine.translate_batch,
+            engine.count_tokens,
+            boundaries=boundaries,
+            max_batch_size=max_batch_size,
+            batch_window_ms=batch_window_ms,
+            new_tokens_ratio=profile.new_tokens_ratio,
+            new_tokens_margin=profile.new_tokens_margin,
+            batch_options={"num_beams": profile.num_beams},
+        )
+        for name, profile in profiles.items()
+    }
+
+
+def choose_decoding(profiles, input_tokens, requested=None, latency_budget_ms=None, default="quality"):
+    """
+    Pick the decoding plan for a request.
+
+    Without a budget the requested (or default) profile runs unchanged.
+    With a budget the requested profile is kept if its estimate fits;
+    otherwise the server falls back to the cheapest profile and, if even
+    that does not fit, caps max_new_tokens to what the budget allows.
+    Raises ValueError for unknown profiles or a non-positive budget.
+    """
+    name = requested or default
+    if name not in profiles:
+        raise ValueError(f"Unknown decoding profile '{name}'. Available: {', '.join(profiles)}")
+    profile = profiles[name]
+    if latency_budget_ms is None:
+        return DecodingPlan(profile)
+
+    latency_budget_ms = float(latency_budget_ms)
+    if latency_budget_ms <= 0:
+        raise ValueError("latency_budget_ms must be positive")
+
+    if profile.estimate_ms(input_tokens) <= latency_budget_ms:
+        return DecodingPlan(profile, latency_budget_ms=latency_budget_ms)
+
+    cheapest = min(profiles.values(), key=lambda p: p.ms_per_token)
+    if cheapest.estimate_ms(input_tokens) <= latency_budget_ms:
+        return DecodingPlan(cheapest, latency_budget_ms=latency_budget_ms)
+
+    max_new_tokens = max(1, int(latency_budget_ms / cheapest.ms_per_token))
+    return DecodingPlan(cheapest, max_new_tokens=max_new_tokens, latency_budget_ms=latency_budget_ms)
@@ -0,0 +1,389 @@
+import gc
+import hashlib
+import os
+import threading
+
+import numpy as np
+
+from services.fast_tokenizer import load_tokenizer
+from services.metrics import INFERENCE_STAGE_SECONDS, timed
+from services.model_weights import MappedWeights, has_mmap_weights
+from services.translation_cache import model_fingerprint
+
+
+class TranslationEngine:
+    """
+    Interface for translation backends.
+
+    An engine owns the tokenizer and model for one model directory and
+    translates lists of texts in a single call. `fingerprint` identifies the
+    exact model/backend combination so caches never mix outputs of
+    different engines.
+
+    The constructor only prepares fork-safe state (tokenizer, mapped weight
+    files). The runtime model is created by `load()` in the process that
+    uses it, so an engine can be built in the gunicorn master and shared by
+    forked workers. `unload()` drops it again, and `memory_bytes` estimates
+    what it costs while loaded.
+    """
+
+    name = None
+    # Batch sizes the warmup should run; engines that compile per shape
+    # override this with the sizes they pad batches to
+    warmup_batch_sizes = (1,)
+
+    def __init__(self, model_dir):
+        self.model_dir = model_dir
+        self.tokenizer = None
+        self._load_lock = threading.Lock()
+        self._loaded_pid = None
+
+    @property
+    def loaded(self):
+        return self._loaded_pid == os.getpid()
+
+    def load(self):
+        """Create the runtime model in the current process (idempotent)"""
+        with self._load_lock:
+            if self._loaded_pid != os.getpid():
+                self._load_model()
+                self._loaded_pid = os.getpid()
+
+    def unload(self):
+        """Drop the runtime model; the next translation loads it again"""
+        with self._load_lock:
+            if self._loaded_pid == os.getpid():
+                self._unload_model()
+                self._loaded_pid = None
+                gc.collect()
+
+    @property
+    def memory_bytes(self):
+        """Approximate memory held by the loaded runtime model"""
+        return 0
+
+    @property
+    def max_length(self):
+        return self.tokenizer.model_max_length
+
+    @property
+    def fingerprint(self):
+        return model_fingerprint(self.model_dir)
+
+    def count_tokens(self, text):
+        return len(self.tokenizer.tokenize(text))
+
+    def translate_batch(self, texts, max_new_tokens=None, num_beams=None):
+        """
+        Translate a list of texts and return the translations in order.
+        `max_new_tokens` caps generation length and `num_beams` sets the
+        beam width (None = model default for both).
+        """
+        self.load()
+        return self._translate_batch(texts, max_new_tokens, num_beams)
+
+    def _load_model(self):
+        raise NotImplementedError
+
+    def _unload_model(self):
+        raise NotImplementedError
+
+    def _translate_batch(self, texts, max_new_tokens, num_beams):
+        raise NotImplementedError
+
+
+class TFMarianEngine(TranslationEngine):
+    """
+    Default backend: TFMarianMTModel on TensorFlow.
+    When `weights_dir` holds weights exported by export_mmap_weights.py they
+    are mapped from the page cache instead of parsed out of tf_model.h5.
+
+    With `xla=True` generation runs through `tf.function(jit_compile=True)`.
+    Inputs are padded to power-of-two lengths and batches to one of
+    `xla_batch_sizes`, so only a small fixed set of graphs is ever compiled
+    (the warmup compiles them before traffic arrives). If XLA generation
+    fails the engine falls back to eager generate.
+
+    `weights_dtype="float16"` builds the model with float16 variables,
+    halving the weight memory of every worker. Quantized weight files
+    (export_mmap_weights.py --quantize) are dequantized into the variables'
+    dtype when the model loads.
+    """
+
+    name = "tf"
+
+    def __init__(self, model_dir, weights_dir=None, xla=False, xla_batch_sizes=(1, 4, 16), weights_dtype="float32"):
+        if weights_dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported weights_dtype '{weights_dtype}' (float32 or float16)")
+        super().__init__(model_dir)
+        self.tokenizer = load_tokenizer(model_dir)
+        self.model = None
+        weights_dir = weights_dir or os.path.join(model_dir, "mmap_weights")
+        self.mapped_weights = MappedWeights(weights_dir) if has_mmap_weights(weights_dir) else None
+        self.xla = xla
+        self.xla_batch_sizes = sorted(set(int(size) for size in xla_batch_sizes))
+        self._xla_generate = None
+        self.weights_dtype = weights_dtype
+
+    @property
+    def fingerprint(self):
+        quantization = self.mapped_weights.quantization if self.mapped_weights else None
+        if quantization is None and self.weights_dtype == "float32":
+            return model_fingerprint(self.model_dir)
+        # Lossy weights produce different translations: keep their cache
+        # entries apart from the float32 model's
+        parts = [model_fingerprint(self.model_dir), self.name, self.weights_dtype,
+                 quantization or "none", self.mapped_weights.digest if self.mapped_weights else ""]
+        return hashlib.sha1(":".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def warmup_batch_sizes(self):
+        return tuple(self.xla_batch_sizes) if self.xla else (1,)
+
+    @property
+    def memory_bytes(self):
+        # Variables hold every parameter in weights_dtype; without mapped
+        # weights the float32 tf_model.h5 size stands in for the count
+        itemsize = 2 if self.weights_dtype == "float16" else 4
+        if self.mapped_weights is not None:
+            return self.mapped_weights.parameter_count * itemsize
+        path = os.path.join(self.model_dir, "tf_model.h5")
+        return os.path.getsize(path) * itemsize // 4 if os.path.exists(path) else 0
+
+    def _load_model(self):
+        import tensorflow as tf
+        from transformers import MarianConfig, TFMarianMTModel
+
+        if self.mapped_weights is None and self.weights_dtype == "float32":
+            self.model = TFMarianMTModel.from_pretrained(self.model_dir, local_files_only=True)
+        else:
+            config = MarianConfig.from_pretrained(self.model_dir, local_files_only=True)
+            # Layers take their variable dtype from the global policy when
+            # they are created; restore it right after construction
+            policy = tf.keras.mixed_precision.global_policy()
+            tf.keras.mixed_precision.set_global_policy(self.weights_dtype)
+            try:
+                model = TFMarianMTModel(config)
+            finally:
+                tf.keras.mixed_precision.set_global_policy(policy)
+            if self.weights_dtype == "float16":
+                # Recreate the final logits bias as a float32 layer so the
+                # logits (and the scores generate adds them to) are float32
+                model.set_bias({"final_logits_bias": tf.zeros((1, config.vocab_size))})
+            model(model.dummy_inputs, training=False)
+
+            if self.mapped_weights is not None:
+                self.mapped_weights.assign_to(model)
+            else:
+                reference = TFMarianMTModel.from_pretrained(self.model_dir, local_files_only=True)
+                model.set_weights(reference.get_weights())
+                del reference
+            self.model = model
+
+        if self.xla:
+            self._xla_generate = tf.function(self.model.generate, jit_compile=True)
+
+    def _unload_model(self):
+        self.model = None
+        self._xla_generate = None
+
+    def _translate_batch(self, texts, max_new_tokens, num_beams):
+        if self._xla_generate is not None:
+            try:
+                return self._translate_batch_xla(texts, max_new_tokens, num_beams)
+            except Exception as e:
+                print(f"XLA generation failed, falling back to eager generate: {e}")
+                self._xla_generate = None
+
+        with timed(INFERENCE_STAGE_SECONDS, "tokenize", self.name):
+            inputs = self.tokenizer(texts, return_tensors="tf", padding=True, truncation=True)
+        generate_options = {}
+        if max_new_tokens:
+            generate_options["max_new_tokens"] = max_new_tokens
+        if num_beams:
+            generate_options["num_beams"] = num_beams
+        with timed(INFERENCE_STAGE_SECONDS, "generate", self.name):
+            outputs = self.model.generate(**inputs, **generate_options)
+        with timed(INFERENCE_STAGE_SECONDS, "decode", self.name):
+            return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+    def _translate_batch_xla(self, texts, max_new_tokens, num_beams):
+        import tensorflow as tf
+
+        largest = self.xla_batch_sizes[-1]
+        if len(texts) > largest:
+            return [
+                translation
+                for start in range(0, len(texts), largest)
+                for translation in self._translate_batch_xla(texts[start:start + largest], max_new_tokens, num_beams)
+            ]
+
+        with timed(INFERENCE_STAGE_SECONDS, "tokenize", self.name):
+            rows = self.tokenizer(texts, truncation=True)["input_ids"]
+        batch_size = next(size for size in self.xla_batch_sizes if size >= len(rows))
+        length = _padded_length(max(len(row) for row in rows), self.max_length)
+
+        input_ids = np.full((batch_size, length), self.tokenizer.pad_token_id, dtype=np.int32)
+        attention_mask = np.zeros((batch_size, length), dtype=np.int32)
+        for i, row in enumerate(rows):
+            input_ids[i, :len(row)] = row
+            attention_mask[i, :len(row)] = 1
+        # Filler rows hold a lone </s> so no row is fully masked
+        input_ids[len(rows):, 0] = self.tokenizer.eos_token_id
+        attention_mask[len(rows):, 0] = 1
+
+        generate_options = {"max_new_tokens": max_new_tokens or self.max_length}
+        if num_beams:
+            generate_options["num_beams"] = num_beams
+        with timed(INFERENCE_STAGE_SECONDS, "generate", self.name):
+            outputs = self._xla_generate(
+                input_ids=tf.constant(input_ids),
+                attention_mask=tf.constant(attention_mask),
+                **generate_options,
+            )
+        with timed(INFERENCE_STAGE_SECONDS, "decode", self.name):
+            return self.tokenizer.batch_decode(outputs[:len(rows)], skip_special_tokens=True)
+
+
+class CTranslate2Engine(TranslationEngine):
+    """
+    Int8-quantized CTranslate2 backend.
+    The artifact is produced from `model_dir` by export_ctranslate2_model.py;
+    tokenization still uses the original Marian vocabulary.
+    """
+
+    name = "ctranslate2"
+
+    def __init__(self, model_dir, artifact_dir=None, compute_type="int8", intra_threads=0):
+        super().__init__(model_dir)
+        from transformers import GenerationConfig
+
+        self.artifact_dir = artifact_dir or f"{model_dir.rstrip('/')}_ct2"
+        if not os.path.exists(os.path.join(self.artifact_dir, "model.bin")):
+            raise FileNotFoundError(
+                f"No CTranslate2 model in {self.artifact_dir}. "
+                f"Run: python export_ctranslate2_model.py --output-dir {self.artifact_dir}"
+            )
+        self.compute_type = compute_type
+        self.intra_threads = intra_threads
+        self.tokenizer = load_tokenizer(model_dir)
+        generation_config = GenerationConfig.from_pretrained(model_dir, local_files_only=True)
+        self.beam_size = generation_config.num_beams or 1
+        self.translator = None
+
+    def _load_model(self):
+        import ctranslate2
+
+        self.translator = ctranslate2.Translator(
+            self.artifact_dir,
+            device="cpu",
+            compute_type=self.compute_type,
+            intra_threads=self.intra_threads,
+        )
+
+    def _unload_model(self):
+        self.translator = None
+
+    @property
+    def memory_bytes(self):
+        path = os.path.join(self.artifact_dir, "model.bin")
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    @property
+    def fingerprint(self):
+        parts = [model_fingerprint(self.model_dir), model_fingerprint(self.artifact_dir), self.name, self.compute_type]
+        return hashlib.sha1(":".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    def _translate_batch(self, texts, max_new_tokens, num_beams):
+        with timed(INFERENCE_STAGE_SECONDS, "tokenize", self.name):
+            encoded = self.tokenizer(texts, truncation=True)["input_ids"]
+            source = [self.tokenizer.convert_ids_to_tokens(ids) for ids in encoded]
+        with timed(INFERENCE_STAGE_SECONDS, "generate", self.name):
+            results = self.translator.translate_batch(
+                source,
+                beam_size=num_beams or self.beam_size,
+                max_decoding_length=min(max_new_tokens or self.max_length, self.max_length),
+            )
+        with timed(INFERENCE_STAGE_SECONDS, "decode", self.name):
+            return self.tokenizer.batch_decode(
+                [self.tokenizer.convert_tokens_to_ids(result.hypotheses[0]) for result in results],
+                skip_special_tokens=True,
+            )
+
+
+class RemoteInferenceEngine(TranslationEngine):
+    """
+    Forwards batches to the inference pool (inference_server.py) over its
+    Unix socket. Only the tokenizer is loaded locally, for segmentation.
+    """
+
+    name = "remote"
+    # The pool's own workers warm up the model (see inference_pool.py)
+    warmup_batch_sizes = ()
+
+    def __init__(self, model_dir, socket_path=None, backend="tf", timeout=60):
+        super().__init__(model_dir)
+        from services.inference_pool import DEFAULT_SOCKET_PATH, InferenceClient
+
+        self.tokenizer = load_tokenizer(model_dir)
+        self.backend = backend
+        self.client = InferenceClient(socket_path or DEFAULT_SOCKET_PATH, timeout=timeout)
+
+    @property
+    def fingerprint(self):
+        parts = [model_fingerprint(self.model_dir), self.name, self.backend]
+        return hashlib.sha1(":".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    def _load_model(self):
+        pass
+
+    def _unload_model(self):
+        pass
+
+    def _translate_batch(self, texts, max_new_tokens, num_beams):
+        return self.client.translate_batch(texts, max_new_tokens=max_new_tokens, num_beams=num_beams)
+
+
+ENGINES = {
+    TFMarianEngine.name: TFMarianEngine,
+    CTranslate2Engine.name: CTranslate2Engine,
+    RemoteInferenceEngine.name: RemoteInferenceEngine,
+}
+
+
+def _padded_length(length, limit):
+    padded = 8
+    while padded < length:
+        padded *= 2
+    return min(padded, limit)
+
+
+def load_engine(name, model_dir, **options):
+    """Create the engine registered under `name` (see ENGINES)"""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown translation engine '{name}'. Available: {', '.join(ENGINES)}")
+    return ENGINES[name](model_dir, **options)
+
+
+def engine_options_from_env(name):
+    """Read backend-specific options from environment variables"""
+    if name == TFMarianEngine.name:
+        return {
+            "weights_dir": os.getenv("TF_MMAP_WEIGHTS_DIR") or None,
+            "xla": os.getenv("TF_XLA_GENERATE", "0") == "1",
+            "xla_batch_sizes": [int(size) for size in os.getenv("TF_XLA_BATCH_SIZES", "1,4,16").split(",") if size.strip()],
+            "weights_dtype": os.getenv("TF_WEIGHTS_DTYPE", "float32"),
+        }
+    if name == CTranslate2Engine.name:
+        return {
+            "artifact_dir": os.getenv("CT2_MODEL_DIR") or None,
+            "compute_type": os.getenv("CT2_COMPUTE_TYPE", "int8"),
+            "intra_threads": int(os.getenv("CT2_INTRA_THREADS", "0")),
+        }
+    if name == RemoteInferenceEngine.name:
+        return {
+            "socket_path": os.getenv("INFERENCE_SOCKET") or None,
+            "backend": os.getenv("INFERENCE_ENGINE", "tf"),
+            "timeout": float(os.getenv("INFERENCE_TIMEOUT", "60")),
+        }
+    return {}
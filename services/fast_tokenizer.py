@@ -0,0 +1,179 @@
+import os
+
+import numpy as np
+
+
+class FastMarianTokenizer:
+    """
+    Rust-backed (`tokenizers`) replacement for MarianTokenizer's hot paths.
+
+    The source SentencePiece model (source.spm) is converted into a
+    `tokenizers` Unigram model with the same normalizer and whitespace
+    handling, and its piece ids are mapped to vocab.json ids with one
+    array lookup, so a whole batch is encoded in a single Rust call.
+    Decoding maps vocab ids straight to pieces and hands them to the target
+    SentencePiece model once per sequence.
+
+    The slow tokenizer it was built from is kept for configuration
+    (special tokens, model_max_length, clean-up) and for the rare inputs
+    the fast path does not cover: language codes (`>>xx<<`), special token
+    strings inside the text, and decoding without skip_special_tokens.
+    """
+
+    def __init__(self, slow_tokenizer):
+        self.slow = slow_tokenizer
+        self.model_max_length = slow_tokenizer.model_max_length
+        self.pad_token_id = slow_tokenizer.pad_token_id
+        self.eos_token_id = slow_tokenizer.eos_token_id
+        self.unk_token_id = slow_tokenizer.unk_token_id
+        self.all_special_ids = set(slow_tokenizer.all_special_ids)
+        self.clean_up_tokenization_spaces = slow_tokenizer.clean_up_tokenization_spaces
+        self._special_tokens = list(slow_tokenizer.all_special_tokens)
+        self._language_code_re = slow_tokenizer.language_code_re
+
+        self._source = convert_spm(slow_tokenizer.spm_files[0])
+        encoder = slow_tokenizer.encoder
+        size = self._source.get_vocab_size(with_added_tokens=True)
+        self._to_vocab = np.array(
+            [encoder.get(self._source.id_to_token(i), self.unk_token_id) for i in range(size)],
+            dtype=np.int64,
+        )
+        self._id_to_token = [None] * (max(slow_tokenizer.decoder) + 1)
+        for index, token in slow_tokenizer.decoder.items():
+            self._id_to_token[index] = token
+        self._spm_target = slow_tokenizer.spm_target
+
+    def __call__(self, texts, return_tensors=None, padding=False, truncation=False):
+        """Batch-encode like `MarianTokenizer(texts, ...)`; returns input_ids and attention_mask"""
+        single = isinstance(texts, str)
+        ids = self.encode_batch([texts] if single else list(texts), truncation=truncation)
+
+        if padding and ids:
+            width = max(len(row) for row in ids)
+            input_ids = np.full((len(ids), width), self.pad_token_id, dtype=np.int32)
+            attention_mask = np.zeros((len(ids), width), dtype=np.int32)
+            for i, row in enumerate(ids):
+                input_ids[i, :len(row)] = row
+                attention_mask[i, :len(row)] = 1
+        else:
+            input_ids = [list(row) for row in ids]
+            attention_mask = [[1] * len(row) for row in ids]
+
+        if return_tensors == "tf":
+            import tensorflow as tf
+
+            input_ids, attention_mask = tf.constant(input_ids), tf.constant(attention_mask)
+        elif return_tensors == "np":
+            input_ids, attention_mask = np.asarray(input_ids), np.asarray(attention_mask)
+        elif return_tensors is not None:
+            raise ValueError(f"Unsupported return_tensors '{return_tensors}'")
+        elif padding:
+            input_ids, attention_mask = input_ids.tolist(), attention_mask.tolist()
+
+        if single and return_tensors is None:
+            input_ids, attention_mask = input_ids[0], attention_mask[0]
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+    def encode_batch(self, texts, truncation=False):
+        """vocab.json ids (ending in </s>) for every text, as lists"""
+        fast = [i for i, text in enumerate(texts) if not self._needs_slow_path(text)]
+        encodings = self._source.encode_batch([texts[i] for i in fast], add_special_tokens=False)
+
+        ids = [None] * len(texts)
+        for i, encoding in zip(fast, encodings):
+            ids[i] = self._to_vocab[encoding.ids].tolist()
+        for i, row in enumerate(ids):
+            if row is None:
+                ids[i] = self.slow.convert_tokens_to_ids(self.slow.tokenize(texts[i]))
+
+        limit = self.model_max_length - 1 if truncation else None
+        return [row[:limit] + [self.eos_token_id] for row in ids]
+
+    def tokenize(self, text):
+        if self._needs_slow_path(text):
+            return self.slow.tokenize(text)
+        return self._source.encode(text, add_special_tokens=False).tokens
+
+    def batch_decode(self, sequences, skip_special_tokens=False, **kwargs):
+        """Decode a batch of id sequences (lists, numpy or tf tensors)"""
+        if not skip_special_tokens or kwargs:
+            return self.slow.batch_decode(sequences, skip_special_tokens=skip_special_tokens, **kwargs)
+
+        if hasattr(sequences, "numpy"):
+            sequences = sequences.numpy()
+        texts = []
+        for row in sequences:
+            pieces = [self._token_for(int(index)) for index in row if int(index) not in self.all_special_ids]
+            text = self._spm_target.decode_pieces(pieces).replace("▁", " ").strip()
+            if self.clean_up_tokenization_spaces:
+                text = self.slow.clean_up_tokenization(text)
+            texts.append(text)
+        return texts
+
+    def decode(self, token_ids, skip_special_tokens=False, **kwargs):
+        return self.batch_decode([token_ids], skip_special_tokens=skip_special_tokens, **kwargs)[0]
+
+    def convert_ids_to_tokens(self, ids):
+        return [self._token_for(int(index)) for index in ids]
+
+    def convert_tokens_to_ids(self, tokens):
+        return self.slow.convert_tokens_to_ids(tokens)
+
+    def _token_for(self, index):
+        token = self._id_to_token[index] if 0 <= index < len(self._id_to_token) else None
+        return self.slow.unk_token if token is None else token
+
+    def _needs_slow_path(self, text):
+        return self._language_code_re.search(text) is not None or any(
+            token in text for token in self._special_tokens
+        )
+
+
+def convert_spm(spm_path):
+    """Build a `tokenizers` Unigram tokenizer equivalent to a SentencePiece model"""
+    from tokenizers import Regex, Tokenizer, normalizers, pre_tokenizers
+    from tokenizers.models import Unigram
+    from transformers.convert_slow_tokenizer import import_protobuf
+
+    model_pb2 = import_protobuf()
+    proto = model_pb2.ModelProto()
+    with open(spm_path, "rb") as f:
+        proto.ParseFromString(f.read())
+    if proto.trainer_spec.model_type != 1:
+        raise ValueError(f"{spm_path} is not a Unigram SentencePiece model")
+
+    tokenizer = Tokenizer(Unigram(
+        [(piece.piece, piece.score) for piece in proto.pieces],
+        unk_id=proto.trainer_spec.unk_id,
+        byte_fallback=proto.trainer_spec.byte_fallback,
+    ))
+
+    # SentencePiece: charsmap normalization (e.g. nmt_nfkc), then remove
+    # extra whitespace, then a "▁" word prefix
+    spec = proto.normalizer_spec
+    steps = []
+    if spec.precompiled_charsmap:
+        steps.append(normalizers.Precompiled(spec.precompiled_charsmap))
+    if spec.remove_extra_whitespaces:
+        steps += [normalizers.Replace(Regex(" {2,}"), " "), normalizers.Strip()]
+    if steps:
+        tokenizer.normalizer = normalizers.Sequence(steps)
+    tokenizer.pre_tokenizer = pre_tokenizers.Metaspace(
+        replacement="▁",
+        prepend_scheme="always" if spec.add_dummy_prefix else "never",
+        split=proto.trainer_spec.split_by_whitespace,
+    )
+    return tokenizer
+
+
+def load_tokenizer(model_dir):
+    """
+    The tokenizer for `model_dir`: FastMarianTokenizer unless FAST_TOKENIZER=0
+    (then the slow MarianTokenizer).
+    """
+    from transformers import MarianTokenizer
+
+    slow = MarianTokenizer.from_pretrained(model_dir, local_files_only=True)
+    if os.getenv("FAST_TOKENIZER", "1") == "0":
+        return slow
+    return FastMarianTokenizer(slow)
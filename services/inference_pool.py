@@ -0,0 +1,334 @@
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+
+DEFAULT_SOCKET_PATH = "/tmp/somali_translator_inference.sock"
+
+# Every message is a 4-byte big-endian length followed by a JSON document
+LENGTH = struct.Struct(">I")
+
+
+def send_message(sock, message):
+    payload = json.dumps(message).encode("utf-8")
+    sock.sendall(LENGTH.pack(len(payload)) + payload)
+
+
+def recv_message(sock):
+    header = _recv_exactly(sock, LENGTH.size)
+    if header is None:
+        return None
+    (length,) = LENGTH.unpack(header)
+    payload = _recv_exactly(sock, length)
+    if payload is None:
+        return None
+    return json.loads(payload.decode("utf-8"))
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _worker_main(index, task_queue, result_queue, busy, engine_name, model_dir, engine_options,
+                 max_batch_size, batch_window, cpu_threads=None):
+    """Inference process: owns one engine and serves batches from the task queue"""
+    from services.engines import load_engine
+    from services.warmup import warmup_from_env
+
+    if cpu_threads is not None:
+        cpu_threads.apply(index, tensorflow=engine_name == "tf")
+    engine = load_engine(engine_name, model_dir, **engine_options)
+    engine.load()
+    warmup_from_env(engine).run()
+    print(f"Inference worker {index} ready (pid {os.getpid()}, engine {engine_name})")
+
+    running = True
+    while running:
+        task = task_queue.get()
+        if task is None:
+            break
+        tasks = [task]
+        size = len(task[1])
+
+        # Drain more tasks for the batch window, like the web-side scheduler
+        deadline = time.monotonic() + batch_window
+        while size < max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                task = task_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if task is None:
+                running = False
+                break
+            tasks.append(task)
+            size += len(task[1])
+
+        busy[index] = 1
+        try:
+            _run_drained(engine, tasks, max_batch_size, result_queue)
+        finally:
+            busy[index] = 0
+
+
+def _run_drained(engine, tasks, max_batch_size, result_queue):
+    """
+    Run tasks drained from the queue. Only tasks with the same beam width
+    and generation bound share a generate call: the bounds carry the web
+    side's length buckets and latency caps.
+    """
+    groups = {}
+    for task in tasks:
+        groups.setdefault((task[3], task[2]), []).append(task)
+    for (num_beams, max_new_tokens), group in groups.items():
+        _run_tasks(engine, group, num_beams, max_new_tokens, max_batch_size, result_queue)
+
+
+def _run_tasks(engine, tasks, num_beams, max_new_tokens, max_batch_size, result_queue):
+    texts = [text for _, task_texts, _, _ in tasks for text in task_texts]
+    try:
+        results = []
+        for start in range(0, len(texts), max_batch_size):
+            results.extend(engine.translate_batch(texts[start:start + max_batch_size], max_new_tokens, num_beams))
+        position = 0
+        for task_id, task_texts, _, _ in tasks:
+            result_queue.put((task_id, results[position:position + len(task_texts)], None))
+            position += len(task_texts)
+    except Exception as e:
+        for task_id, _, _, _ in tasks:
+            result_queue.put((task_id, None, str(e)))
+
+
+class InferenceServer:
+    """
+    Pool of inference processes behind a Unix socket.
+
+    Web workers send translation requests to the socket; the server queues
+    them for `pool_size` processes that each own a copy of the model and
+    batch whatever is waiting. The pool size is independent of the number
+    of web workers. `cpu_threads` (a CpuThreadConfig) sizes the thread
+    pools of every process and can pin each to its own cores.
+    """
+
+    def __init__(self, socket_path, pool_size=1, engine_name="tf", model_dir="./amiin_model",
+                 engine_options=None, max_batch_size=16, batch_window_ms=5, cpu_threads=None):
+        self.socket_path = socket_path
+        self.pool_size = max(1, int(pool_size))
+        self.engine_name = engine_name
+        self.model_dir = model_dir
+        self.engine_options = engine_options or {}
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.batch_window = max(0.0, float(batch_window_ms)) / 1000.0
+        self.cpu_threads = cpu_threads
+
+        # Spawn instead of fork: the server process runs threads
+        context = multiprocessing.get_context("spawn")
+        self._context = context
+        self.task_queue = context.Queue()
+        self.result_queue = context.Queue()
+        self.busy = context.Array("b", self.pool_size)
+        self.processes = []
+
+        self._task_ids = itertools.count(1)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self.completed_tasks = 0
+        self.failed_tasks = 0
+        self.completed_texts = 0
+        self.started_at = None
+
+    def start_workers(self):
+        for index in range(self.pool_size):
+            process = self._context.Process(
+                target=_worker_main,
+                args=(
+                    index, self.task_queue, self.result_queue, self.busy,
+                    self.engine_name, self.model_dir, self.engine_options,
+                    self.max_batch_size, self.batch_window, self.cpu_threads,
+                ),
+                name=f"inference-worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+
+    def serve_forever(self):
+        self.started_at = time.time()
+        self.start_workers()
+        threading.Thread(target=self._dispatch_results, name="inference-results", daemon=True).start()
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        listener.listen(128)
+        print(f"Inference pool ({self.pool_size} workers) listening on {self.socket_path}")
+
+        try:
+            while True:
+                conn, _ = listener.accept()
+                threading.Thread(target=self._handle_connection, args=(conn,), daemon=True).start()
+        finally:
+            listener.close()
+            self.shutdown()
+
+    def shutdown(self):
+        for _ in self.processes:
+            self.task_queue.put(None)
+        for process in self.processes:
+            process.join(timeout=5)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def stats(self):
+        with self._pending_lock:
+            in_flight = len(self._pending)
+        try:
+            queue_depth = self.task_queue.qsize()
+        except NotImplementedError:
+            queue_depth = None
+        return {
+            "pool_size": self.pool_size,
+            "engine": self.engine_name,
+            "alive_workers": sum(1 for process in self.processes if process.is_alive()),
+            "busy_workers": sum(self.busy[:]),
+            "queue_depth": queue_depth,
+            "in_flight": in_flight,
+            "completed_tasks": self.completed_tasks,
+            "failed_tasks": self.failed_tasks,
+            "completed_texts": self.completed_texts,
+            "uptime_seconds": time.time() - self.started_at if self.started_at else 0,
+        }
+
+    def _handle_connection(self, conn):
+        write_lock = threading.Lock()
+        try:
+            while True:
+                message = recv_message(conn)
+                if message is None:
+                    break
+                op = message.get("op")
+                if op == "translate":
+                    texts = [str(text) for text in message.get("texts", [])]
+                    task_id = next(self._task_ids)
+                    with self._pending_lock:
+                        self._pending[task_id] = (conn, write_lock, message.get("id"))
+                    self.task_queue.put((task_id, texts, message.get("max_new_tokens"), message.get("num_beams")))
+                elif op == "stats":
+                    with write_lock:
+                        send_message(conn, {"id": message.get("id"), "stats": self.stats()})
+                else:
+                    with write_lock:
+                        send_message(conn, {"id": message.get("id"), "error": f"Unknown op '{op}'"})
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def _dispatch_results(self):
+        while True:
+            try:
+                task_id, results, error = self.result_queue.get()
+            except (EOFError, OSError):
+                return  # Queue closed during shutdown
+            with self._pending_lock:
+                pending = self._pending.pop(task_id, None)
+            if error is None:
+                self.completed_tasks += 1
+                self.completed_texts += len(results)
+            else:
+                self.failed_tasks += 1
+            if pending is None:
+                continue
+            conn, write_lock, request_id = pending
+            response = {"id": request_id, "results": results} if error is None else {"id": request_id, "error": error}
+            try:
+                with write_lock:
+                    send_message(conn, response)
+            except OSError:
+                pass  # Client went away; drop the result
+
+
+class InferenceClient:
+    """
+    Client used by web workers to talk to the inference pool.
+    Each thread keeps its own connection; connections are reopened after
+    fork or on error.
+    """
+
+    def __init__(self, socket_path, timeout=60):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._request_ids = itertools.count(1)
+
+    def translate_batch(self, texts, max_new_tokens=None, num_beams=None):
+        response = self._call({
+            "op": "translate",
+            "texts": list(texts),
+            "max_new_tokens": max_new_tokens,
+            "num_beams": num_beams,
+        })
+        return response["results"]
+
+    def stats(self):
+        return self._call({"op": "stats"})["stats"]
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "pid", None) == os.getpid():
+            return conn
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.settimeout(self.timeout)
+        conn.connect(self.socket_path)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+        self._local.conn = None
+
+    def _call(self, message):
+        message["id"] = next(self._request_ids)
+        try:
+            conn = self._connection()
+            send_message(conn, message)
+            response = recv_message(conn)
+        except OSError:
+            self._reset()
+            raise
+        if response is None:
+            self._reset()
+            raise ConnectionError("Inference pool closed the connection")
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response
+
+
+def client_from_env():
+    """Return an InferenceClient when the inference pool is configured, else None"""
+    socket_path = os.getenv("INFERENCE_SOCKET")
+    if not socket_path and os.getenv("TRANSLATION_ENGINE") != "remote":
+        return None
+    return InferenceClient(socket_path or DEFAULT_SOCKET_PATH, timeout=float(os.getenv("INFERENCE_TIMEOUT", "60")))
@@ -0,0 +1,141 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+# Seconds; covers sub-millisecond cache hits up to slow beam searches
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram with one series per label value tuple"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self):
+        """{labels: (per-bucket counts, sum, count)}"""
+        with self._lock:
+            return {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.snapshot().items()):
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = ",".join(pairs + [f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f"{{{','.join(pairs)}}}" if pairs else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return "\n".join(lines)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """The histogram registered under `name`, created on first use"""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, documentation, labelnames, buckets)
+            return self._metrics[name]
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Metrics live in the process that records them: under gunicorn every
+# worker exposes its own
+metrics = MetricsRegistry()
+TRANSLATE_STAGE_SECONDS = metrics.histogram(
+    "translate_stage_seconds", "Time spent in each stage of a translate request", ("stage",))
+DETECTION_STAGE_SECONDS = metrics.histogram(
+    "language_detection_stage_seconds", "Time spent in each language detection method", ("stage",))
+INFERENCE_STAGE_SECONDS = metrics.histogram(
+    "inference_stage_seconds", "Time spent in each stage of a model batch", ("engine", "stage"))
+
+
+class StageTimings:
+    """Seconds per stage of one request (or one model batch), in first-seen order"""
+
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def merge_slowest(self, stages):
+        """Fold in stages that ran concurrently (e.g. batches): keep the slowest per stage"""
+        for stage, seconds in stages.items():
+            self.stages[stage] = max(self.stages.get(stage, 0.0), seconds)
+
+    def server_timing(self):
+        """Value of a Server-Timing header (durations in milliseconds)"""
+        return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in self.stages.items())
+
+
+_current_timings = ContextVar("stage_timings", default=None)
+
+
+def start_timings():
+    """Collect the stages timed from now on in this thread/context"""
+    timings = StageTimings()
+    _current_timings.set(timings)
+    return timings
+
+
+def current_timings():
+    return _current_timings.get()
+
+
+class timed:
+    """
+    Time a block with perf_counter: the duration is observed in
+    `histogram` (with `labels`, the stage last) and added to the current
+    StageTimings as `name` (the stage by default).
+    """
+
+    def __init__(self, histogram, stage, *labels, name=None):
+        self.histogram = histogram
+        self.labels = labels + (stage,)
+        self.name = name or stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self.start
+        self.histogram.observe(self.seconds, *self.labels)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add(self.name, self.seconds)
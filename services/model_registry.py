@@ -0,0 +1,316 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+MB = 1024 * 1024
+
+
+class ModelSpec:
+    """
+    One servable model: a name, a translation direction (`source` ->
+    `target` language codes), the engine that runs it and its options.
+    `pinned` models are loaded at startup and never evicted; `memory_mb`
+    overrides the engine's own memory estimate.
+    """
+
+    def __init__(self, name, model_dir, source="so", target="en", engine="tf", options=None, pinned=False,
+                 memory_mb=None):
+        self.name = name
+        self.model_dir = model_dir
+        self.source = source
+        self.target = target
+        self.engine = engine
+        self.options = dict(options or {})
+        self.pinned = bool(pinned)
+        self.memory_mb = memory_mb
+
+    @property
+    def direction(self):
+        return f"{self.source}-{self.target}"
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["name"],
+            data["model_dir"],
+            source=data.get("source", "so"),
+            target=data.get("target", "en"),
+            engine=data.get("engine", "tf"),
+            options=data.get("options"),
+            pinned=data.get("pinned", False),
+            memory_mb=data.get("memory_mb"),
+        )
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "direction": self.direction,
+            "source": self.source,
+            "target": self.target,
+            "engine": self.engine,
+            "pinned": self.pinned,
+        }
+
+
+class ServedModel:
+    """What the app needs to translate with one model: its engine, batch schedulers and warmup"""
+
+    def __init__(self, spec, engine, schedulers, warmup=None, max_segment_tokens=None):
+        self.spec = spec
+        self.engine = engine
+        self.schedulers = schedulers
+        self.warmup = warmup
+        self.max_segment_tokens = max_segment_tokens or engine.max_length
+        # Computing a fingerprint hashes the model's config files: do it once
+        self.fingerprint = engine.fingerprint
+
+
+class ModelUnavailable(Exception):
+    """
+    The model cannot be served now: the memory budget is held by models in
+    use or pinned, or building its engine failed
+    """
+
+
+class _Entry:
+    def __init__(self, spec):
+        self.spec = spec
+        self.served = None
+        self.memory_bytes = 0
+        self.resident = False
+        self.in_use = 0
+        self.last_used = 0.0
+        self.loads = 0
+        self.evictions = 0
+        # Held while the engine loads or unloads
+        self.load_lock = threading.Lock()
+
+
+class ModelRegistry:
+    """
+    Translation models keyed by name (and reachable by direction), loaded
+    on demand within a total memory budget.
+
+    `build(spec)` creates a ServedModel; it runs once per model, on first
+    use, and only prepares fork-safe state. The runtime model is loaded by
+    `acquire()` and stays resident until it has to make room: when loading
+    a model would exceed `memory_budget_mb`, the least recently used models
+    that are neither pinned nor in use are unloaded first. A budget of 0
+    means no limit.
+    """
+
+    def __init__(self, specs, build, memory_budget_mb=0, default=None):
+        self._entries = OrderedDict()
+        for spec in specs:
+            if spec.name in self._entries:
+                raise ValueError(f"Duplicate model name '{spec.name}'")
+            self._entries[spec.name] = _Entry(spec)
+        if not self._entries:
+            raise ValueError("No translation models configured")
+        self.default = default or next(iter(self._entries))
+        if self.default not in self._entries:
+            raise ValueError(f"Default model '{self.default}' is not configured")
+        self.build = build
+        self.memory_budget = int(float(memory_budget_mb) * MB)
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    @property
+    def names(self):
+        return list(self._entries)
+
+    def resolve(self, selector=None):
+        """
+        Name of the model for `selector`: a model name, a direction such as
+        "so-en" (the default model if it serves that direction, otherwise
+        the first one configured for it) or None for the default model.
+        Raises ValueError for anything else.
+        """
+        if selector is None or selector == "":
+            return self.default
+        if not isinstance(selector, str):
+            raise ValueError("model must be a model name or a direction such as 'so-en'")
+        if selector in self._entries:
+            return selector
+        candidates = [name for name, entry in self._entries.items() if entry.spec.direction == selector]
+        if not candidates:
+            raise ValueError(f"Unknown model '{selector}'. Available: {', '.join(self.describe_selectors())}")
+        return self.default if self.default in candidates else candidates[0]
+
+    def describe_selectors(self):
+        directions = {entry.spec.direction for entry in self._entries.values()}
+        return self.names + sorted(directions - set(self.names))
+
+    def get(self, selector=None):
+        """
+        The ServedModel for `selector`, built if needed but not necessarily
+        loaded. Raises ValueError for an unknown selector and ModelUnavailable
+        when the build fails (it is retried on the next call).
+        """
+        entry = self._entries[self.resolve(selector)]
+        if entry.served is None:
+            with self._build_lock:
+                if entry.served is None:
+                    try:
+                        served = self.build(entry.spec)
+                    except Exception as e:
+                        raise ModelUnavailable(f"Translation model '{entry.spec.name}' could not be built: {e}") from e
+                    if entry.spec.memory_mb is not None:
+                        entry.memory_bytes = int(float(entry.spec.memory_mb) * MB)
+                    else:
+                        entry.memory_bytes = served.engine.memory_bytes
+                    entry.served = served
+        return entry.served
+
+    def acquire(self, selector=None):
+        """
+        Load the model if needed and mark it in use until `release()`;
+        models in use are never evicted. Raises ModelUnavailable when the
+        budget cannot be freed.
+        """
+        served = self.get(selector)
+        entry = self._entries[served.spec.name]
+        with self._lock:
+            entry.in_use += 1
+            entry.last_used = time.monotonic()
+            victims = []
+            if not entry.resident:
+                try:
+                    victims = self._make_room(entry)
+                except ModelUnavailable:
+                    entry.in_use -= 1
+                    raise
+                entry.resident = True
+                entry.loads += 1
+
+        for victim in victims:
+            self._unload(victim, entry)
+        try:
+            with entry.load_lock:
+                served.engine.load()
+        except Exception:
+            with self._lock:
+                entry.resident = False
+                entry.in_use -= 1
+            raise
+        return served
+
+    def _unload(self, victim, entry):
+        """
+        Unload an evicted model, unless another thread acquired it again
+        since it was picked (its load() waits on the same lock)
+        """
+        with victim.load_lock:
+            with self._lock:
+                if victim.resident or victim.in_use:
+                    return
+            print(f"Unloading translation model '{victim.spec.name}' to make room for '{entry.spec.name}'")
+            victim.served.engine.unload()
+
+    def release(self, served):
+        entry = self._entries[served.spec.name]
+        with self._lock:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+
+    def use(self, selector=None):
+        """Context manager around acquire()/release()"""
+        return _InUse(self, selector)
+
+    def _make_room(self, entry):
+        """Pick the models to unload so `entry` fits; they are marked not resident"""
+        if not self.memory_budget:
+            return []
+        used = sum(other.memory_bytes for other in self._entries.values() if other.resident)
+        if used + entry.memory_bytes <= self.memory_budget:
+            return []
+        candidates = sorted(
+            (other for other in self._entries.values()
+             if other.resident and other is not entry and not other.spec.pinned and other.in_use == 0),
+            key=lambda other: other.last_used,
+        )
+        victims = []
+        for victim in candidates:
+            if used + entry.memory_bytes <= self.memory_budget:
+                break
+            victims.append(victim)
+            used -= victim.memory_bytes
+        if used + entry.memory_bytes > self.memory_budget:
+            raise ModelUnavailable(
+                f"Model '{entry.spec.name}' needs {entry.memory_bytes / MB:.0f} MB; "
+                f"the {self.memory_budget / MB:.0f} MB budget is held by pinned or busy models"
+            )
+        for victim in victims:
+            victim.resident = False
+            victim.evictions += 1
+        return victims
+
+    def pinned_models(self):
+        return [self.get(name) for name, entry in self._entries.items() if entry.spec.pinned]
+
+    def load_pinned(self):
+        """Load every pinned model in this process and return them"""
+        served_models = []
+        for served in self.pinned_models():
+            self.acquire(served.spec.name)
+            self.release(served)
+            served_models.append(served)
+        return served_models
+
+    def stats(self):
+        with self._lock:
+            models = []
+            for name, entry in self._entries.items():
+                models.append({
+                    **entry.spec.to_dict(),
+                    "default": name == self.default,
+                    "loaded": entry.resident and entry.served is not None and entry.served.engine.loaded,
+                    "memory_mb": round(entry.memory_bytes / MB, 1) if entry.served is not None else None,
+                    "in_use": entry.in_use,
+                    "loads": entry.loads,
+                    "evictions": entry.evictions,
+                })
+            return {
+                "default": self.default,
+                "memory_budget_mb": round(self.memory_budget / MB, 1) if self.memory_budget else None,
+                "resident_mb": round(sum(e.memory_bytes for e in self._entries.values() if e.resident) / MB, 1),
+                "models": models,
+            }
+
+
+class _InUse:
+    def __init__(self, registry, selector):
+        self.registry = registry
+        self.selector = selector
+        self.served = None
+
+    def __enter__(self):
+        self.served = self.registry.acquire(self.selector)
+        return self.served
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.release(self.served)
+
+
+def registry_config_from_env(default_dir="./amiin_model", default_engine="tf"):
+    """
+    (specs, default name, memory budget in MB) from MODEL_REGISTRY_PATH
+    (./models.json by default). Without that file the registry serves the
+    single so->en model in `default_dir`, pinned, exactly as before.
+    MODEL_MEMORY_BUDGET_MB overrides the file's budget.
+    """
+    path = os.getenv("MODEL_REGISTRY_PATH", "./models.json")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        specs = [ModelSpec.from_dict(model) for model in config["models"]]
+        default = config.get("default")
+        budget = config.get("memory_budget_mb", 0)
+    else:
+        specs = [ModelSpec("amiin", default_dir, "so", "en", engine=default_engine, pinned=True)]
+        default = "amiin"
+        budget = 0
+    budget = float(os.getenv("MODEL_MEMORY_BUDGET_MB", budget or 0))
+    return specs, default, budget
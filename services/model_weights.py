@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+MANIFEST_FILE = "manifest.json"
+WEIGHTS_FILE = "weights.bin"
+ALIGNMENT = 64
+
+QUANTIZATION_SCHEMES = ("float16", "int8")
+# Vectors (biases, LayerNorm) and tiny tensors stay float32 under int8
+MIN_INT8_SIZE = 1024
+
+
+def export_mmap_weights(model, output_dir, quantization=None):
+    """
+    Write the model's weights as one flat, aligned binary file plus a JSON
+    manifest so they can later be mapped with `np.memmap` instead of parsed
+    out of HDF5.
+
+    `quantization` stores the float weights in a smaller format:
+    "float16", or "int8" (symmetric, one float32 scale per output channel,
+    for matrices only). Values are dequantized when assigned to a model.
+    """
+    if quantization is not None and quantization not in QUANTIZATION_SCHEMES:
+        raise ValueError(f"Unknown quantization '{quantization}'. Available: {', '.join(QUANTIZATION_SCHEMES)}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = []
+    offset = 0
+
+    with open(os.path.join(output_dir, WEIGHTS_FILE), "wb") as f:
+        def write(array):
+            nonlocal offset
+            padding = -offset % ALIGNMENT
+            f.write(b"\0" * padding)
+            offset += padding
+            start = offset
+            f.write(array.tobytes())
+            offset += array.nbytes
+            return start
+
+        for weight in model.weights:
+            array = np.ascontiguousarray(weight.numpy())
+            entry = {"name": weight.name, "shape": list(array.shape)}
+            if quantization == "int8" and _is_int8_candidate(array):
+                axis = _channel_axis(weight.name, array)
+                values, scales = quantize_int8(array, axis)
+                entry.update(dtype=values.dtype.str, original_dtype=array.dtype.str, quantization="int8",
+                             scale_axis=axis, scale_shape=list(scales.shape))
+                entry["offset"] = write(values)
+                entry["scale_offset"] = write(scales)
+            else:
+                if quantization == "float16" and array.dtype == np.float32:
+                    entry["original_dtype"] = array.dtype.str
+                    array = array.astype(np.float16)
+                entry["dtype"] = array.dtype.str
+                entry["offset"] = write(array)
+            manifest.append(entry)
+
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w") as f:
+        json.dump({"weights": manifest, "total_bytes": offset, "quantization": quantization}, f, indent=2)
+    return output_dir
+
+
+def quantize_int8(array, axis):
+    """Symmetric int8 quantization with one scale per index along `axis`"""
+    reduce_axes = tuple(i for i in range(array.ndim) if i != axis)
+    scales = np.max(np.abs(array), axis=reduce_axes, keepdims=True).astype(np.float32) / 127.0
+    scales[scales == 0] = 1.0
+    values = np.clip(np.rint(array / scales), -127, 127).astype(np.int8)
+    return values, np.ascontiguousarray(scales)
+
+
+def dequantize_int8(values, scales, dtype=np.float32):
+    return (values.astype(np.float32) * scales).astype(dtype)
+
+
+def _is_int8_candidate(array):
+    return array.dtype in (np.float32, np.float16) and array.ndim >= 2 and array.size >= MIN_INT8_SIZE
+
+
+def _channel_axis(name, array):
+    # Dense kernels are (in, out): one scale per output column. Embedding
+    # tables (also the tied output projection) get one scale per token row.
+    return 0 if "shared" in name or "embed" in name else array.ndim - 1
+
+
+def has_mmap_weights(weights_dir):
+    return (
+        os.path.exists(os.path.join(weights_dir, MANIFEST_FILE))
+        and os.path.exists(os.path.join(weights_dir, WEIGHTS_FILE))
+    )
+
+
+class MappedWeights:
+    """
+    Read-only view of exported weights backed by the page cache.
+
+    Mapping the file does not read it; every process that maps the same file
+    shares the same physical pages, and the mapping is fork-safe.
+    """
+
+    def __init__(self, weights_dir):
+        with open(os.path.join(weights_dir, MANIFEST_FILE), "rb") as f:
+            raw = f.read()
+        manifest = json.loads(raw)
+        self.manifest = manifest["weights"]
+        self.quantization = manifest.get("quantization")
+        self.digest = hashlib.sha1(raw).hexdigest()[:16]
+        self._mm = np.memmap(os.path.join(weights_dir, WEIGHTS_FILE), dtype=np.uint8, mode="r")
+        self._entries = {entry["name"]: entry for entry in self.manifest}
+        self.arrays = {}
+        self.scales = {}
+        for entry in self.manifest:
+            self.arrays[entry["name"]] = np.ndarray(
+                shape=tuple(entry["shape"]),
+                dtype=np.dtype(entry["dtype"]),
+                buffer=self._mm,
+                offset=entry["offset"],
+            )
+            if entry.get("quantization") == "int8":
+                self.scales[entry["name"]] = np.ndarray(
+                    shape=tuple(entry["scale_shape"]),
+                    dtype=np.float32,
+                    buffer=self._mm,
+                    offset=entry["scale_offset"],
+                )
+
+    @property
+    def parameter_count(self):
+        return sum(int(np.prod(entry["shape"])) for entry in self.manifest)
+
+    def value(self, name, dtype=None):
+        """
+        The weight as an array of `dtype` (default: its original dtype).
+        Unquantized weights of the right dtype are returned as mapped views.
+        """
+        entry = self._entries[name]
+        dtype = np.dtype(dtype or entry.get("original_dtype", entry["dtype"]))
+        array = self.arrays[name]
+        if entry.get("quantization") == "int8":
+            return dequantize_int8(array, self.scales[name], dtype)
+        return array if array.dtype == dtype else array.astype(dtype)
+
+    def assign_to(self, model):
+        """Copy the mapped weights into a built Keras model, in the model's dtypes"""
+        weights = model.weights
+        if all(weight.name in self.arrays for weight in weights):
+            names = [weight.name for weight in weights]
+        else:
+            # Variable names depend on the build scope; fall back to order
+            names = [entry["name"] for entry in self.manifest]
+        if len(names) != len(weights) or any(
+            tuple(weight.shape) != self.arrays[name].shape for weight, name in zip(weights, names)
+        ):
+            raise ValueError("Mapped weights do not match the model architecture")
+        model.set_weights([self.value(name, _numpy_dtype(weight)) for weight, name in zip(weights, names)])
+
+
+def _numpy_dtype(weight):
+    dtype = getattr(weight, "dtype", None)
+    return getattr(dtype, "as_numpy_dtype", dtype)
@@ -0,0 +1,142 @@
+import os
+import re
+
+import numpy as np
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "somali_ngram.npz")
+DEFAULT_ORDERS = (1, 2, 3, 4)
+DEFAULT_NUM_FEATURES = 1 << 16
+
+# Digits, punctuation and "_" carry no language signal: they become spaces
+NON_LETTER_PATTERN = re.compile(r'[\W\d_]+')
+
+_FNV_OFFSET = np.uint32(2166136261)
+_FNV_PRIME = np.uint32(16777619)
+_SHIFT = np.uint32(16)
+
+
+def normalize(text):
+    """
+    Lower-cased letters with single spaces, padded so word edges form
+    n-grams ("" when the text has no letters)
+    """
+    words = NON_LETTER_PATTERN.sub(' ', text.lower()).split()
+    return f" {' '.join(words)} " if words else ""
+
+
+def _codes(text):
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+def _window_hashes(codes, orders):
+    """
+    (order, hash of the window starting at each position) for every n-gram
+    order. FNV-1a over code points, extended one character per order for
+    all windows at once, so hashes are the same in every process (unlike
+    hash()).
+    """
+    h = codes ^ _FNV_OFFSET
+    h *= _FNV_PRIME
+    for order in range(1, max(orders) + 1):
+        if order > 1:
+            h = h[:-1] ^ codes[order - 1:]
+            h *= _FNV_PRIME
+        if not len(h):
+            break
+        if order in orders:
+            yield order, h
+
+
+def _to_features(hashes, num_features):
+    """Mix the high bits down and keep the low ones (num_features is a power of two)"""
+    hashes ^= hashes >> _SHIFT
+    hashes &= np.uint32(num_features - 1)
+    return hashes
+
+
+def hashed_ngrams(text, orders=DEFAULT_ORDERS, num_features=DEFAULT_NUM_FEATURES):
+    """Feature index of every character n-gram of `text` (one entry per occurrence)"""
+    hashes = [h for _, h in _window_hashes(_codes(normalize(text)), orders)]
+    if not hashes:
+        return np.zeros(0, dtype=np.uint32)
+    # Every numpy call costs about a microsecond: mix all orders at once
+    return _to_features(np.concatenate(hashes), num_features)
+
+
+class NgramClassifier:
+    """
+    Somali vs. non-Somali naive Bayes over hashed character n-grams. The
+    model is one float32 array of per-feature log-odds (log P(f|so) -
+    log P(f|other)) and a prior: a text's score is the prior plus the mean
+    log-odds of its n-grams (the dot product of its normalized n-gram
+    counts with the weights), so scores do not grow with text length.
+    """
+
+    def __init__(self, weights, bias=0.0, orders=DEFAULT_ORDERS):
+        if len(weights) & (len(weights) - 1):
+            raise ValueError("The number of features must be a power of two")
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = float(bias)
+        self.orders = tuple(int(order) for order in orders)
+
+    @property
+    def num_features(self):
+        return len(self.weights)
+
+    @classmethod
+    def train(cls, somali_texts, other_texts, orders=DEFAULT_ORDERS, num_features=DEFAULT_NUM_FEATURES, alpha=0.5):
+        """Fit from two lists of texts (additive smoothing `alpha`)"""
+        if not somali_texts or not other_texts:
+            raise ValueError("Training needs both Somali and non-Somali texts")
+        if num_features & (num_features - 1):
+            raise ValueError("The number of features must be a power of two")
+
+        def log_probs(texts):
+            counts = np.zeros(num_features, dtype=np.float64)
+            for text in texts:
+                counts += np.bincount(hashed_ngrams(text, orders, num_features), minlength=num_features)
+            return np.log((counts + alpha) / (counts.sum() + alpha * num_features))
+
+        weights = log_probs(somali_texts) - log_probs(other_texts)
+        bias = np.log(len(somali_texts) / len(other_texts))
+        return cls(weights, bias, orders)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH):
+        with np.load(path) as model:
+            return cls(model["weights"], float(model["bias"]), tuple(model["orders"]))
+
+    def save(self, path):
+        np.savez_compressed(path, weights=self.weights, bias=np.float64(self.bias), orders=np.array(self.orders))
+
+    def score(self, text):
+        """Log-odds that `text` is Somali (0.0 when it has no letters)"""
+        features = hashed_ngrams(text, self.orders, self.num_features)
+        if not len(features):
+            return 0.0
+        return self.bias + float(self.weights.take(features).sum(dtype=np.float64)) / len(features)
+
+    def scores(self, texts):
+        """
+        score() of every text. The whole batch is hashed as one array;
+        n-grams that would span two texts are dropped.
+        """
+        normalized = [normalize(text) for text in texts]
+        owners = np.repeat(np.arange(len(texts)), [len(text) for text in normalized])
+        hashes = []
+        starts = []
+        for order, h in _window_hashes(_codes("".join(normalized)), self.orders):
+            inside = owners[:len(h)] == owners[order - 1:]
+            hashes.append(h[inside])
+            starts.append(owners[:len(h)][inside])
+        if not hashes:
+            return np.zeros(len(texts))
+        features = _to_features(np.concatenate(hashes), self.num_features)
+        starts = np.concatenate(starts)
+        totals = np.bincount(starts, weights=self.weights.take(features), minlength=len(texts))
+        counts = np.bincount(starts, minlength=len(texts))
+        return np.where(counts > 0, self.bias + totals / np.maximum(counts, 1), 0.0)
+
+    def probability(self, text):
+        """P(Somali) from the score"""
+        return float(1.0 / (1.0 + np.exp(-self.score(text))))
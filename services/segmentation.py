@@ -0,0 +1,120 @@
+import re
+
+# A sentence runs up to terminal punctuation (plus closing quotes/brackets)
+# followed by whitespace, up to a line break, or up to the end of the text.
+SENTENCE_PATTERN = re.compile(r'\S.*?(?:[.!?…؟]+["\'”’)\]]*(?=\s|\Z)|(?=\n)|\Z)', re.DOTALL)
+CLAUSE_PATTERN = re.compile(r'\S.*?(?:[,;:،]+(?=\s)|\Z)', re.DOTALL)
+WORD_PATTERN = re.compile(r'\S+')
+WHITESPACE_PATTERN = re.compile(r'\s*')
+TRAILING_PUNCTUATION_PATTERN = re.compile(r'[.!?…؟,;:،]+["\'”’)\]]*\Z')
+
+
+class SegmentedText:
+    """
+    Text split into translatable segments plus the whitespace around them,
+    so translated segments can be stitched back into the original layout.
+    """
+
+    def __init__(self, leading, segments, separators):
+        self.leading = leading
+        self.segments = segments
+        self.separators = separators
+
+    def __len__(self):
+        return len(self.segments)
+
+    def render(self, index, translation):
+        """Output text for segment `index`: its translation plus the whitespace around it"""
+        leading = self.leading if index == 0 else ""
+        restored = _restore_punctuation(self.segments[index], translation.strip())
+        return leading + restored + self.separators[index]
+
+    def join(self, translations):
+        """Rebuild the text from one translation per segment"""
+        return "".join(self.render(index, translation) for index, translation in enumerate(translations))
+
+
+def segment_text(text, length_fn=len, max_length=256):
+    """
+    Split `text` into sentences. Sentences longer than `max_length` (as
+    measured by `length_fn`, e.g. a token count) are split further at clause
+    punctuation and, as a last resort, between words.
+    """
+    leading_match = WHITESPACE_PATTERN.match(text)
+    leading = leading_match.group()
+    pos = leading_match.end()
+
+    segments = []
+    separators = []
+    while pos < len(text):
+        sentence = SENTENCE_PATTERN.match(text, pos).group()
+        pos += len(sentence)
+        whitespace = WHITESPACE_PATTERN.match(text, pos).group()
+        pos += len(whitespace)
+
+        stripped = sentence.rstrip()
+        separator = sentence[len(stripped):] + whitespace
+        pieces = _split_long(stripped, length_fn, max_length)
+        for piece, piece_separator in pieces[:-1]:
+            segments.append(piece)
+            separators.append(piece_separator)
+        segments.append(pieces[-1][0])
+        separators.append(separator)
+
+    return SegmentedText(leading, segments, separators)
+
+
+def _fits(text, length_fn, max_length):
+    # Always measured: SentencePiece can produce more tokens than characters
+    # (word-start markers, byte fallback), so length is no safe shortcut.
+    return length_fn(text) <= max_length
+
+
+def _split_long(sentence, length_fn, max_length):
+    """Return [(piece, separator_after_piece), ...] for one sentence"""
+    if _fits(sentence, length_fn, max_length):
+        return [(sentence, "")]
+
+    clauses = _split_with_separators(sentence, CLAUSE_PATTERN)
+    pieces = []
+    for clause, separator in clauses:
+        if _fits(clause, length_fn, max_length):
+            pieces.append((clause, separator))
+        else:
+            words = _split_with_separators(clause, WORD_PATTERN)
+            words[-1] = (words[-1][0], separator)
+            pieces.extend(words)
+    return _merge_pieces(pieces, length_fn, max_length)
+
+
+def _split_with_separators(text, pattern):
+    pieces = []
+    pos = 0
+    while pos < len(text):
+        piece = pattern.match(text, pos).group()
+        pos += len(piece)
+        whitespace = WHITESPACE_PATTERN.match(text, pos).group()
+        pos += len(whitespace)
+        pieces.append((piece, whitespace))
+    return pieces
+
+
+def _merge_pieces(pieces, length_fn, max_length):
+    """Greedily merge neighbouring pieces while they stay under max_length"""
+    merged = [pieces[0]]
+    for piece, separator in pieces[1:]:
+        previous, previous_separator = merged[-1]
+        candidate = previous + previous_separator + piece
+        if _fits(candidate, length_fn, max_length):
+            merged[-1] = (candidate, separator)
+        else:
+            merged.append((piece, separator))
+    return merged
+
+
+def _restore_punctuation(source, translation):
+    """Carry the source's trailing punctuation over if the model dropped it"""
+    punctuation = TRAILING_PUNCTUATION_PATTERN.search(source)
+    if punctuation and translation and not TRAILING_PUNCTUATION_PATTERN.search(translation):
+        return translation + punctuation.group()
+    return translation
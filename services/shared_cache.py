@@ -0,0 +1,254 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+from services.translation_cache import normalize_text
+
+MAGIC = b"SOTC"
+FORMAT_VERSION = 1
+
+# magic, version, fingerprint, slot_count, data_size, head
+HEADER = struct.Struct("<4sI16sIQQ")
+HEADER_SIZE = 4096
+HEAD_OFFSET = struct.calcsize("<4sI16sIQ")
+
+# key_hash, logical offset of the record, record length
+SLOT = struct.Struct("<QQI4x")
+# key_hash, key length, value length
+RECORD = struct.Struct("<QII")
+
+# Slots probed per lookup before giving up / overwriting the oldest one
+PROBE_LENGTH = 8
+
+
+class SharedTranslationCache:
+    """
+    Translation cache shared by every worker process on the host.
+
+    Entries live in a memory-mapped file made of a fixed-size hash index and
+    a ring buffer of records. New records overwrite the oldest ones once the
+    ring is full, so the file never grows beyond its configured size. The
+    header carries the model fingerprint; a file written for another model is
+    reset instead of served. Processes coordinate with `flock`.
+    """
+
+    def __init__(self, path, fingerprint, max_bytes=256 * 1024 * 1024, avg_entry_bytes=256):
+        self.path = path
+        self.fingerprint = fingerprint.encode("ascii")[:16].ljust(16, b"\0")
+        self.data_size = int(max_bytes)
+        self.slot_count = max(PROBE_LENGTH, self.data_size // avg_entry_bytes)
+        self.index_size = self.slot_count * SLOT.size
+        self.file_size = HEADER_SIZE + self.index_size + self.data_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._fd = None
+        self._mm = None
+        self._pid = None
+
+    # -- public API -------------------------------------------------------
+
+    def get(self, text):
+        """Return the cached translation for `text`, or None"""
+        key = normalize_text(text).encode("utf-8")
+        key_hash = _hash_key(key)
+        with self._lock:
+            self._ensure_open()
+            fcntl.flock(self._fd, fcntl.LOCK_SH)
+            try:
+                value = self._lookup(key, key_hash)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def put(self, text, translated_text):
+        """Store a translation, overwriting the oldest records when full"""
+        key = normalize_text(text).encode("utf-8")
+        value = translated_text.encode("utf-8")
+        record_len = RECORD.size + len(key) + len(value)
+        if record_len > self.data_size // 4:
+            return
+        key_hash = _hash_key(key)
+        with self._lock:
+            self._ensure_open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                if self._header_matches():
+                    self._store(key, value, key_hash, record_len)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def clear(self):
+        with self._lock:
+            self._ensure_open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._reset()
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def stats(self):
+        with self._lock:
+            self._ensure_open()
+            head = self._read_head()
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "path": self.path,
+                "model_fingerprint": self.fingerprint.rstrip(b"\0").decode("ascii"),
+                "file_bytes": self.file_size,
+                "used_bytes": min(head, self.data_size),
+                "slots": self.slot_count,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    # -- file management --------------------------------------------------
+
+    def _ensure_open(self):
+        # A mapping inherited across fork shares the parent's file offset and
+        # locks, so every process opens its own descriptor.
+        if self._mm is not None and self._pid == os.getpid():
+            return
+        self._mm = None
+        self._fd = None
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            # Another process may have swapped the file while we waited
+            if os.path.exists(self.path) and os.fstat(fd).st_ino == os.stat(self.path).st_ino:
+                break
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        try:
+            if os.fstat(fd).st_size != self.file_size:
+                # Never shrink a file other processes may have mapped; build
+                # a fresh one and swap it in atomically instead.
+                fd = self._replace_file(fd, directory)
+            self._fd = fd
+            self._mm = mmap.mmap(fd, self.file_size)
+            self._pid = os.getpid()
+            if not self._header_matches():
+                self._reset()
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _replace_file(self, old_fd, directory):
+        tmp_path = os.path.join(directory, f".{os.path.basename(self.path)}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.ftruncate(fd, self.file_size)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        os.replace(tmp_path, self.path)
+        fcntl.flock(old_fd, fcntl.LOCK_UN)
+        os.close(old_fd)
+        return fd
+
+    def _close(self):
+        if self._mm is not None and self._pid == os.getpid():
+            self._mm.close()
+            os.close(self._fd)
+        self._mm = None
+        self._fd = None
+
+    def _header_matches(self):
+        magic, version, fingerprint, slot_count, data_size, _ = HEADER.unpack_from(self._mm, 0)
+        return (
+            magic == MAGIC
+            and version == FORMAT_VERSION
+            and fingerprint == self.fingerprint
+            and slot_count == self.slot_count
+            and data_size == self.data_size
+        )
+
+    def _reset(self):
+        self._mm[HEADER_SIZE:HEADER_SIZE + self.index_size] = bytes(self.index_size)
+        HEADER.pack_into(
+            self._mm, 0, MAGIC, FORMAT_VERSION, self.fingerprint,
+            self.slot_count, self.data_size, 0,
+        )
+
+    def _read_head(self):
+        return struct.unpack_from("<Q", self._mm, HEAD_OFFSET)[0]
+
+    # -- index and ring buffer ---------------------------------------------
+
+    def _slot_position(self, index):
+        return HEADER_SIZE + (index % self.slot_count) * SLOT.size
+
+    def _is_live(self, offset, record_len, head):
+        return offset + record_len <= head and offset >= head - self.data_size
+
+    def _lookup(self, key, key_hash):
+        if not self._header_matches():
+            return None
+        head = self._read_head()
+        first = key_hash % self.slot_count
+        for i in range(PROBE_LENGTH):
+            slot_hash, offset, record_len = SLOT.unpack_from(self._mm, self._slot_position(first + i))
+            if slot_hash == 0:
+                return None
+            if slot_hash != key_hash or not self._is_live(offset, record_len, head):
+                continue
+            position = HEADER_SIZE + self.index_size + offset % self.data_size
+            record_hash, key_len, value_len = RECORD.unpack_from(self._mm, position)
+            key_start = position + RECORD.size
+            value_start = key_start + key_len
+            view = memoryview(self._mm)
+            try:
+                if record_hash != key_hash or view[key_start:value_start] != key:
+                    continue
+                # Decode straight out of the mapping without an intermediate copy
+                return str(view[value_start:value_start + value_len], "utf-8")
+            finally:
+                view.release()
+        return None
+
+    def _store(self, key, value, key_hash, record_len):
+        head = self._read_head()
+        # Records never wrap around the end of the ring
+        if head % self.data_size + record_len > self.data_size:
+            head += self.data_size - head % self.data_size
+        offset = head
+        position = HEADER_SIZE + self.index_size + offset % self.data_size
+        RECORD.pack_into(self._mm, position, key_hash, len(key), len(value))
+        key_start = position + RECORD.size
+        self._mm[key_start:key_start + len(key)] = key
+        self._mm[key_start + len(key):key_start + len(key) + len(value)] = value
+        head += record_len
+
+        first = key_hash % self.slot_count
+        target = None
+        oldest = None
+        for i in range(PROBE_LENGTH):
+            slot_position = self._slot_position(first + i)
+            slot_hash, slot_offset, slot_len = SLOT.unpack_from(self._mm, slot_position)
+            if slot_hash == key_hash or slot_hash == 0 or not self._is_live(slot_offset, slot_len, head):
+                target = slot_position
+                break
+            if oldest is None or slot_offset < oldest[1]:
+                oldest = (slot_position, slot_offset)
+        if target is None:
+            target = oldest[0]
+
+        SLOT.pack_into(self._mm, target, key_hash, offset, record_len)
+        struct.pack_into("<Q", self._mm, HEAD_OFFSET, head)
+
+
+def _hash_key(key):
+    # Zero marks an empty slot, so force the low bit on
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") | 1
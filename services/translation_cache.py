@@ -0,0 +1,156 @@
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+# Rough per-entry bookkeeping cost (dict slot, tuple, str headers)
+ENTRY_OVERHEAD_BYTES = 200
+
+FINGERPRINT_FILES = [
+    "config.json",
+    "generation_config.json",
+    "tokenizer_config.json",
+    "special_tokens_map.json",
+    "vocab.json",
+    "source.spm",
+    "target.spm",
+]
+
+WEIGHT_FILES = ["tf_model.h5", "model.bin"]
+
+
+def normalize_text(text):
+    """Normalize input text for cache lookups (unicode form and whitespace)"""
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def model_fingerprint(model_dir):
+    """
+    Build a short fingerprint of the model in `model_dir`.
+    Small config/tokenizer files are hashed by content, weight files by size
+    and modification time so that startup does not read hundreds of MB.
+    """
+    digest = hashlib.sha1()
+    for name in FINGERPRINT_FILES:
+        path = os.path.join(model_dir, name)
+        if os.path.exists(path):
+            digest.update(name.encode("utf-8"))
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    for name in WEIGHT_FILES:
+        path = os.path.join(model_dir, name)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(f"{name}:{stat.st_size}:{int(stat.st_mtime)}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class TranslationCache:
+    """
+    Bounded in-process LRU cache of translations.
+    Keys are the normalized input text plus the model fingerprint, and the
+    cache is bounded by an approximate memory cap in bytes.
+    """
+
+    def __init__(self, fingerprint, max_bytes=64 * 1024 * 1024):
+        self.fingerprint = fingerprint
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def make_key(self, text):
+        return f"{self.fingerprint}:{normalize_text(text)}"
+
+    def get(self, text):
+        """Return the cached translation for `text`, or None"""
+        if not self.enabled:
+            return None
+        key = self.make_key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, text, translated_text):
+        """Store a translation, evicting least recently used entries if needed"""
+        if not self.enabled:
+            return
+        key = self.make_key(text)
+        size = _entry_size(key, translated_text)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (translated_text, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "model_fingerprint": self.fingerprint,
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class TieredTranslationCache:
+    """
+    The in-process cache in front of an optional second level shared by
+    every process on the host (SharedTranslationCache). Hits in the shared
+    level are copied into the local one.
+    """
+
+    def __init__(self, local, shared=None):
+        self.local = local
+        self.shared = shared
+
+    def get(self, text):
+        """Return a translation from the local or shared cache, or None"""
+        translated_text = self.local.get(text)
+        if translated_text is None and self.shared is not None:
+            translated_text = self.shared.get(text)
+            if translated_text is not None:
+                self.local.put(text, translated_text)
+        return translated_text
+
+    def put(self, text, translated_text):
+        self.local.put(text, translated_text)
+        if self.shared is not None:
+            self.shared.put(text, translated_text)
+
+
+def _entry_size(key, value):
+    return len(key.encode("utf-8")) + len(value.encode("utf-8")) + ENTRY_OVERHEAD_BYTES
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+import pytz
+from bson import ObjectId
+
+
+def history_entry(input_text, translated_text, language_detection, user_id=None, model_name=None):
+    """A document for the translations (history) collection"""
+    # Define Somalia timezone
+    somalia_tz = pytz.timezone('Africa/Mogadishu')
+
+    new_entry = {
+        "original_text": input_text,
+        "translated_text": translated_text,
+        "timestamp": datetime.now(somalia_tz).isoformat(),
+        "is_favorite": False,
+        "detected_language": language_detection["detected_language"],
+        "language_confidence": language_detection["language_confidence"],
+        "detection_method": language_detection["detection_method"],
+        "model": model_name
+    }
+
+    # Add user_id if authenticated
+    if user_id:
+        new_entry["user_id"] = ObjectId(user_id)
+    return new_entry
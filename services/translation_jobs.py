@@ -0,0 +1,248 @@
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from services.batching import BucketedBatchScheduler
+from services.segmentation import SegmentedText, segment_text
+from services.translation_history import history_entry
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+NOT_SOMALI_ERROR = "Qoraalka aad galisay ma aha afka Soomaaliga. Fadlan gali qoraal Soomaali ah."
+
+
+def create_job(jobs, texts, user_id=None, document_layout=None):
+    """Insert a queued translation job and return its id"""
+    now = datetime.utcnow()
+    job = {
+        "status": JOB_QUEUED,
+        "texts": texts,
+        "results": [None] * len(texts),
+        "total": len(texts),
+        "completed": 0,
+        "created_at": now,
+        "updated_at": now,
+    }
+    if document_layout is not None:
+        job["document_layout"] = document_layout
+    if user_id:
+        job["user_id"] = ObjectId(user_id)
+    return str(jobs.insert_one(job).inserted_id)
+
+
+def serialize_job(job, include_results=True):
+    """Convert a job document to the JSON shape returned by the API"""
+    total = job.get("total", 0)
+    body = {
+        "id": str(job["_id"]),
+        "status": job["status"],
+        "total": total,
+        "completed": job.get("completed", 0),
+        "progress": job.get("completed", 0) / total if total else 1.0,
+        "created_at": job["created_at"].isoformat(),
+        "updated_at": job["updated_at"].isoformat(),
+    }
+    for field in ("started_at", "finished_at"):
+        if job.get(field):
+            body[field] = job[field].isoformat()
+    if job.get("error"):
+        body["error"] = job["error"]
+    if include_results:
+        body["results"] = job.get("results", [])
+        if job["status"] == JOB_COMPLETED and "translated_document" in job:
+            body["translated_document"] = job["translated_document"]
+    return body
+
+
+class TranslationJobWorker:
+    """
+    Background worker for bulk translation jobs.
+
+    Claims the oldest queued job with an atomic update, detects the language
+    of every item and translates the Somali ones the way /translate does:
+    split into segments, served from the caches when possible, the rest
+    through the same length-bucketed batching (batch size and generation
+    bound per bucket) as the web workers' "quality" profile. Progress is
+    written back after each batch, and translations go to the history
+    collection. Jobs whose worker stopped heartbeating are picked up again.
+    """
+
+    def __init__(self, jobs, engine, detector, batch_size=64, poll_interval=1.0, stale_after=300,
+                 cache=None, history=None, max_segment_tokens=None, scheduler=None, model_name=None):
+        self.jobs = jobs
+        self.engine = engine
+        self.detector = detector
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        # Same keys as the web workers' "quality" entries for the default model
+        self.cache = cache
+        self.history = history
+        self.max_segment_tokens = min(max_segment_tokens or engine.max_length, engine.max_length)
+        # Defaults match the "quality" profile (model's beam width, 1.5 x input + 10 new tokens)
+        self.scheduler = scheduler or BucketedBatchScheduler(engine.translate_batch, engine.count_tokens)
+        self.model_name = model_name
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def run_forever(self):
+        print(f"Translation job worker {self.worker_id} started")
+        while True:
+            if not self.process_next():
+                time.sleep(self.poll_interval)
+
+    def claim_next(self):
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.stale_after)
+        return self.jobs.find_one_and_update(
+            {"$or": [
+                {"status": JOB_QUEUED},
+                {"status": JOB_RUNNING, "heartbeat_at": {"$lt": stale}},
+            ]},
+            {"$set": {
+                "status": JOB_RUNNING,
+                "worker": self.worker_id,
+                "started_at": now,
+                "heartbeat_at": now,
+                "updated_at": now,
+            }},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def process_next(self):
+        """Process one job; returns False when the queue was empty"""
+        job = self.claim_next()
+        if job is None:
+            return False
+        try:
+            self.process(job)
+        except Exception as e:
+            now = datetime.utcnow()
+            self.jobs.update_one(
+                {"_id": job["_id"]},
+                {"$set": {"status": JOB_FAILED, "error": str(e), "finished_at": now, "updated_at": now}},
+            )
+        return True
+
+    def process(self, job):
+        texts = job["texts"]
+        # Resume after a crash: only items without a result are left
+        pending = [i for i, result in enumerate(job.get("results", [])) if result is None]
+
+        layout = job.get("document_layout")
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            results = self.translate_items([texts[i] for i in chunk])
+            if layout is None:
+                self.save_history([texts[i] for i in chunk], results, job.get("user_id"))
+            now = datetime.utcnow()
+            self.jobs.update_one(
+                {"_id": job["_id"]},
+                {
+                    "$set": {
+                        **{f"results.{i}": result for i, result in zip(chunk, results)},
+                        "heartbeat_at": now,
+                        "updated_at": now,
+                    },
+                    "$inc": {"completed": len(chunk)},
+                },
+            )
+
+        finished = self.jobs.find_one({"_id": job["_id"]})
+        update = {"status": JOB_COMPLETED, "finished_at": datetime.utcnow(), "updated_at": datetime.utcnow()}
+        if layout is not None:
+            update["translated_document"] = _join_document(layout, finished["texts"], finished["results"])
+            # One history entry for the whole document, as /translate saves it
+            translated = [result for result in finished["results"] if result and "translated_text" in result]
+            if translated:
+                # The source document: every segment joined back untranslated
+                document = _join_document(layout, finished["texts"], [None] * len(finished["texts"]))
+                result = {"translated_text": update["translated_document"],
+                          "language_detection": translated[0]["language_detection"]}
+                self.save_history([document], [result], job.get("user_id"))
+        self.jobs.update_one({"_id": job["_id"]}, {"$set": update})
+
+    def save_history(self, texts, results, user_id=None):
+        """Insert the translated results into the history collection and add their ids"""
+        if self.history is None:
+            return
+        translated = [(text, result) for text, result in zip(texts, results) if "translated_text" in result]
+        if not translated:
+            return
+        entries = [
+            history_entry(text, result["translated_text"], result["language_detection"], user_id, self.model_name)
+            for text, result in translated
+        ]
+        inserted = self.history.insert_many(entries, ordered=True)
+        for (_, result), inserted_id in zip(translated, inserted.inserted_ids):
+            result["id"] = str(inserted_id)
+
+    def translate_items(self, texts):
+        """Return one result dict per text, translating the Somali ones in one batch"""
+        results = [None] * len(texts)
+        somali = []
+        for i, text in enumerate(texts):
+            if not text.strip():
+                results[i] = {"error": "No input text provided."}
+                continue
+            detection = self.detector.detect_text_language(text)
+            language_detection = {
+                "detected_language": detection["language"],
+                "language_confidence": detection["confidence"],
+                "detection_method": detection["method"],
+                "is_somali": detection["language"] == "so",
+            }
+            if detection["language"] != "so" or detection["confidence"] < 0.2:
+                results[i] = {"error": NOT_SOMALI_ERROR, "language_detection": {**language_detection, "is_somali": False}}
+            else:
+                results[i] = {"language_detection": language_detection}
+                somali.append(i)
+
+        for i, translated_text in zip(somali, self.translate_texts([texts[i] for i in somali])):
+            results[i]["translated_text"] = translated_text
+        return results
+
+    def translate_texts(self, texts):
+        """
+        Translate texts through sentence segmentation and the caches, as
+        /translate does: the uncached segments of all texts go to the
+        scheduler together and are cached, and texts of several segments
+        are rebuilt with their own whitespace.
+        """
+        segmented_texts = []
+        translations = {}
+        for text in texts:
+            segmented = segment_text(text, length_fn=self.engine.count_tokens, max_length=self.max_segment_tokens)
+            segments = segmented.segments if len(segmented) > 1 else [text.strip()]
+            segmented_texts.append((segmented, segments))
+            for segment in segments:
+                if segment not in translations:
+                    translations[segment] = self.cache.get(segment) if self.cache is not None else None
+
+        # Shortest first, so the consecutive batches of a bucket each hold similar lengths
+        missing = sorted((segment for segment, translation in translations.items() if translation is None), key=len)
+        if missing:
+            for segment, translated_text in zip(missing, self.scheduler.translate_many(missing)):
+                translations[segment] = translated_text
+                if self.cache is not None:
+                    self.cache.put(segment, translated_text)
+
+        return [
+            segmented.join([translations[segment] for segment in segments]) if len(segmented) > 1
+            else translations[segments[0]]
+            for segmented, segments in segmented_texts
+        ]
+
+
+def _join_document(layout, texts, results):
+    # Segments that were not translated (e.g. numbers, non-Somali lines)
+    # are kept as they were
+    translations = [(result or {}).get("translated_text", text) for text, result in zip(texts, results)]
+    return SegmentedText(layout.get("leading", ""), texts, layout["separators"]).join(translations)
@@ -0,0 +1,289 @@
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from services.translation_cache import normalize_text
+
+# MinHash arithmetic is done modulo a Mersenne prime that keeps a*x+b
+# inside uint64 for 32-bit shingle hashes
+MERSENNE_PRIME = (1 << 31) - 1
+FNV64_OFFSET = np.uint64(14695981039346656037)
+FNV64_PRIME = np.uint64(1099511628211)
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+
+
+def memory_text(text, mask_numbers=True):
+    """
+    Text as compared by the memory: normalized, case-folded, without
+    punctuation and (by default) with every number replaced by "0"
+    """
+    text = normalize_text(text).casefold()
+    if mask_numbers:
+        text = NUMBER_PATTERN.sub("0", text)
+    text = PUNCTUATION_PATTERN.sub(" ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def jaccard(grams, other):
+    return len(grams & other) / len(grams | other)
+
+
+def shingles(text, ngram=3):
+    """Hashed character n-grams of `text` (already passed through memory_text)"""
+    padded = f" {text} "
+    if len(padded) <= ngram:
+        return frozenset([zlib.crc32(padded.encode("utf-8"))])
+    return frozenset(zlib.crc32(padded[i:i + ngram].encode("utf-8")) for i in range(len(padded) - ngram + 1))
+
+
+def transfer_numbers(text, source_text, translated_text):
+    """
+    Carry the numbers of `text` into a stored translation.
+    Only done when both sources have the same numbers in the same count
+    and every number of the stored source appears in its translation;
+    otherwise the stored translation is returned as is. Returns
+    (translation, adjusted).
+    """
+    new_numbers = NUMBER_PATTERN.findall(text)
+    old_numbers = NUMBER_PATTERN.findall(source_text)
+    if new_numbers == old_numbers or len(new_numbers) != len(old_numbers):
+        return translated_text, False
+    if NUMBER_PATTERN.findall(translated_text) != old_numbers:
+        return translated_text, False
+    numbers = iter(new_numbers)
+    return NUMBER_PATTERN.sub(lambda _: next(numbers), translated_text), True
+
+
+class TranslationMemory:
+    """
+    Fuzzy translation memory over past (source, translation) pairs.
+
+    Sources are compared as sets of character n-grams (Jaccard
+    similarity) of their case-folded text without punctuation, so changed
+    punctuation, a changed number or an extra word still finds the
+    earlier translation. Each source gets a MinHash signature of
+    `num_perm` values split into `bands` LSH bands; a lookup only scores
+    entries that share at least one band with the query, then ranks them
+    by their exact n-gram Jaccard similarity (at most `max_candidates`,
+    those sharing the most bands). Entries are keyed by their compared
+    text and the oldest are dropped beyond `max_entries`.
+
+    Entries are stored compactly: signatures as uint32 rows and one
+    64-bit hash per band in numpy arrays (a lookup compares the query's
+    band hashes with every row at once), and n-grams as packed uint32
+    bytes.
+    """
+
+    def __init__(self, max_entries=20000, ngram=3, num_perm=64, bands=16, threshold=0.8, max_candidates=64, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.max_entries = int(max_entries)
+        self.ngram = ngram
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        # key -> slot, oldest first; slot i of the arrays belongs to
+        # _records[i]. Band hashes are stored band-major so a lookup
+        # compares one contiguous row per band.
+        self._index = OrderedDict()
+        self._records = []
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self._band_hashes = np.zeros((bands, 0), dtype=np.uint64)
+        self._lock = threading.Lock()
+        self._loader = None
+        self.loaded = 0
+        self.lookups = 0
+        self.matches = 0
+        self.load_error = None
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def __len__(self):
+        return len(self._records)
+
+    def signature(self, grams):
+        values = np.fromiter(grams, dtype=np.uint64, count=len(grams))
+        hashed = (self._a * values + self._b) % MERSENNE_PRIME
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def band_hashes(self, signature):
+        """One 64-bit FNV-1a hash per LSH band of `signature`"""
+        rows = signature.reshape(self.bands, self.rows).astype(np.uint64)
+        hashes = np.full(self.bands, FNV64_OFFSET, dtype=np.uint64)
+        for row in range(self.rows):
+            hashes ^= rows[:, row]
+            hashes *= FNV64_PRIME
+        return hashes
+
+    def add(self, source_text, translated_text, entry_id=None, historical=False):
+        """
+        Remember a translation; a source already in memory gets the newer
+        translation. `historical` entries (loaded newest first from the
+        history) are placed behind everything already known and never
+        replace an entry or push one out.
+        """
+        if not self.enabled:
+            return
+        key = memory_text(source_text)
+        if not key or not translated_text:
+            return
+        grams = shingles(key, self.ngram)
+        signature = self.signature(grams)
+        band_hashes = self.band_hashes(signature)
+        packed = np.sort(np.fromiter(grams, dtype=np.uint32, count=len(grams))).tobytes()
+        with self._lock:
+            if key in self._index:
+                if historical:
+                    return
+                self._remove(key)
+            elif historical and len(self._records) >= self.max_entries:
+                return
+            slot = len(self._records)
+            self._reserve(slot + 1)
+            self._signatures[slot] = signature
+            self._band_hashes[:, slot] = band_hashes
+            self._records.append((key, source_text, translated_text, entry_id, packed))
+            self._index[key] = slot
+            if historical:
+                self._index.move_to_end(key, last=False)
+            while len(self._records) > self.max_entries:
+                self._remove(next(iter(self._index)))
+
+    def _reserve(self, size):
+        """Grow the arrays (doubling, up to max_entries) to hold `size` entries"""
+        capacity = len(self._signatures)
+        if size <= capacity:
+            return
+        capacity = max(size, min(max(2 * capacity, 1024), self.max_entries + 1))
+        signatures = np.zeros((capacity, self.num_perm), dtype=np.uint32)
+        signatures[:len(self._signatures)] = self._signatures
+        band_hashes = np.zeros((self.bands, capacity), dtype=np.uint64)
+        band_hashes[:, :self._band_hashes.shape[1]] = self._band_hashes
+        self._signatures, self._band_hashes = signatures, band_hashes
+
+    def _remove(self, key):
+        # The last entry moves into the freed slot, so slots stay dense
+        slot = self._index.pop(key)
+        last = len(self._records) - 1
+        if slot != last:
+            moved = self._records[last]
+            self._records[slot] = moved
+            self._signatures[slot] = self._signatures[last]
+            self._band_hashes[:, slot] = self._band_hashes[:, last]
+            self._index[moved[0]] = slot
+        self._records.pop()
+
+    def lookup(self, text, threshold=None, limit=1):
+        """
+        Best matches for `text` with similarity >= threshold, best first.
+        Each match is a dict with source_text, translated_text, similarity
+        and id. Numbers are masked when comparing; where they differ from
+        the stored source they are carried into the returned translation
+        (`numbers_adjusted`), or, when that is not possible, the match is
+        scored with its numbers.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        self.lookups += 1
+        key = memory_text(text)
+        if not key or not self._records:
+            return []
+        grams = shingles(key, self.ngram)
+        band_hashes = self.band_hashes(self.signature(grams))
+
+        with self._lock:
+            count = len(self._records)
+            candidates = np.flatnonzero((self._band_hashes[:, :count] == band_hashes[:, None]).any(axis=0))
+            if len(candidates) > self.max_candidates:
+                shared = (self._band_hashes[:, candidates] == band_hashes[:, None]).sum(axis=0)
+                candidates = candidates[np.argsort(-shared, kind="stable")[:self.max_candidates]]
+            records = [self._records[slot] for slot in candidates]
+        if not records:
+            return []
+
+        # Exact Jaccard similarity of every candidate in one pass
+        query = np.fromiter(grams, dtype=np.uint32, count=len(grams))
+        candidate_grams = [np.frombuffer(record[4], dtype=np.uint32) for record in records]
+        lengths = np.array([len(g) for g in candidate_grams])
+        owners = np.repeat(np.arange(len(records)), lengths)
+        common = np.bincount(owners, weights=np.isin(np.concatenate(candidate_grams), query), minlength=len(records))
+        similarities = common / (len(query) + lengths - common)
+
+        scored = []
+        for (candidate, source_text, translated_text, entry_id, _), similarity in zip(records, similarities):
+            similarity = 1.0 if candidate == key else float(similarity)
+            if similarity >= threshold:
+                scored.append((similarity, source_text, translated_text, entry_id))
+
+        matches = []
+        for similarity, source_text, translated_text, entry_id in scored:
+            adjusted_text, adjusted = transfer_numbers(text, source_text, translated_text)
+            if not adjusted and NUMBER_PATTERN.findall(text) != NUMBER_PATTERN.findall(source_text):
+                # The stored translation keeps the old numbers: score the
+                # texts with their numbers instead
+                similarity = jaccard(shingles(memory_text(text, mask_numbers=False), self.ngram),
+                                     shingles(memory_text(source_text, mask_numbers=False), self.ngram))
+                if similarity < threshold:
+                    continue
+            matches.append({
+                "source_text": source_text,
+                "translated_text": adjusted_text,
+                "similarity": round(similarity, 4),
+                "id": entry_id,
+                "numbers_adjusted": adjusted,
+            })
+        matches.sort(key=lambda match: match["similarity"], reverse=True)
+        matches = matches[:limit]
+        if matches:
+            self.matches += 1
+        return matches
+
+    def load(self, documents):
+        """Index history documents (`original_text` / `translated_text`), newest first"""
+        for document in documents:
+            entry_id = document.get("_id")
+            self.add(document.get("original_text") or "", document.get("translated_text") or "",
+                     str(entry_id) if entry_id is not None else None, historical=True)
+            self.loaded += 1
+
+    def start_loading(self, fetch_documents):
+        """Load `fetch_documents()` in a background thread; lookups work meanwhile"""
+        if not self.enabled or self._loader is not None:
+            return
+
+        def run():
+            started = time.monotonic()
+            try:
+                self.load(fetch_documents())
+            except Exception as e:
+                self.load_error = str(e)
+                print(f"Translation memory load failed: {e}")
+                return
+            print(f"Translation memory loaded {len(self)} entries in {time.monotonic() - started:.1f}s")
+
+        self._loader = threading.Thread(target=run, name="translation-memory-load", daemon=True)
+        self._loader.start()
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._records),
+            "max_entries": self.max_entries,
+            "loaded": self.loaded,
+            "loading": self._loader is not None and self._loader.is_alive(),
+            "load_error": self.load_error,
+            "lookups": self.lookups,
+            "matches": self.matches,
+            "threshold": self.threshold,
+        }
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+
+from services.decoding import build_profile_schedulers, length_buckets_from_env, profiles_from_env
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "somali_corpus.txt")
+
+
+class ModelWarmup:
+    """
+    Runs representative Somali inputs through the engine before a worker
+    takes traffic.
+
+    Every length bucket of every decoding profile is exercised through the
+    scheduler's own batch function (so with the same max_new_tokens and
+    num_beams as live traffic), with one short and one long input per
+    bucket and every batch size in `batch_sizes`. With the XLA generate
+    path this compiles each padded shape once; with eager TF it still pays
+    the first-call costs (kernel selection, allocator growth) up front.
+
+    `ready` turns true once the run has finished with at least one
+    successful batch (or immediately when warmup is disabled).
+    """
+
+    def __init__(self, schedulers, engine, max_tokens, batch_sizes=(1,), enabled=True, corpus_path=CORPUS_PATH):
+        self.schedulers = list(schedulers)
+        self.engine = engine
+        self.max_tokens = max_tokens
+        self.batch_sizes = sorted(set(batch_sizes))
+        self.enabled = enabled
+        self.corpus_path = corpus_path
+        self.total = 0
+        self.completed = 0
+        self.failures = []
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._done.is_set() and (self.total == 0 or len(self.failures) < self.total)
+
+    def start(self):
+        """Run the warmup in a background thread"""
+        self._thread = threading.Thread(target=self.run, name="model-warmup", daemon=True)
+        self._thread.start()
+
+    def run(self, progress=None):
+        """Run the warmup; `progress()` is called after every batch"""
+        self.started_at = time.monotonic()
+        try:
+            calls = self._plan() if self.enabled else []
+            self.total = len(calls)
+            for label, batch_fn, texts in calls:
+                try:
+                    batch_fn(texts)
+                except Exception as e:
+                    self.failures.append(f"{label}: {e}")
+                self.completed += 1
+                if progress is not None:
+                    progress()
+        except Exception as e:
+            self.failures.append(f"plan: {e}")
+            self.total = max(self.total, len(self.failures))
+        finally:
+            self.finished_at = time.monotonic()
+            self._done.set()
+        print(f"Model warmup finished: {self.completed - len(self.failures)}/{self.total} batches "
+              f"in {self.finished_at - self.started_at:.1f}s")
+
+    def status(self):
+        body = {
+            "ready": self.ready,
+            "completed": self.completed,
+            "total": self.total,
+            "failures": self.failures[-5:],
+        }
+        if self.started_at is not None:
+            end = self.finished_at or time.monotonic()
+            body["seconds"] = round(end - self.started_at, 2)
+        return body
+
+    def _plan(self):
+        words = self._corpus_words()
+        calls = []
+        for scheduler_index, scheduler in enumerate(self.schedulers):
+            lower = 0
+            for bucket, batch_fn in enumerate(scheduler.batch_fns):
+                upper = scheduler.boundaries[bucket] if bucket < len(scheduler.boundaries) else self.max_tokens
+                upper = min(upper, self.max_tokens)
+                if upper <= lower:
+                    break
+                for target in sorted({lower + 1, upper}):
+                    text = _text_with_length(words, scheduler.length_fn, target, upper)
+                    for batch_size in self.batch_sizes:
+                        label = f"scheduler {scheduler_index} bucket {bucket} tokens {target} batch {batch_size}"
+                        calls.append((label, batch_fn, [text] * batch_size))
+                lower = upper
+        return calls
+
+    def _corpus_words(self):
+        with open(self.corpus_path, encoding="utf-8") as f:
+            return f.read().split()
+
+
+def _text_with_length(words, length_fn, target, upper):
+    """Corpus words (cycled) until the text reaches `target` tokens, without passing `upper`"""
+    text = words[0]
+    index = 1
+    while length_fn(text) < target:
+        candidate = f"{text} {words[index % len(words)]}"
+        if length_fn(candidate) > upper:
+            break
+        text = candidate
+        index += 1
+    return text
+
+
+def warmup_from_env(engine, schedulers=None):
+    """
+    ModelWarmup configured like the /translate schedulers. Callers that
+    already have the schedulers (app.py) pass them in; the inference pool
+    builds the same set from the environment.
+    """
+    if schedulers is None:
+        schedulers = build_profile_schedulers(engine, profiles_from_env(), length_buckets_from_env()).values()
+    return ModelWarmup(
+        schedulers,
+        engine,
+        max_tokens=min(int(os.getenv("TRANSLATE_MAX_SEGMENT_TOKENS", "256")), engine.max_length),
+        batch_sizes=engine.warmup_batch_sizes,
+        enabled=os.getenv("WARMUP", "1") != "0",
+    )
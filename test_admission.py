@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script for admission control in front of the translation schedulers
+"""
+
+import sys
+import os
+import socket
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.admission import AdmissionController, Overloaded, RequestCancelled, client_disconnected
+from services.batching import BatchScheduler
+
+def blocked_scheduler():
+    """A scheduler whose first batch blocks until `release` is set"""
+    release = threading.Event()
+    calls = []
+
+    def slow_generate(texts):
+        calls.append(list(texts))
+        release.wait(5)
+        return [text.upper() for text in texts]
+
+    return BatchScheduler(slow_generate, max_batch_size=1, batch_window_ms=0), release, calls
+
+def test_anonymous_requests_leave_room_for_authenticated_users():
+    admission = AdmissionController(max_queue=4, anonymous_share=0.5)
+    tickets = [admission.admit(1), admission.admit(1)]
+    try:
+        admission.admit(1)
+        assert False, "expected Overloaded"
+    except Overloaded as e:
+        print(f"✅ Anonymous rejected: {e}")
+        assert e.retry_after >= 1
+
+    tickets += [admission.admit(1, priority=True), admission.admit(1, priority=True)]
+    try:
+        admission.admit(1, priority=True)
+        assert False, "expected Overloaded"
+    except Overloaded:
+        pass
+
+    for ticket in tickets:
+        ticket.release()
+        ticket.release()  # releasing twice is harmless
+    stats = admission.stats()
+    print(f"Stats: {stats}")
+    assert stats["queued"] == 0
+    assert stats["rejected"] == 2
+
+def test_large_batch_takes_the_whole_limit():
+    """A batch bigger than the queue is admitted only while the queue is empty"""
+    admission = AdmissionController(max_queue=10, anonymous_share=0.5)
+    ticket = admission.admit(500)
+    assert admission.queued == 5
+    try:
+        admission.admit(1)
+        assert False, "expected Overloaded"
+    except Overloaded:
+        pass
+    ticket.release()
+    admission.admit(500, priority=True).release()
+
+def test_expired_work_is_dropped_before_it_runs():
+    scheduler, release, calls = blocked_scheduler()
+    admission = AdmissionController(poll_interval=0.01)
+
+    first = admission.admit(1)
+    busy = scheduler.submit("qoraal hore")
+    time.sleep(0.05)  # the first batch is now running and blocking
+
+    ticket = admission.admit(1, timeout=0.1)
+    queued = scheduler.submit("qoraal dambe")
+    try:
+        ticket.wait([queued])
+        assert False, "expected RequestCancelled"
+    except RequestCancelled as e:
+        print(f"✅ Cancelled: {e.reason}")
+        assert e.reason == "deadline"
+    assert queued.cancelled()
+
+    release.set()
+    assert first.wait([busy]) == ["QORAAL HORE"]
+    time.sleep(0.05)
+    print(f"Batches: {calls}")
+    assert calls == [["qoraal hore"]]
+    assert admission.stats()["expired"] == 1
+
+def test_disconnected_client_cancels_its_work():
+    scheduler, release, calls = blocked_scheduler()
+    admission = AdmissionController(poll_interval=0.01)
+    scheduler.submit("qoraal hore")
+    time.sleep(0.05)
+
+    gone = threading.Event()
+    ticket = admission.admit(1, is_disconnected=gone.is_set)
+    queued = scheduler.submit("qoraal dambe")
+    threading.Timer(0.05, gone.set).start()
+    try:
+        ticket.wait([queued])
+        assert False, "expected RequestCancelled"
+    except RequestCancelled as e:
+        assert e.reason == "client disconnected"
+    release.set()
+    time.sleep(0.05)
+    assert calls == [["qoraal hore"]]
+
+def test_priority_work_is_batched_first():
+    scheduler, release, calls = blocked_scheduler()
+    scheduler.submit("running")
+    time.sleep(0.05)
+    anonymous = scheduler.submit("anonymous")
+    authenticated = scheduler.submit("authenticated", priority=True)
+    release.set()
+    assert authenticated.result(timeout=5) == "AUTHENTICATED"
+    assert anonymous.result(timeout=5) == "ANONYMOUS"
+    print(f"Batches: {calls}")
+    assert calls == [["running"], ["authenticated"], ["anonymous"]]
+
+def test_client_disconnected_reads_the_socket():
+    server, client = socket.socketpair()
+    try:
+        environ = {"gunicorn.socket": server}
+        assert client_disconnected(environ) is False
+        client.sendall(b"GET / HTTP/1.1\r\n")  # pipelined data is not a disconnect
+        assert client_disconnected(environ) is False
+        server.recv(1024)
+        client.close()
+        assert client_disconnected(environ) is True
+        assert client_disconnected({}) is False
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    test_anonymous_requests_leave_room_for_authenticated_users()
+    test_large_batch_takes_the_whole_limit()
+    test_expired_work_is_dropped_before_it_runs()
+    test_disconnected_client_cancels_its_work()
+    test_priority_work_is_batched_first()
+    test_client_disconnected_reads_the_socket()
+    print("All admission tests passed")
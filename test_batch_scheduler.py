@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Test script for the /translate micro-batching scheduler
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.batching import BatchScheduler, BucketedBatchScheduler, stream_in_order
+from services.segmentation import segment_text
+
+def test_concurrent_requests_share_a_batch():
+    """Requests arriving inside the batch window should run in one call"""
+    calls = []
+
+    def fake_generate(texts):
+        calls.append(list(texts))
+        return [text.upper() for text in texts]
+
+    scheduler = BatchScheduler(fake_generate, max_batch_size=8, batch_window_ms=50)
+    results = {}
+
+    def worker(text):
+        results[text] = scheduler.translate(text, timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(f"qoraal {i}",)) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"Batches: {calls}")
+    assert len(calls) == 1
+    for i in range(5):
+        assert results[f"qoraal {i}"] == f"QORAAL {i}"
+
+def test_max_batch_size_is_respected():
+    """A batch never grows beyond max_batch_size"""
+    sizes = []
+
+    def fake_generate(texts):
+        sizes.append(len(texts))
+        return texts
+
+    scheduler = BatchScheduler(fake_generate, max_batch_size=3, batch_window_ms=20)
+    results = scheduler.translate_many([f"text {i}" for i in range(7)], timeout=5)
+
+    print(f"Batch sizes: {sizes}")
+    assert results == [f"text {i}" for i in range(7)]
+    assert max(sizes) <= 3
+    assert sum(sizes) == 7
+
+def test_errors_reach_every_caller():
+    """A failing batch raises the error in every waiting caller"""
+    def failing_generate(texts):
+        raise ValueError("model failed")
+
+    scheduler = BatchScheduler(failing_generate, max_batch_size=4, batch_window_ms=10)
+    futures = [scheduler.submit("salaan"), scheduler.submit("mahadsanid")]
+
+    for future in futures:
+        try:
+            future.result(timeout=5)
+            assert False, "expected an error"
+        except ValueError as e:
+            print(f"✅ Error propagated: {e}")
+
+def test_single_request_is_not_held_long():
+    """A lone request waits at most roughly one batch window"""
+    scheduler = BatchScheduler(lambda texts: texts, max_batch_size=16, batch_window_ms=20)
+    start = time.monotonic()
+    scheduler.translate("salaan", timeout=5)
+    elapsed = time.monotonic() - start
+
+    print(f"Single request latency: {elapsed * 1000:.1f} ms")
+    assert elapsed < 1.0
+
+def test_length_buckets_are_batched_separately():
+    """Short and long texts never share a batch and get their own bounds"""
+    calls = []
+    lock = threading.Lock()
+
+    def fake_generate(texts, max_new_tokens=None):
+        with lock:
+            calls.append((sorted(texts), max_new_tokens))
+        return texts
+
+    scheduler = BucketedBatchScheduler(
+        fake_generate,
+        lambda text: len(text.split()),
+        boundaries=[4, 16],
+        max_batch_size=8,
+        batch_window_ms=30,
+    )
+    short = ["salaan", "sidee tahay"]
+    long = [" ".join(["eray"] * 10), " ".join(["qoraal"] * 12)]
+    huge = " ".join(["x"] * 40)
+    results = scheduler.translate_many(short + long + [huge], timeout=5)
+
+    print(f"Batches: {calls}")
+    assert results == short + long + [huge]
+    assert (sorted(short), 16) in calls
+    assert (sorted(long), 34) in calls
+    assert ([huge], None) in calls
+
+def test_generation_cap_reaches_the_engine():
+    """A max_new_tokens cap, rounded down to a bucket bound, is passed to the engine"""
+    calls = []
+
+    def fake_generate(texts, max_new_tokens=None, num_beams=None):
+        calls.append((sorted(texts), max_new_tokens, num_beams))
+        return texts
+
+    scheduler = BucketedBatchScheduler(
+        fake_generate,
+        lambda text: len(text.split()),
+        boundaries=[4, 16],
+        max_batch_size=8,
+        batch_window_ms=20,
+        new_tokens_ratio=1.2,
+        new_tokens_margin=4,
+        batch_options={"num_beams": 1},
+    )
+    short = "salaan"
+    long = " ".join(["eray"] * 10)
+    assert scheduler.bucket_for(long) == 1
+    assert scheduler.new_tokens == [8, 23, None]
+    assert scheduler.max_new_tokens_for(1) == 23
+    assert scheduler.max_new_tokens_for(1, 12) == 8
+    assert scheduler.max_new_tokens_for(1, 100) == 23
+    assert scheduler.max_new_tokens_for(2, 22) == 8
+    assert scheduler.max_new_tokens_for(2, 30) == 23
+    # Never below the smallest bound: no cap traces an unwarmed shape
+    assert scheduler.warmed_cap(2) == 8
+    assert scheduler.warmed_cap(None) is None
+
+    # One batch of the long bucket: capped and uncapped texts get their own call
+    futures = [scheduler.submit(long, max_new_tokens=12), scheduler.submit(long + " dheer"),
+               scheduler.submit(short, max_new_tokens=2)]
+    assert [future.result(timeout=5) for future in futures] == [long, long + " dheer", short]
+    print(f"Batches: {calls}")
+    assert sorted(calls) == sorted([([long], 8, 1), ([long + " dheer"], 23, 1), ([short], 8, 1)])
+
+def test_first_segment_streams_ahead():
+    """The first sentence of a streamed text comes back before the whole text is translated"""
+    calls = []
+
+    def slow_generate(texts):
+        calls.append(list(texts))
+        time.sleep(0.1 * len(texts))  # batch cost grows with its size, as on CPU
+        return [text.upper() for text in texts]
+
+    scheduler = BatchScheduler(slow_generate, max_batch_size=8, batch_window_ms=5)
+    segments = segment_text(
+        "Salaan, sidee tahay? Waxaan ku jiraa halkan maanta. "
+        "Mahadsanid caawimaadda aad i siisay. Berri waan kuu imaan doonaa."
+    ).segments
+    assert len(segments) == 4
+
+    start = time.monotonic()
+    arrivals = []
+    futures = []
+    submit = lambda texts: [scheduler.submit(text) for text in texts]
+    wait = lambda pending: [future.result(timeout=5) for future in pending]
+    for result in stream_in_order(submit, segments, wait, futures):
+        arrivals.append((time.monotonic() - start, result))
+
+    print(f"Batches: {calls}, arrivals: {[round(elapsed, 2) for elapsed, _ in arrivals]}")
+    assert [result for _, result in arrivals] == [segment.upper() for segment in segments]
+    assert calls == [segments[:1], segments[1:]] and len(futures) == 4
+    # One sentence's batch, not all four
+    assert arrivals[0][0] < 0.25 < arrivals[-1][0]
+
+if __name__ == "__main__":
+    test_concurrent_requests_share_a_batch()
+    test_max_batch_size_is_respected()
+    test_errors_reach_every_caller()
+    test_single_request_is_not_held_long()
+    test_length_buckets_are_batched_separately()
+    test_generation_cap_reaches_the_engine()
+    test_first_segment_streams_ahead()
+    print("All batch scheduler tests passed")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for TensorFlow thread pool sizing and per-worker CPU affinity
+"""
+
+import sys
+import os
+import subprocess
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services import cpu_threads
+from services.cpu_threads import CpuThreadConfig, cpu_share
+
+def with_cpus(count, fn):
+    """Run `fn` as if this process could use `count` CPUs"""
+    original = cpu_threads.available_cpus
+    cpu_threads.available_cpus = lambda: list(range(count))
+    try:
+        return fn()
+    finally:
+        cpu_threads.available_cpus = original
+
+def test_cpu_shares_are_disjoint():
+    cpus = list(range(8))
+    shares = [cpu_share(cpus, slot, 3) for slot in range(3)]
+    print(f"Shares: {shares}")
+    assert shares == [[0, 1], [2, 3, 4], [5, 6, 7]]
+    # More workers than CPUs: one CPU each, wrapping around
+    assert [cpu_share([0, 1], slot, 4) for slot in range(4)] == [[0], [1], [0], [1]]
+
+def test_auto_threads_split_the_cores():
+    plan = with_cpus(16, lambda: CpuThreadConfig(processes=4).plan(slot=1))
+    print(f"Plan: {plan}")
+    assert plan == {"cpus": None, "intra_op_threads": 4, "inter_op_threads": 2}
+
+    plan = with_cpus(16, lambda: CpuThreadConfig(affinity=True, processes=4).plan(slot=3))
+    assert plan["cpus"] == [12, 13, 14, 15]
+    assert plan["intra_op_threads"] == 4
+
+    # Explicit counts win; a single core never gets 0 threads
+    plan = with_cpus(16, lambda: CpuThreadConfig(intra_op_threads=3, inter_op_threads=1, processes=4).plan())
+    assert (plan["intra_op_threads"], plan["inter_op_threads"]) == (3, 1)
+    plan = with_cpus(2, lambda: CpuThreadConfig(processes=8).plan())
+    assert (plan["intra_op_threads"], plan["inter_op_threads"]) == (1, 1)
+
+def test_apply_sets_tensorflow_thread_pools():
+    """Run in a fresh process: thread pools can only be sized before TF starts"""
+    script = (
+        "import tensorflow as tf\n"
+        "from services.cpu_threads import CpuThreadConfig\n"
+        "CpuThreadConfig(intra_op_threads=3, inter_op_threads=1).apply()\n"
+        "print(tf.config.threading.get_intra_op_parallelism_threads(), "
+        "tf.config.threading.get_inter_op_parallelism_threads())\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    print(f"TF threads: {output.stdout.strip()}")
+    assert output.stdout.split()[-2:] == ["3", "1"]
+
+if __name__ == "__main__":
+    test_cpu_shares_are_disjoint()
+    test_auto_threads_split_the_cores()
+    test_apply_sets_tensorflow_thread_pools()
+    print("All CPU thread tests passed")
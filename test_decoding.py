@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for decoding profiles and latency budgets
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.decoding import DecodingProfile, build_profile_schedulers, choose_decoding
+
+PROFILES = {
+    "fast": DecodingProfile("fast", num_beams=1, new_tokens_ratio=1.2, new_tokens_margin=4, ms_per_token=5),
+    "quality": DecodingProfile("quality", num_beams=None, new_tokens_ratio=1.5, new_tokens_margin=10, ms_per_token=20),
+}
+
+def test_requested_profile_without_budget():
+    """Without a budget the requested or default profile runs uncapped"""
+    assert choose_decoding(PROFILES, 10).profile.name == "quality"
+    plan = choose_decoding(PROFILES, 10, requested="fast")
+    print(f"Plan: {plan.to_dict()}")
+    assert plan.profile.num_beams == 1 and plan.max_new_tokens is None
+
+def test_budget_downgrades_to_fast():
+    """Quality needs (15 + 10) * 20 = 500 ms; fast needs (12 + 4) * 5 = 80 ms"""
+    assert choose_decoding(PROFILES, 10, latency_budget_ms=600).profile.name == "quality"
+    plan = choose_decoding(PROFILES, 10, latency_budget_ms=200)
+    print(f"Plan: {plan.to_dict()}")
+    assert plan.profile.name == "fast" and plan.max_new_tokens is None
+
+def test_tight_budget_caps_generation():
+    """When even the fast profile does not fit, generation length is capped"""
+    plan = choose_decoding(PROFILES, 10, requested="quality", latency_budget_ms=50)
+    print(f"Plan: {plan.to_dict()}")
+    assert plan.profile.name == "fast"
+    assert plan.max_new_tokens == 10
+
+def test_budget_cap_reaches_the_engine():
+    """The plan's max_new_tokens reaches the engine rounded down to a warmed bucket bound"""
+    class FakeEngine:
+        def __init__(self):
+            self.calls = []
+
+        def count_tokens(self, text):
+            return len(text.split())
+
+        def translate_batch(self, texts, max_new_tokens=None, num_beams=None):
+            self.calls.append((len(texts), max_new_tokens, num_beams))
+            return list(texts)
+
+    engine = FakeEngine()
+    schedulers = build_profile_schedulers(engine, PROFILES, [8, 16], batch_window_ms=1)
+    for text, budget in [("salaan", 10), (" ".join(["eray"] * 12), 80), (" ".join(["eray"] * 40), 100)]:
+        plan = choose_decoding(PROFILES, engine.count_tokens(text), latency_budget_ms=budget)
+        scheduler = schedulers[plan.profile.name]
+        scheduler.translate(text, timeout=5, max_new_tokens=plan.max_new_tokens)
+        print(f"✅ Budget {budget} ms: plan {plan.to_dict()}, engine call {engine.calls[-1]}")
+        assert engine.calls[-1] == (1, scheduler.warmed_cap(plan.max_new_tokens), 1)
+        assert engine.calls[-1][1] in scheduler.new_tokens
+
+def test_invalid_requests():
+    """Unknown profiles and non-positive budgets are rejected"""
+    for kwargs in ({"requested": "greedy"}, {"latency_budget_ms": 0}, {"latency_budget_ms": "soon"}):
+        try:
+            choose_decoding(PROFILES, 10, **kwargs)
+            assert False, f"expected an error for {kwargs}"
+        except ValueError as e:
+            print(f"✅ Rejected {kwargs}: {e}")
+
+if __name__ == "__main__":
+    test_requested_profile_without_budget()
+    test_budget_downgrades_to_fast()
+    test_tight_budget_caps_generation()
+    test_budget_cap_reaches_the_engine()
+    test_invalid_requests()
+    print("All decoding tests passed")
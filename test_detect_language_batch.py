@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for batch language detection (detect_many and
+POST /detect-language/batch), without network calls
+"""
+
+import sys
+import os
+from flask import Flask
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from routes.language_detection import SomaliLanguageDetector, somali_detector
+from routes.language_routes import language_routes
+
+TEXTS = [
+    "Salaan, sidee tahay?",
+    "Hello, how are you?",
+    "Waxaan ku jiraa halkan",
+    "   ",
+    "I am here today",
+    "Hello salaam",
+    "mahadsanid",
+    "The meeting was moved to next Tuesday afternoon.",
+    "Maanta cimiladu aad bay u wanaagsan tahay.",
+    "123",
+]
+
+class OfflineTranslator:
+    """Stands in for Google Translate: every text is reported as Somali"""
+    def __init__(self):
+        self.calls = []
+
+    def detect(self, text):
+        self.calls.append(text)
+        return type("Detected", (), {"lang": "so", "confidence": 0.66})()
+
+def test_batch_matches_single_detection():
+    texts = TEXTS + ["  SALAAN, sidee tahay?", "The meeting was moved to next Tuesday afternoon."]
+    for primary in ("ngram", "langdetect"):
+        detector = SomaliLanguageDetector(primary=primary)
+        detector.translator = OfflineTranslator()
+        single = [detector.detect_text_language(text) for text in texts]
+        detector.translator = OfflineTranslator()
+        many = detector.detect_many(texts)
+        # Same methods in the same order: identical results
+        assert many == single, (many, single)
+        # Only texts no other method decided reach the fallback, once per distinct text
+        undecided = {text.strip().lower() for text, r in zip(texts, many) if r["method"] == "google_translate"}
+        assert sorted(detector.translator.calls) == sorted(undecided)
+        print(f"✅ {primary}: {[r['method'] for r in many]}")
+
+def test_batch_endpoint_keeps_order_and_fields():
+    app = Flask(__name__)
+    app.register_blueprint(language_routes)
+    somali_detector.google_detect.enabled = False
+    client = app.test_client()
+
+    single = client.post("/detect-language", json={"text": TEXTS[1]}).get_json()
+    response = client.post("/detect-language/batch", json={"texts": TEXTS + [42]})
+    assert response.status_code == 200
+    body = response.get_json()
+    print(f"✅ Batch: total={body['total']} somali={body['somali']} failed={body['failed']}")
+    assert body["total"] == len(TEXTS) + 1 and body["failed"] == 2
+    assert [r["index"] for r in body["results"]] == list(range(len(TEXTS) + 1))
+    assert body["results"][1] == {"index": 1, **single}
+    assert body["results"][3] == {"index": 3, "error": "Text cannot be empty"}
+    assert body["results"][-1] == {"index": len(TEXTS), "error": "Text is required"}
+    somali = client.post("/detect-language", json={"text": TEXTS[0]}).get_json()
+    assert body["results"][0] == {"index": 0, **somali}
+    assert body["results"][0]["language_detection"]["is_somali"]
+    assert body["somali"] == sum(r.get("language_detection", {}).get("is_somali", False) for r in body["results"])
+
+    assert client.post("/detect-language/batch", json={"texts": []}).status_code == 400
+    assert client.post("/detect-language/batch", json={"text": "waa"}).status_code == 400
+
+if __name__ == "__main__":
+    test_batch_matches_single_detection()
+    test_batch_endpoint_keeps_order_and_fields()
+    print("All batch detection tests passed")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test script for the time budget and circuit breaker around the Google
+Translate detection fallback, against a local stub upstream (no network)
+"""
+
+import sys
+import os
+import json
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.circuit_breaker import CallSkipped, CircuitBreaker, ExternalCall
+from routes.language_detection import SomaliLanguageDetector
+
+ENGLISH = "The meeting was moved to next Tuesday afternoon."
+
+class StubUpstream:
+    """Local HTTP server answering like the detection API, with a configurable delay and status"""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.status = 200
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                time.sleep(stub.delay)
+                body = json.dumps({"lang": "so", "confidence": 0.77}).encode("utf-8")
+                self.send_response(stub.status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def detect(self, text):
+        """What googletrans' Translator.detect does: a blocking HTTP call without its own deadline"""
+        url = f"http://127.0.0.1:{self.server.server_port}/detect"
+        with urllib.request.urlopen(url) as response:
+            return SimpleNamespace(**json.loads(response.read()))
+
+    def close(self):
+        self.server.shutdown()
+
+def make_detector(upstream, **options):
+    detector = SomaliLanguageDetector(primary="ngram")
+    detector.translator = upstream
+    detector.google_detect = ExternalCall("google_translate", **options)
+    return detector
+
+def test_fast_upstream_is_used():
+    upstream = StubUpstream()
+    try:
+        detector = make_detector(upstream, timeout=2)
+        result = detector.detect_text_language(ENGLISH)
+        print(f"✅ Fast upstream: {result}")
+        assert result == {"language": "so", "confidence": 0.77, "method": "google_translate"}
+        assert detector.google_detect.stats()["calls"] == 1
+    finally:
+        upstream.close()
+
+def test_slow_upstream_opens_the_circuit():
+    upstream = StubUpstream()
+    upstream.delay = 1.0
+    try:
+        detector = make_detector(upstream, timeout=0.1, failure_threshold=2, cooldown=60)
+        for _ in range(2):
+            start = time.perf_counter()
+            result = detector.detect_text_language(ENGLISH)
+            assert result["method"] == "combined_analysis"
+            assert time.perf_counter() - start < 0.5
+        assert detector.google_detect.breaker.state == "open"
+
+        start = time.perf_counter()
+        detector.detect_text_language(ENGLISH)
+        skipped_ms = (time.perf_counter() - start) * 1000
+        stats = detector.google_detect.stats()
+        print(f"✅ Circuit open after timeouts, next detection {skipped_ms:.1f} ms: {stats}")
+        assert stats["timeouts"] == 2 and stats["skipped"] == 1 and upstream.hits == 2
+    finally:
+        upstream.close()
+
+def test_circuit_half_opens_after_cooldown():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30, clock=lambda: now[0])
+    assert breaker.allow()
+    assert breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    now[0] = 31
+    assert breaker.state == "half_open"
+    assert breaker.allow() and not breaker.allow()  # one trial call at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+    now[0] = 62
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+def test_in_flight_limit_and_disabled():
+    upstream = StubUpstream()
+    upstream.delay = 0.5
+    try:
+        call = ExternalCall("stub", timeout=0.05, failure_threshold=100, max_concurrent=1)
+        try:
+            call(upstream.detect, "waa")
+            assert False, "expected CallSkipped"
+        except CallSkipped:
+            pass
+        # The overrunning call still holds the only slot
+        try:
+            call(upstream.detect, "waa")
+            assert False, "expected CallSkipped"
+        except CallSkipped as e:
+            assert "in flight" in str(e)
+        time.sleep(0.6)
+        upstream.delay = 0
+        assert call(upstream.detect, "waa").lang == "so"
+
+        disabled = make_detector(upstream, enabled=False)
+        hits = upstream.hits
+        assert disabled.detect_text_language(ENGLISH)["method"] == "combined_analysis"
+        assert upstream.hits == hits
+        print("✅ In-flight limit and GOOGLE_DETECT_ENABLED=0 keep calls off the upstream")
+    finally:
+        upstream.close()
+
+def test_upstream_errors_count_as_failures():
+    upstream = StubUpstream()
+    upstream.status = 503
+    try:
+        detector = make_detector(upstream, timeout=2, failure_threshold=3)
+        for _ in range(4):
+            assert detector.detect_text_language(ENGLISH)["method"] == "combined_analysis"
+        stats = detector.google_detect.stats()
+        assert stats["errors"] == 3 and stats["skipped"] == 1 and stats["state"] == "open"
+    finally:
+        upstream.close()
+
+if __name__ == "__main__":
+    test_fast_upstream_is_used()
+    test_slow_upstream_opens_the_circuit()
+    test_circuit_half_opens_after_cooldown()
+    test_in_flight_limit_and_disabled()
+    test_upstream_errors_count_as_failures()
+    print("All detection fallback tests passed")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Equivalence tests for the fast (Rust) Marian tokenizer.
+Token ids and decoded text must match MarianTokenizer exactly on the Somali
+corpus in data/somali_corpus.txt. Runs against ./amiin_model when its
+SentencePiece files are present, and always against small SentencePiece
+models trained on the corpus.
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pytest
+import sentencepiece as spm
+from transformers import MarianTokenizer
+
+from services.fast_tokenizer import FastMarianTokenizer
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CORPUS = os.path.join(ROOT, "data", "somali_corpus.txt")
+MODEL_DIR = os.path.join(ROOT, "amiin_model")
+
+# Inputs that exercise normalization and the slow-path fallbacks
+EDGE_CASES = [
+    "",
+    "   ",
+    "  Qoraal  leh  meelo  bannaan  oo  badan  ",
+    "Tab\tkala\tsaaran\nerayo",
+    "Ｓａｌａａｎ — xarfo ballaaran",
+    "Xarfo: é ñ ü ç ₂ ² ½ ﬁ",
+    "Emoji 😀 iyo calaamado ★ ✓",
+    "Salaan </s> mahadsanid",
+    ">>som<< Salaan",
+    "Erayo " * 400,
+]
+
+def load_corpus():
+    with open(CORPUS, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+def build_test_tokenizer(directory):
+    """A Marian tokenizer with source/target SentencePiece models trained on the corpus"""
+    corpus = load_corpus()
+    for name, size in (("source", 400), ("target", 300)):
+        spm.SentencePieceTrainer.train(
+            sentence_iterator=iter(corpus),
+            model_prefix=os.path.join(directory, name),
+            vocab_size=size,
+            model_type="unigram",
+            hard_vocab_limit=False,
+            minloglevel=2,
+        )
+        os.rename(os.path.join(directory, f"{name}.model"), os.path.join(directory, f"{name}.spm"))
+
+    vocab = {"</s>": 0, "<unk>": 1}
+    for name in ("source", "target"):
+        processor = spm.SentencePieceProcessor(model_file=os.path.join(directory, f"{name}.spm"))
+        for i in range(processor.get_piece_size()):
+            if not processor.is_control(i) and not processor.is_unknown(i):
+                vocab.setdefault(processor.id_to_piece(i), len(vocab))
+    vocab["<pad>"] = len(vocab)
+    with open(os.path.join(directory, "vocab.json"), "w", encoding="utf-8") as f:
+        json.dump(vocab, f, ensure_ascii=False)
+
+    return MarianTokenizer(
+        os.path.join(directory, "source.spm"),
+        os.path.join(directory, "target.spm"),
+        os.path.join(directory, "vocab.json"),
+    )
+
+def has_model_files():
+    path = os.path.join(MODEL_DIR, "source.spm")
+    if not os.path.exists(path):
+        return False
+    with open(path, "rb") as f:
+        return not f.read(64).startswith(b"version https://git-lfs")
+
+def check_equivalence(slow):
+    fast = FastMarianTokenizer(slow)
+    texts = load_corpus() + EDGE_CASES
+
+    for text in texts:
+        assert fast.tokenize(text) == slow.tokenize(text), text
+
+    expected = slow(texts, truncation=True)["input_ids"]
+    assert fast(texts, truncation=True)["input_ids"] == expected
+
+    slow_batch = slow(texts, return_tensors="np", padding=True, truncation=True)
+    fast_batch = fast(texts, return_tensors="np", padding=True, truncation=True)
+    assert np.array_equal(fast_batch["input_ids"], slow_batch["input_ids"])
+    assert np.array_equal(fast_batch["attention_mask"], slow_batch["attention_mask"])
+
+    # Decode every vocab id, including pieces the target model does not know
+    ids = [row[:40] for row in expected] + [list(range(start, start + 25)) for start in range(0, len(slow.encoder), 25)]
+    assert fast.batch_decode(ids, skip_special_tokens=True) == slow.batch_decode(ids, skip_special_tokens=True)
+    assert fast.batch_decode(ids) == slow.batch_decode(ids)
+    print(f"✅ {len(texts)} texts and {len(ids)} id sequences match")
+
+def test_trained_models_match_slow_tokenizer():
+    with tempfile.TemporaryDirectory() as directory:
+        check_equivalence(build_test_tokenizer(directory))
+
+def test_amiin_model_matches_slow_tokenizer():
+    if not has_model_files():
+        pytest.skip("amiin_model SentencePiece files not available (git lfs pull)")
+    check_equivalence(MarianTokenizer.from_pretrained(MODEL_DIR, local_files_only=True))
+
+if __name__ == "__main__":
+    test_trained_models_match_slow_tokenizer()
+    try:
+        test_amiin_model_matches_slow_tokenizer()
+    except pytest.skip.Exception as e:
+        print(f"Skipped: {e}")
+    print("All fast tokenizer tests passed")
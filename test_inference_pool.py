@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the inference pool socket protocol.
+The model processes are replaced by a thread that echoes upper-cased text,
+so this runs without TensorFlow.
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.inference_pool import InferenceClient, InferenceServer, _run_drained
+
+def start_server(socket_path):
+    server = InferenceServer(socket_path, pool_size=1)
+    server.start_workers = lambda: None  # no model processes in this test
+
+    def fake_worker():
+        while True:
+            try:
+                task_id, texts, _, _ = server.task_queue.get()
+                server.result_queue.put((task_id, [text.upper() for text in texts], None))
+            except (OSError, EOFError, ValueError):
+                return  # queues closed at interpreter exit
+
+    threading.Thread(target=fake_worker, daemon=True).start()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    for _ in range(100):
+        if os.path.exists(socket_path):
+            break
+        time.sleep(0.05)
+    return server
+
+def test_translate_and_stats():
+    """Clients get their own results back and can read pool metrics"""
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "inference.sock")
+        start_server(socket_path)
+        client = InferenceClient(socket_path, timeout=5)
+
+        assert client.translate_batch(["salaan", "mahadsanid"]) == ["SALAAN", "MAHADSANID"]
+
+        stats = client.stats()
+        print(f"Pool stats: {stats}")
+        assert stats["pool_size"] == 1
+        assert stats["completed_tasks"] == 1
+        assert stats["completed_texts"] == 2
+        assert "queue_depth" in stats
+
+def test_concurrent_clients():
+    """Many web threads can share the pool at once"""
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "inference.sock")
+        start_server(socket_path)
+        client = InferenceClient(socket_path, timeout=5)
+        results = {}
+
+        def worker(i):
+            results[i] = client.translate_batch([f"qoraal {i}"])[0]
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == {i: f"QORAAL {i}" for i in range(10)}
+
+def test_errors_are_reported():
+    """Unknown operations come back as errors instead of hanging"""
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "inference.sock")
+        start_server(socket_path)
+        client = InferenceClient(socket_path, timeout=5)
+        try:
+            client._call({"op": "explode"})
+            assert False, "expected an error"
+        except RuntimeError as e:
+            print(f"✅ Error reported: {e}")
+
+def test_drained_tasks_keep_their_generation_bound():
+    """Tasks from different web workers only share a generate call when beams and bounds match"""
+    class FakeEngine:
+        def __init__(self):
+            self.calls = []
+
+        def translate_batch(self, texts, max_new_tokens=None, num_beams=None):
+            self.calls.append((list(texts), max_new_tokens, num_beams))
+            return [text.upper() for text in texts]
+
+    class Results(list):
+        def put(self, item):
+            self.append(item)
+
+    engine = FakeEngine()
+    results = Results()
+    tasks = [
+        (1, ["salaan"], 13, 1),
+        (2, ["mahadsanid"], 2, 1),
+        (3, ["nabad"], 13, 1),
+        (4, ["qoraal dheer"], None, None),
+    ]
+    _run_drained(engine, tasks, max_batch_size=16, result_queue=results)
+    print(f"Engine calls: {engine.calls}")
+    assert engine.calls == [(["salaan", "nabad"], 13, 1), (["mahadsanid"], 2, 1), (["qoraal dheer"], None, None)]
+    assert sorted(results) == [(1, ["SALAAN"], None), (2, ["MAHADSANID"], None),
+                               (3, ["NABAD"], None), (4, ["QORAAL DHEER"], None)]
+
+if __name__ == "__main__":
+    test_translate_and_stats()
+    test_concurrent_clients()
+    test_errors_are_reported()
+    test_drained_tasks_keep_their_generation_bound()
+    print("All inference pool tests passed")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for stage timers, latency histograms and Server-Timing values
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.batching import BatchScheduler
+from services.metrics import Histogram, MetricsRegistry, StageTimings, current_timings, start_timings, timed
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("stage_seconds", "Stage latency", ("stage",), buckets=(0.01, 0.1))
+    for value in [0.005, 0.05, 0.05, 3.0]:
+        histogram.observe(value, "generate")
+    text = histogram.render()
+    print(text)
+    assert 'stage_seconds_bucket{stage="generate",le="0.01"} 1' in text
+    assert 'stage_seconds_bucket{stage="generate",le="0.1"} 3' in text
+    assert 'stage_seconds_bucket{stage="generate",le="+Inf"} 4' in text
+    assert 'stage_seconds_count{stage="generate"} 4' in text
+    try:
+        histogram.observe(1.0)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+def test_timed_records_histogram_and_request_timings():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("detect_seconds", "Detection latency", ("stage",))
+    assert registry.histogram("detect_seconds", "again") is histogram
+
+    timings = start_timings()
+    with timed(histogram, "langdetect", name="detect.langdetect"):
+        time.sleep(0.01)
+    with timed(histogram, "langdetect", name="detect.langdetect"):
+        pass
+    assert current_timings() is timings
+    assert list(timings.stages) == ["detect.langdetect"]
+    assert timings.stages["detect.langdetect"] >= 0.01
+    assert histogram.snapshot()[("langdetect",)][2] == 2
+
+    header = timings.server_timing()
+    print(f"Server-Timing: {header}")
+    assert header.startswith("detect.langdetect;dur=1")
+
+def test_concurrent_stages_keep_the_slowest():
+    timings = StageTimings()
+    timings.add("cache", 0.001)
+    timings.merge_slowest({"generate": 0.2, "decode": 0.01})
+    timings.merge_slowest({"generate": 0.5})
+    assert timings.stages == {"cache": 0.001, "generate": 0.5, "decode": 0.01}
+
+def test_batch_stage_timings_reach_the_futures():
+    histogram = Histogram("batch_seconds", "Batch stages", ("stage",))
+
+    def batch_fn(texts):
+        with timed(histogram, "generate"):
+            time.sleep(0.02)
+        return [text.upper() for text in texts]
+
+    scheduler = BatchScheduler(batch_fn, max_batch_size=4, batch_window_ms=20)
+    futures = [scheduler.submit("salaan"), scheduler.submit("nabad")]
+    assert [future.result(timeout=5) for future in futures] == ["SALAAN", "NABAD"]
+    print(f"Batch timings: {futures[0].stage_timings}")
+    assert futures[0].stage_timings["generate"] >= 0.02
+
+    # A request thread's timings are not touched by the batch thread
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(current_timings()))
+    thread.start()
+    thread.join()
+    assert seen == [None]
+
+if __name__ == "__main__":
+    test_histogram_renders_cumulative_buckets()
+    test_timed_records_histogram_and_request_timings()
+    test_concurrent_stages_keep_the_slowest()
+    test_batch_stage_timings_reach_the_futures()
+    print("All metrics tests passed")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-model registry (lazy loading, memory budget, LRU eviction, pinning)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.model_registry import MB, ModelRegistry, ModelSpec, ModelUnavailable, ServedModel
+
+class FakeEngine:
+    """Stands in for a TranslationEngine: tracks load/unload calls only"""
+
+    name = "fake"
+    max_length = 512
+
+    def __init__(self, memory_mb):
+        self.memory_bytes = int(memory_mb * MB)
+        self.loaded = False
+        self.load_calls = 0
+        self.fingerprint = "fake"
+
+    def load(self):
+        if not self.loaded:
+            self.loaded = True
+            self.load_calls += 1
+
+    def unload(self):
+        self.loaded = False
+
+def make_registry(budget_mb, sizes, pinned=(), default=None):
+    built = []
+
+    def build(spec):
+        built.append(spec.name)
+        return ServedModel(spec, FakeEngine(sizes[spec.name]), schedulers={})
+
+    specs = [
+        ModelSpec(name, f"./models/{name}", *name.split("-")[:2], pinned=name in pinned)
+        for name in sizes
+    ]
+    return ModelRegistry(specs, build, memory_budget_mb=budget_mb, default=default), built
+
+def test_models_load_on_first_use():
+    registry, built = make_registry(0, {"so-en": 300, "en-so": 300})
+    assert built == []
+    with registry.use("en-so") as served:
+        assert served.engine.loaded
+    assert built == ["en-so"]
+    assert registry.get("so-en").engine.loaded is False
+
+def test_least_recently_used_model_is_evicted():
+    registry, _ = make_registry(700, {"so-en": 300, "en-so": 300, "so-en-fast": 300})
+    for name in ["so-en", "en-so", "so-en"]:
+        with registry.use(name):
+            pass
+    with registry.use("so-en-fast"):
+        pass
+    stats = {model["name"]: model for model in registry.stats()["models"]}
+    print(f"Stats: {registry.stats()}")
+    assert stats["en-so"]["loaded"] is False and stats["en-so"]["evictions"] == 1
+    assert stats["so-en"]["loaded"] and stats["so-en-fast"]["loaded"]
+    assert registry.stats()["resident_mb"] <= 700
+
+    # Loading it again evicts the least recently used of the other two
+    with registry.use("en-so") as served:
+        assert served.engine.load_calls == 2
+    assert registry.get("so-en").engine.loaded is False
+
+def test_pinned_and_busy_models_are_not_evicted():
+    registry, _ = make_registry(700, {"so-en": 300, "en-so": 300, "so-en-fast": 300}, pinned=["so-en"])
+    registry.load_pinned()
+    busy = registry.acquire("en-so")
+    try:
+        registry.acquire("so-en-fast")
+        assert False, "expected ModelUnavailable"
+    except ModelUnavailable as e:
+        print(f"✅ Unavailable: {e}")
+    assert registry.get("so-en").engine.loaded and busy.engine.loaded
+    assert registry.get("so-en-fast").engine.loaded is False
+
+    registry.release(busy)
+    with registry.use("so-en-fast"):
+        pass
+    assert registry.get("so-en").engine.loaded
+    assert busy.engine.loaded is False
+
+def test_selector_by_name_or_direction():
+    registry, _ = make_registry(0, {"so-en-fast": 100, "so-en": 300, "en-so": 300}, default="so-en")
+    assert registry.resolve(None) == "so-en"
+    assert registry.resolve("so-en-fast") == "so-en-fast"
+    # A direction picks the default model when it serves that direction
+    assert registry.resolve("so-en") == "so-en"
+    assert registry.get("en-so").spec.direction == "en-so"
+    for selector in ["fr-en", 3]:
+        try:
+            registry.resolve(selector)
+            assert False, "expected ValueError"
+        except ValueError as e:
+            print(f"✅ Rejected {selector!r}: {e}")
+
+def test_reacquired_victim_is_not_unloaded():
+    registry, _ = make_registry(400, {"so-en": 300, "en-so": 300})
+    with registry.use("so-en"):
+        pass
+    victim = registry.get("so-en")
+    real_unload = registry._unload
+    reacquired = []
+
+    def unload_after_reacquire(entry, loading):
+        # Another request takes the victim back between picking and unloading it
+        if not reacquired:
+            with registry._lock:
+                entry.resident = True
+                entry.in_use += 1
+            reacquired.append(entry)
+        real_unload(entry, loading)
+
+    registry._unload = unload_after_reacquire
+    registry.acquire("en-so")
+    assert reacquired and victim.engine.loaded
+    print("✅ Victim taken back before its unload stays loaded")
+
+def test_build_failure_is_unavailable():
+    attempts = []
+
+    def build(spec):
+        attempts.append(spec.name)
+        if len(attempts) == 1:
+            raise OSError("model files missing")
+        return ServedModel(spec, FakeEngine(100), schedulers={})
+
+    registry = ModelRegistry([ModelSpec("so-en", "./models/so-en", "so", "en")], build)
+    try:
+        registry.get()
+        assert False, "expected ModelUnavailable"
+    except ModelUnavailable as e:
+        print(f"✅ Build failure: {e}")
+        assert isinstance(e.__cause__, OSError)
+    # The next request tries again
+    assert registry.get().engine is not None and attempts == ["so-en", "so-en"]
+
+if __name__ == "__main__":
+    test_models_load_on_first_use()
+    test_least_recently_used_model_is_evicted()
+    test_pinned_and_busy_models_are_not_evicted()
+    test_selector_by_name_or_direction()
+    test_reacquired_victim_is_not_unloaded()
+    test_build_failure_is_unavailable()
+    print("All model registry tests passed")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for the character n-gram Somali classifier
+"""
+
+import sys
+import os
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.ngram_classifier import DEFAULT_MODEL_PATH, NgramClassifier, hashed_ngrams, normalize
+from routes.language_detection import SomaliLanguageDetector
+
+SOMALI = ["Salaan, sidee tahay?", "Waxaan ku jiraa halkan", "Maanta cimiladu aad bay u wanaagsan tahay."]
+OTHER = ["Hello, how are you?", "I am here today", "The meeting was moved to next Tuesday afternoon."]
+
+def test_features_are_stable():
+    assert normalize("Waa  Maxay? 2023!") == " waa maxay "
+    assert normalize("123 ...") == ""
+    features = hashed_ngrams("waa")
+    # " waa " has 5 unigrams, 4 bigrams, 3 trigrams and 2 four-grams
+    assert len(features) == 14
+    assert features.max() < 1 << 16
+    assert np.array_equal(features, hashed_ngrams("WAA!"))
+    print(f"✅ Features: {features.tolist()}")
+
+def test_batch_scores_match_single_scores():
+    classifier = NgramClassifier.load(DEFAULT_MODEL_PATH)
+    texts = SOMALI + ["", "42"] + OTHER + ["a"]
+    single = [classifier.score(text) for text in texts]
+    assert np.allclose(classifier.scores(texts), single, atol=1e-6)
+    assert classifier.scores([]).shape == (0,)
+    for text in SOMALI:
+        assert classifier.probability(text) > 0.6, text
+    for text in OTHER:
+        assert classifier.probability(text) < 0.4, text
+    print(f"✅ Scores: {[round(score, 2) for score in single]}")
+
+def test_train_save_load_round_trip():
+    classifier = NgramClassifier.train(SOMALI, OTHER, num_features=1 << 10)
+    assert classifier.score("waxaan") > 0 > classifier.score("the")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.npz")
+        classifier.save(path)
+        loaded = NgramClassifier.load(path)
+    assert loaded.orders == classifier.orders and loaded.num_features == 1 << 10
+    assert loaded.score("waxaan") == classifier.score("waxaan")
+    try:
+        NgramClassifier.train(SOMALI, OTHER, num_features=1000)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+def test_detector_uses_the_classifier_first():
+    detector = SomaliLanguageDetector(primary="ngram")
+    result = detector.detect_text_language("Waxaan rabaa inaan barto luqadda Ingiriisiga.")
+    print(f"✅ Detection: {result}")
+    assert result["method"] == "ngram" and result["language"] == "so"
+
+    missing = SomaliLanguageDetector(primary="ngram", ngram_model_path="/nonexistent/model.npz")
+    assert missing.primary == "langdetect"
+    try:
+        SomaliLanguageDetector(primary="fasttext")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    test_features_are_stable()
+    test_batch_scores_match_single_scores()
+    test_train_save_load_round_trip()
+    test_detector_uses_the_classifier_first()
+    print("All n-gram classifier tests passed")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script for quantized (float16 / int8) weight files
+"""
+
+import sys
+import os
+import json
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.model_weights import MappedWeights, export_mmap_weights, quantize_int8, dequantize_int8
+from test_mmap_weights import FakeModel, FakeWeight, make_model as make_fake_model
+
+# An embedding, a dense kernel and a bias, as the quantizer sees them in Marian
+WEIGHTS = [
+    ("model/shared/weight:0", (200, 16), np.float32),
+    ("model/encoder/fc1/kernel:0", (16, 64), np.float32),
+    ("model/encoder/fc1/bias:0", (64,), np.float32),
+]
+TEXTS = ["Salaan, sidee tahay?", "Waxaan ku jiraa halkan."]
+
+def make_model():
+    return make_fake_model(WEIGHTS)
+
+def build_tiny_marian(model_dir):
+    """A randomly initialised two-layer Marian model with a tokenizer trained on the corpus"""
+    import tensorflow as tf
+    from transformers import MarianConfig, TFMarianMTModel
+    from test_fast_tokenizer import build_test_tokenizer
+
+    tokenizer = build_test_tokenizer(model_dir)
+    tokenizer.save_pretrained(model_dir)
+    tf.random.set_seed(0)
+    config = MarianConfig(
+        vocab_size=len(tokenizer.encoder), d_model=16, encoder_layers=1, decoder_layers=1,
+        encoder_attention_heads=2, decoder_attention_heads=2, encoder_ffn_dim=32, decoder_ffn_dim=32,
+        pad_token_id=tokenizer.pad_token_id, eos_token_id=tokenizer.eos_token_id,
+        decoder_start_token_id=tokenizer.pad_token_id, max_length=16,
+    )
+    model = TFMarianMTModel(config)
+    model(model.dummy_inputs)
+    model.save_pretrained(model_dir)
+    return model
+
+def test_int8_round_trip_error():
+    """Per-channel int8 error stays within half a quantization step"""
+    array = np.random.default_rng(1).standard_normal((32, 48)).astype(np.float32)
+    values, scales = quantize_int8(array, axis=1)
+    assert values.dtype == np.int8 and scales.shape == (1, 48)
+    error = np.abs(dequantize_int8(values, scales) - array)
+    assert np.all(error <= scales / 2 + 1e-6)
+
+def test_int8_file_is_smaller_and_loads():
+    """Matrices are stored as int8, vectors stay float32, values load back close"""
+    model = make_model()
+    with tempfile.TemporaryDirectory() as plain_dir, tempfile.TemporaryDirectory() as int8_dir:
+        export_mmap_weights(model, plain_dir)
+        export_mmap_weights(model, int8_dir, quantization="int8")
+        plain_size = os.path.getsize(os.path.join(plain_dir, "weights.bin"))
+        int8_size = os.path.getsize(os.path.join(int8_dir, "weights.bin"))
+        print(f"float32: {plain_size} bytes, int8: {int8_size} bytes")
+        assert int8_size < plain_size / 3
+
+        with open(os.path.join(int8_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+        assert [entry.get("quantization") for entry in manifest["weights"]] == ["int8", "int8", None]
+        # Embeddings get one scale per token row, dense kernels per output column
+        assert manifest["weights"][0]["scale_shape"] == [200, 1]
+        assert manifest["weights"][1]["scale_shape"] == [1, 64]
+
+        mapped = MappedWeights(int8_dir)
+        assert mapped.quantization == "int8"
+        target = FakeModel([FakeWeight(w.name, np.zeros_like(w.value)) for w in model.weights])
+        mapped.assign_to(target)
+        for original, assigned in zip(model.weights, target.assigned):
+            assert assigned.dtype == np.float32
+            assert np.allclose(assigned, original.value, atol=0.05)
+
+def test_float16_into_float16_variables():
+    """float16 files load into float16 variables, or back into float32 ones"""
+    model = make_model()
+    with tempfile.TemporaryDirectory() as weights_dir:
+        export_mmap_weights(model, weights_dir, quantization="float16")
+        mapped = MappedWeights(weights_dir)
+
+        half = FakeModel([FakeWeight(w.name, w.value, dtype=np.float16) for w in model.weights])
+        mapped.assign_to(half)
+        assert all(value.dtype == np.float16 for value in half.assigned)
+
+        full = FakeModel([FakeWeight(w.name, w.value) for w in model.weights])
+        mapped.assign_to(full)
+        assert all(value.dtype == np.float32 for value in full.assigned)
+        assert np.allclose(full.assigned[1], model.weights[1].value, atol=1e-2)
+
+def test_float16_engine_loads_marian():
+    """TFMarianEngine builds float16 variables from tf_model.h5 and from an int8 mmap file"""
+    from services.engines import TFMarianEngine
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        model = build_tiny_marian(model_dir)
+        int8_dir = os.path.join(model_dir, "mmap_weights_int8")
+        export_mmap_weights(model, int8_dir, quantization="int8")
+
+        for weights_dir in (None, int8_dir):
+            engine = TFMarianEngine(model_dir, weights_dir=weights_dir, weights_dtype="float16")
+            translations = engine.translate_batch(TEXTS, max_new_tokens=8)
+            dtypes = {weight.name: weight.dtype.name for weight in engine.model.weights}
+            print(f"✅ float16 from {weights_dir or 'tf_model.h5'}: {translations}")
+            # Only the final logits bias stays float32
+            assert dtypes.pop("final_logits_bias:0") == "float32"
+            assert set(dtypes.values()) == {"float16"}
+            assert len(translations) == len(TEXTS) and all(translation.strip() for translation in translations)
+        assert engine.mapped_weights.quantization == "int8"
+
+def test_unknown_scheme_is_rejected():
+    with tempfile.TemporaryDirectory() as weights_dir:
+        try:
+            export_mmap_weights(make_model(), weights_dir, quantization="int4")
+            assert False, "expected a ValueError"
+        except ValueError as e:
+            print(f"✅ Rejected: {e}")
+
+if __name__ == "__main__":
+    test_int8_round_trip_error()
+    test_int8_file_is_smaller_and_loads()
+    test_float16_into_float16_variables()
+    test_float16_engine_loads_marian()
+    test_unknown_scheme_is_rejected()
+    print("All quantization tests passed")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for sentence segmentation of long translation inputs
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.segmentation import segment_text
+
+def test_sentences_and_whitespace():
+    """Sentences are split and the original whitespace is kept"""
+    text = "  Salaan, sidee tahay?  Waxaan ku jiraa halkan.\n\nMahadsanid!"
+    segmented = segment_text(text)
+
+    print(f"Segments: {segmented.segments}")
+    assert segmented.segments == ["Salaan, sidee tahay?", "Waxaan ku jiraa halkan.", "Mahadsanid!"]
+    assert segmented.join(segmented.segments) == text
+
+def test_line_breaks_split_segments():
+    """Lines without punctuation are translated separately"""
+    segmented = segment_text("salaan\nmahadsanid  \nnabad")
+    assert segmented.segments == ["salaan", "mahadsanid", "nabad"]
+    assert segmented.join(["hello", "thank you", "peace"]) == "hello\nthank you  \npeace"
+
+def test_punctuation_is_restored():
+    """Trailing punctuation dropped by the model is carried over"""
+    segmented = segment_text("Sidee tahay? Waan fiicnahay.")
+    assert segmented.join(["How are you", "I am fine."]) == "How are you? I am fine."
+
+def test_long_sentences_are_split_at_clauses():
+    """Sentences over the length limit are split at commas, then words"""
+    text = "qof walba wuu yimid, carruurtii way ciyaareen, dadkii way cuneen"
+    segmented = segment_text(text, length_fn=lambda t: len(t.split()), max_length=4)
+
+    print(f"Clauses: {segmented.segments}")
+    assert all(len(segment.split()) <= 4 for segment in segmented.segments)
+    assert segmented.join(segmented.segments) == text
+
+    words = " ".join(f"eray{i}" for i in range(10))
+    segmented = segment_text(words, length_fn=lambda t: len(t.split()), max_length=3)
+    assert all(len(segment.split()) <= 3 for segment in segmented.segments)
+    assert segmented.join(segmented.segments) == words
+
+def test_short_texts_are_measured_too():
+    """A text with fewer characters than the limit can still have more tokens"""
+    def pieces(text):
+        # Word-start marker plus two byte-fallback pieces per character
+        return sum(2 * len(word) + 1 for word in text.split())
+
+    text = "ab cd ef gh"
+    assert len(text) < 16 < pieces(text)
+    segmented = segment_text(text, length_fn=pieces, max_length=16)
+    print(f"Pieces: {segmented.segments}")
+    assert len(segmented) > 1 and all(pieces(segment) <= 16 for segment in segmented.segments)
+    assert segmented.join(segmented.segments) == text
+
+def test_short_text_is_one_segment():
+    """A short single sentence is left alone"""
+    segmented = segment_text("Mahadsanid")
+    assert len(segmented) == 1
+
+if __name__ == "__main__":
+    test_sentences_and_whitespace()
+    test_line_breaks_split_segments()
+    test_punctuation_is_restored()
+    test_long_sentences_are_split_at_clauses()
+    test_short_texts_are_measured_too()
+    test_short_text_is_one_segment()
+    print("All segmentation tests passed")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the memory-mapped translation cache shared across workers
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.shared_cache import SharedTranslationCache
+
+def test_round_trip_and_restart():
+    """Entries written by one instance are visible to a new one (restart)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.bin")
+        cache = SharedTranslationCache(path, "model-v1", max_bytes=64 * 1024)
+        cache.put("sidee tahay", "how are you")
+        cache.put("mahadsanid", "thank you")
+        assert cache.get("sidee  tahay") == "how are you"
+        cache.close()
+
+        restarted = SharedTranslationCache(path, "model-v1", max_bytes=64 * 1024)
+        assert restarted.get("mahadsanid") == "thank you"
+        assert restarted.get("salaan") is None
+        print(f"Stats: {restarted.stats()}")
+
+def test_new_model_version_never_serves_stale_entries():
+    """A different model fingerprint resets the file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.bin")
+        old = SharedTranslationCache(path, "model-v1", max_bytes=64 * 1024)
+        old.put("salaan", "hello")
+        old.close()
+
+        new = SharedTranslationCache(path, "model-v2", max_bytes=64 * 1024)
+        assert new.get("salaan") is None
+        new.put("salaan", "greetings")
+        assert new.get("salaan") == "greetings"
+
+def test_size_bound_evicts_oldest():
+    """The ring buffer overwrites the oldest entries once full"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.bin")
+        cache = SharedTranslationCache(path, "model-v1", max_bytes=4096, avg_entry_bytes=64)
+        for i in range(200):
+            cache.put(f"qoraal {i}", f"text number {i}")
+
+        assert os.path.getsize(path) == cache.file_size
+        assert cache.get("qoraal 0") is None
+        assert cache.get("qoraal 199") == "text number 199"
+        print(f"File size stays at {cache.file_size} bytes")
+
+def test_visible_across_processes():
+    """A child process reads what the parent wrote and vice versa"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.bin")
+        cache = SharedTranslationCache(path, "model-v1", max_bytes=64 * 1024)
+        cache.put("maanta", "today")
+
+        pid = os.fork()
+        if pid == 0:
+            ok = cache.get("maanta") == "today"
+            cache.put("berri", "tomorrow")
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+
+        assert os.WEXITSTATUS(status) == 0
+        assert cache.get("berri") == "tomorrow"
+
+def test_unicode_values():
+    """Non-ASCII text survives the round trip"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SharedTranslationCache(os.path.join(tmp, "cache.bin"), "model-v1", max_bytes=64 * 1024)
+        cache.put("qaxwo", "café ☕")
+        assert cache.get("qaxwo") == "café ☕"
+
+if __name__ == "__main__":
+    test_round_trip_and_restart()
+    test_new_model_version_never_serves_stale_entries()
+    test_size_bound_evicts_oldest()
+    test_visible_across_processes()
+    test_unicode_values()
+    print("All shared cache tests passed")
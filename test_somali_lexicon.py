@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test script for the affix tries and the Somali lexicon loader
+"""
+
+import sys
+import os
+import json
+import random
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.affix_trie import AffixTrie
+from routes.language_detection import SomaliLanguageDetector, load_lexicon
+
+def test_tries_match_startswith_and_endswith():
+    rng = random.Random(0)
+    affixes = ["".join(rng.choice("abcdw") for _ in range(rng.randint(1, 4))) for _ in range(300)]
+    words = ["".join(rng.choice("abcdwx") for _ in range(rng.randint(0, 8))) for _ in range(2000)]
+    prefixes = AffixTrie(affixes)
+    suffixes = AffixTrie(affixes, reverse=True)
+    assert len(prefixes) == len(set(affixes))
+    for word in words:
+        assert prefixes.matches(word) == word.startswith(tuple(affixes)), word
+        assert suffixes.matches(word) == word.endswith(tuple(affixes)), word
+    print(f"✅ {len(words)} words match startswith/endswith over {len(set(affixes))} affixes")
+
+    assert not AffixTrie().matches("waa")
+    assert AffixTrie([""]).matches("hello") and AffixTrie([""], reverse=True).matches("")
+
+def test_lexicon_extends_the_detector():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "somali_lexicon.json")
+        assert load_lexicon(path) == {}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"common_words": ["Buug"], "prefixes": ["xag"], "suffixes": ["ee"]}, f)
+        detector = SomaliLanguageDetector(lexicon_path=path)
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"verbs": ["keen"]}, f)
+        try:
+            load_lexicon(path)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+    assert "buug" in detector.common_words and "waa" in detector.common_words
+    assert detector._pattern_ratio(["buug", "xaggee", "gee", "hello"]) == (1 + 0.5 + 0.3) / 4
+    print("✅ Lexicon words, prefixes and suffixes are scored")
+
+    builtin = SomaliLanguageDetector(lexicon_path="")
+    assert builtin._pattern_ratio(["buug", "xaggee", "gee", "hello"]) == 0.0
+
+if __name__ == "__main__":
+    test_tries_match_startswith_and_endswith()
+    test_lexicon_extends_the_detector()
+    print("All lexicon tests passed")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test script for the /translate/batch endpoint
+"""
+
+import requests
+
+BASE_URL = "http://localhost:5000"
+
+def test_batch_keeps_order():
+    """Every input gets a result or an error, at the same index"""
+    texts = ["Salaan, sidee tahay?", "Hello, how are you?", "", "Mahadsanid caawimaadda aad i siisay."]
+    print("Testing /translate/batch...")
+
+    try:
+        response = requests.post(f"{BASE_URL}/translate/batch", json={"texts": texts})
+        print(f"Status: {response.status_code}")
+        data = response.json()
+
+        for item in data["results"]:
+            if "translated_text" in item:
+                print(f"✅ [{item['index']}] {texts[item['index']]!r} -> {item['translated_text']!r} (id={item['id']})")
+            else:
+                print(f"❌ [{item['index']}] {texts[item['index']]!r}: {item['error']}")
+
+        assert [item["index"] for item in data["results"]] == list(range(len(texts)))
+        assert data["total"] == len(texts)
+        print(f"Translated {data['translated']}, failed {data['failed']}")
+
+    except requests.exceptions.ConnectionError:
+        print("❌ Could not connect to server. Make sure Flask app is running.")
+
+def test_batch_rejects_bad_input():
+    """A missing or empty list is a 400"""
+    try:
+        for body in ({}, {"texts": []}, {"texts": "Salaan"}):
+            response = requests.post(f"{BASE_URL}/translate/batch", json=body)
+            print(f"{body}: {response.status_code} {response.json()}")
+    except requests.exceptions.ConnectionError:
+        print("❌ Could not connect to server. Make sure Flask app is running.")
+
+if __name__ == "__main__":
+    test_batch_keeps_order()
+    test_batch_rejects_bad_input()
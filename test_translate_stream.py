@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for the /translate/stream Server-Sent Events endpoint
+"""
+
+import requests
+import json
+import time
+
+BASE_URL = "http://localhost:5000"
+
+def read_events(response):
+    """Yield (event, data) pairs from an SSE response"""
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            yield event, json.loads(line[len("data: "):])
+
+def test_stream_long_text():
+    """Segments arrive one by one, followed by a final done event"""
+    text = (
+        "Salaan, sidee tahay? Waxaan ku jiraa halkan maanta. "
+        "Mahadsanid caawimaadda aad i siisay. Berri waan kuu imaan doonaa."
+    )
+    print("Testing /translate/stream...")
+
+    try:
+        start = time.monotonic()
+        response = requests.post(f"{BASE_URL}/translate/stream", json={"text": text}, stream=True)
+        print(f"Status: {response.status_code}, Content-Type: {response.headers.get('Content-Type')}")
+
+        segments = []
+        for event, data in read_events(response):
+            elapsed = (time.monotonic() - start) * 1000
+            if event == "segment":
+                segments.append(data["text"])
+                print(f"  [{elapsed:7.1f} ms] segment {data['index'] + 1}/{data['total']}: {data['text']!r}")
+            elif event == "done":
+                print(f"  [{elapsed:7.1f} ms] done: id={data['id']}")
+                print(f"  Language detection: {data['language_detection']}")
+                print(f"✅ Full translation: {data['translated_text']}")
+                assert data["translated_text"] == "".join(segments).strip()
+            elif event == "error":
+                print(f"❌ Error event: {data['error']}")
+
+    except requests.exceptions.ConnectionError:
+        print("❌ Could not connect to server. Make sure Flask app is running.")
+
+def test_stream_non_somali():
+    """Non-Somali input gets the usual JSON error instead of a stream"""
+    try:
+        response = requests.post(f"{BASE_URL}/translate/stream", json={"text": "Hello, how are you?"})
+        print(f"Non-Somali status: {response.status_code}")
+        print(f"Response: {response.json()}")
+    except requests.exceptions.ConnectionError:
+        print("❌ Could not connect to server. Make sure Flask app is running.")
+
+if __name__ == "__main__":
+    test_stream_long_text()
+    test_stream_non_somali()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-process translation cache
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.translation_cache import TranslationCache, model_fingerprint, normalize_text
+from services.segmentation import segment_text
+
+def test_normalized_lookup():
+    """Whitespace differences should hit the same cache entry"""
+    cache = TranslationCache("test", max_bytes=1024 * 1024)
+    cache.put("sidee tahay", "how are you")
+
+    assert cache.get("  sidee   tahay ") == "how are you"
+    assert cache.get("mahadsanid") is None
+    stats = cache.stats()
+    print(f"Stats: {stats}")
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert normalize_text(" salaan\n\tsalaan ") == "salaan salaan"
+
+def test_memory_cap_evicts_least_recently_used():
+    """The cache never grows beyond its memory cap"""
+    cache = TranslationCache("test", max_bytes=1000)
+    for i in range(20):
+        cache.put(f"qoraal {i}", f"text {i}")
+        cache.get("qoraal 0")  # keep the first entry hot
+
+    stats = cache.stats()
+    print(f"Stats after filling: {stats}")
+    assert stats["current_bytes"] <= 1000
+    assert stats["evictions"] > 0
+    assert cache.get("qoraal 0") == "text 0"
+    assert cache.get("qoraal 1") is None
+
+def test_disabled_cache():
+    """A zero memory cap disables the cache"""
+    cache = TranslationCache("test", max_bytes=0)
+    cache.put("salaan", "hello")
+    assert cache.get("salaan") is None
+    assert cache.stats()["enabled"] is False
+
+def test_fingerprint_changes_with_model_config():
+    """Changing the model config changes the fingerprint and the cache keys"""
+    with tempfile.TemporaryDirectory() as model_dir:
+        config_path = os.path.join(model_dir, "config.json")
+        with open(config_path, "w") as f:
+            f.write('{"d_model": 512}')
+        first = model_fingerprint(model_dir)
+        with open(config_path, "w") as f:
+            f.write('{"d_model": 1024}')
+        second = model_fingerprint(model_dir)
+
+    print(f"Fingerprints: {first} -> {second}")
+    assert first != second
+    assert TranslationCache(first).make_key("salaan") != TranslationCache(second).make_key("salaan")
+
+def test_layout_comes_from_the_text_not_the_cache():
+    """Texts that normalize alike are rebuilt from cached segments with their own whitespace"""
+    cache = TranslationCache("test", max_bytes=1024 * 1024)
+    paragraphs = "Salaan.\n\nMahadsanid!"
+    one_line = "Salaan. Mahadsanid!"
+    assert cache.make_key(paragraphs) == cache.make_key(one_line)
+
+    for segment, translation in [("Salaan.", "Hello."), ("Mahadsanid!", "Thank you!")]:
+        cache.put(segment, translation)
+    rebuilt = {}
+    for text in (paragraphs, one_line):
+        segmented = segment_text(text)
+        rebuilt[text] = segmented.join([cache.get(segment) for segment in segmented.segments])
+    print(f"Rebuilt: {rebuilt}")
+    assert rebuilt == {paragraphs: "Hello.\n\nThank you!", one_line: "Hello. Thank you!"}
+
+if __name__ == "__main__":
+    test_normalized_lookup()
+    test_memory_cap_evicts_least_recently_used()
+    test_disabled_cache()
+    test_fingerprint_changes_with_model_config()
+    test_layout_comes_from_the_text_not_the_cache()
+    print("All translation cache tests passed")
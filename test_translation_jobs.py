@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk translation jobs (POST /translate/jobs).
+The worker's batch logic is tested with simple stand-ins for the model and
+the detector; the HTTP part needs the Flask app and a job worker running.
+"""
+
+import sys
+import os
+import time
+from datetime import datetime
+import requests
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.batching import BucketedBatchScheduler
+from services.translation_cache import TranslationCache
+from services.translation_jobs import TranslationJobWorker, _join_document, serialize_job
+
+BASE_URL = "http://localhost:5000"
+
+class UpperCaseEngine:
+    max_length = 512
+
+    def __init__(self):
+        self.batches = []
+        self.bounds = []
+
+    def count_tokens(self, text):
+        return len(text.split())
+
+    def translate_batch(self, texts, max_new_tokens=None, num_beams=None):
+        self.batches.append(list(texts))
+        self.bounds.append(max_new_tokens)
+        return [text.upper() for text in texts]
+
+class FakeHistory:
+    """Stands in for the translations collection"""
+    def __init__(self):
+        self.entries = []
+
+    def insert_many(self, entries, ordered=True):
+        ids = [f"h{len(self.entries) + i}" for i in range(len(entries))]
+        self.entries.extend(entries)
+        return type("InsertManyResult", (), {"inserted_ids": ids})()
+
+class WordListDetector:
+    """Calls a text Somali when it contains a known Somali word"""
+    def detect_text_language(self, text):
+        if any(word in text.lower().split() for word in ("waa", "salaan", "mahadsanid", "waxaan")):
+            return {"language": "so", "confidence": 0.8, "method": "pattern_matching"}
+        return {"language": "other", "confidence": 0.8, "method": "combined_analysis"}
+
+def test_items_are_translated_in_bounded_batches():
+    """Somali items share batches of at most max_batch_size, capped per bucket; other items get the usual error"""
+    engine = UpperCaseEngine()
+    scheduler = BucketedBatchScheduler(engine.translate_batch, engine.count_tokens, boundaries=[2, 8],
+                                       max_batch_size=2, batch_window_ms=20)
+    worker = TranslationJobWorker(None, engine, WordListDetector(), scheduler=scheduler)
+    texts = ["salaan", "hello there", "waxaan ku jiraa halkan", "  ", "waa", "mahadsanid", "waa maalin", "salaan waa"]
+    results = worker.translate_items(texts)
+
+    print(f"Results: {results}, batches: {engine.batches}, bounds: {engine.bounds}")
+    assert len(engine.batches) > 1 and all(len(batch) <= 2 for batch in engine.batches)
+    assert sorted(text for batch in engine.batches for text in batch) == sorted(
+        text for text in texts if WordListDetector().detect_text_language(text)["language"] == "so")
+    # The bucket's generation bound (1.5 x upper + 10), as for /translate
+    for batch, bound in zip(engine.batches, engine.bounds):
+        assert bound == (13 if len(batch[0].split()) <= 2 else 22)
+    assert results[0]["translated_text"] == "SALAAN"
+    assert "error" in results[1] and results[1]["language_detection"]["is_somali"] is False
+    assert results[2]["translated_text"] == "WAXAAN KU JIRAA HALKAN"
+    assert "error" in results[3]
+
+def test_items_go_through_segments_cache_and_history():
+    """Items are segmented and cached like /translate, and saved to the history"""
+    engine = UpperCaseEngine()
+    cache = TranslationCache("test", max_bytes=1024 * 1024)
+    cache.put("Waa maalin fiican.", "It is a nice day.")
+    history = FakeHistory()
+    worker = TranslationJobWorker(None, engine, WordListDetector(), cache=cache, history=history,
+                                  max_segment_tokens=4, model_name="amiin")
+
+    texts = ["Salaan waa.\n\nWaa maalin fiican.", "salaan waa", "hello there"]
+    results = worker.translate_items(texts)
+    worker.save_history(texts, results, user_id="65a1f0c2e4b0a1b2c3d4e5f6")
+
+    print(f"Results: {results}, batches: {engine.batches}")
+    # The cached sentence is not translated again; the repeated one only once
+    assert engine.batches == [["salaan waa", "Salaan waa."]]
+    assert results[0]["translated_text"] == "SALAAN WAA.\n\nIt is a nice day."
+    assert results[1]["translated_text"] == "SALAAN WAA"
+    assert cache.get("Salaan waa.") == "SALAAN WAA."
+    assert [entry["original_text"] for entry in history.entries] == texts[:2]
+    assert history.entries[0]["model"] == "amiin" and str(history.entries[0]["user_id"]) == "65a1f0c2e4b0a1b2c3d4e5f6"
+    assert results[0]["id"] == "h0" and "id" not in results[2]
+
+    # Sentences over max_segment_tokens are split before they reach the engine
+    worker.translate_items(["waa eray eray eray eray eray eray"])
+    assert all(len(text.split()) <= 4 for text in engine.batches[-1])
+
+def test_document_is_rebuilt():
+    """Document jobs are joined back with the original layout"""
+    texts = ["Salaan.", "12345", "Waa maalin fiican!"]
+    results = [{"translated_text": "Hello"}, {"error": "not Somali"}, {"translated_text": "It is a nice day"}]
+    layout = {"leading": "", "separators": [" ", "\n", ""]}
+
+    document = _join_document(layout, texts, results)
+    print(f"Document: {document!r}")
+    assert document == "Hello. 12345\nIt is a nice day!"
+
+def test_serialize_progress():
+    """Progress is reported as a fraction of completed items"""
+    now = datetime.utcnow()
+    job = {"_id": "abc", "status": "running", "total": 4, "completed": 1,
+           "created_at": now, "updated_at": now, "results": [None] * 4}
+    body = serialize_job(job, include_results=False)
+    assert body["progress"] == 0.25
+    assert "results" not in body
+
+def test_job_api():
+    """Create a job over HTTP and poll it until it finishes"""
+    try:
+        response = requests.post(f"{BASE_URL}/translate/jobs", json={"texts": ["Salaan", "Mahadsanid", "Hello"]})
+        print(f"Create job: {response.status_code} {response.json()}")
+        if response.status_code != 202:
+            return
+        job_id = response.json()["id"]
+
+        for _ in range(30):
+            job = requests.get(f"{BASE_URL}/translate/jobs/{job_id}").json()
+            print(f"Status: {job['status']} ({job['completed']}/{job['total']})")
+            if job["status"] in ("completed", "failed"):
+                print(f"Results: {job.get('results')}")
+                break
+            time.sleep(1)
+    except requests.exceptions.ConnectionError:
+        print("❌ Could not connect to server. Make sure Flask app is running.")
+
+if __name__ == "__main__":
+    test_items_are_translated_in_bounded_batches()
+    test_items_go_through_segments_cache_and_history()
+    test_document_is_rebuilt()
+    test_serialize_progress()
+    test_job_api()
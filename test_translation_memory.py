@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for the fuzzy translation memory (MinHash/LSH over character n-grams)
+"""
+
+import sys
+import os
+import time
+import random
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.translation_memory import TranslationMemory, memory_text, transfer_numbers
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "somali_corpus.txt")
+
+def test_punctuation_and_case_are_ignored():
+    """The same sentence with other punctuation/case is a full match"""
+    memory = TranslationMemory()
+    memory.add("Sidee tahay, saaxiib?", "How are you, friend?", "a1")
+
+    matches = memory.lookup("sidee tahay saaxiib!!")
+    print(f"Matches: {matches}")
+    assert len(matches) == 1
+    assert matches[0]["similarity"] == 1.0
+    assert matches[0]["translated_text"] == "How are you, friend?"
+    assert matches[0]["id"] == "a1"
+    assert memory_text("  Sidee   TAHAY? ") == "sidee tahay"
+
+def test_extra_word_is_found_and_unrelated_text_is_not():
+    memory = TranslationMemory(threshold=0.7)
+    memory.add("Waxaan u socdaa suuqa si aan u iibsado khudaar", "I am going to the market to buy vegetables")
+    memory.add("Roob badan ayaa da'ay xalay", "It rained a lot last night")
+
+    matches = memory.lookup("Waxaan u socdaa suuqa si aan u iibsado khudaar cusub")
+    assert matches and matches[0]["translated_text"] == "I am going to the market to buy vegetables"
+    assert 0.7 <= matches[0]["similarity"] < 1.0
+    assert memory.lookup("Ardaydu waxay dhigtaan dugsiga") == []
+
+def test_changed_number_is_carried_into_translation():
+    memory = TranslationMemory()
+    memory.add("Waxaan haystaa 5 buug", "I have 5 books")
+
+    match = memory.lookup("Waxaan haystaa 12 buug")[0]
+    print(f"Number match: {match}")
+    assert match["translated_text"] == "I have 12 books"
+    assert match["numbers_adjusted"] is True
+    assert match["similarity"] == 1.0
+
+    # Without the old number in the translation it cannot be adjusted and
+    # the texts are compared with their numbers
+    assert transfer_numbers("qiimaha waa 7", "qiimaha waa 5", "the price is five") == ("the price is five", False)
+    memory.add("qiimaha waa 5", "the price is five")
+    assert memory.lookup("qiimaha waa 7", threshold=0.95) == []
+
+def test_oldest_entries_are_dropped():
+    memory = TranslationMemory(max_entries=3)
+    for i, word in enumerate(["salaan", "mahadsanid", "nabad", "guriga"]):
+        memory.add(word, f"text {i}")
+    assert len(memory) == 3
+    assert memory.lookup("salaan") == []
+    assert memory.lookup("guriga")[0]["translated_text"] == "text 3"
+
+def test_history_load_keeps_newest_translation():
+    """History is loaded newest first; older rows never replace newer ones"""
+    memory = TranslationMemory(max_entries=2)
+    memory.add("nabad", "live translation")
+    memory.load([
+        {"_id": "3", "original_text": "nabad", "translated_text": "newest history"},
+        {"_id": "2", "original_text": "salaan", "translated_text": "hello"},
+        {"_id": "1", "original_text": "guriga", "translated_text": "the house"},
+    ])
+    assert memory.lookup("nabad")[0]["translated_text"] == "live translation"
+    assert memory.lookup("salaan")[0]["translated_text"] == "hello"
+    assert memory.lookup("guriga") == []
+
+    # New translations push out history before anything added live
+    memory.add("mahadsanid", "thank you")
+    assert memory.lookup("salaan") == []
+    assert memory.lookup("nabad")[0]["translated_text"] == "live translation"
+
+def test_entries_are_stored_compactly():
+    """Signatures live in numpy arrays, not per-entry Python objects"""
+    with open(CORPUS, encoding="utf-8") as f:
+        words = f.read().split()
+    rng = random.Random(1)
+    sources = [" ".join(rng.choices(words, k=10)) for _ in range(5000)]
+    translations = [f"translation {i}" for i in range(len(sources))]
+    memory = TranslationMemory()
+    tracemalloc.start()
+    for source, translation in zip(sources, translations):
+        memory.add(source, translation)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_entry = used / len(memory)
+    print(f"{per_entry:.0f} bytes per entry")
+    assert memory._signatures.dtype.name == "uint32"
+    assert memory._band_hashes.dtype.name == "uint64"
+    assert per_entry < 2048
+
+def test_lookup_is_sub_millisecond():
+    with open(CORPUS, encoding="utf-8") as f:
+        words = f.read().split()
+    rng = random.Random(0)
+    sources = [" ".join(rng.choices(words, k=rng.randint(4, 14))) for _ in range(20000)]
+    memory = TranslationMemory()
+    for i, source in enumerate(sources):
+        memory.add(source, f"translation {i}")
+
+    # Near-duplicates of stored sources and unseen texts
+    queries = [f"{source}!" for source in sources[:100]] + [f"{source} {rng.choice(words)}" for source in sources[100:150]]
+    queries += [" ".join(rng.choices(words, k=8)) for _ in range(50)]
+    start = time.perf_counter()
+    for query in queries:
+        memory.lookup(query)
+    mean_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"{len(memory)} entries, mean lookup {mean_ms:.3f} ms")
+    assert mean_ms < 5
+    assert all(memory.lookup(query) for query in queries[:100])
+
+if __name__ == "__main__":
+    test_punctuation_and_case_are_ignored()
+    test_extra_word_is_found_and_unrelated_text_is_not()
+    test_changed_number_is_carried_into_translation()
+    test_oldest_entries_are_dropped()
+    test_history_load_keeps_newest_translation()
+    test_entries_are_stored_compactly()
+    test_lookup_is_sub_millisecond()
+    print("All translation memory tests passed")
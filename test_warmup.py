@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for model warmup and the /ready endpoint
+"""
+
+import sys
+import os
+import requests
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.decoding import DecodingProfile, build_profile_schedulers
+from services.engines import _padded_length
+from services.warmup import ModelWarmup
+
+BASE_URL = "http://localhost:5000"
+
+class RecordingEngine:
+    """Counts words as tokens and records every generate call"""
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def count_tokens(self, text):
+        return len(text.split())
+
+    def translate_batch(self, texts, max_new_tokens=None, num_beams=None):
+        if self.fail:
+            raise RuntimeError("model not available")
+        self.calls.append((len(texts), self.count_tokens(texts[0]), max_new_tokens, num_beams))
+        return texts
+
+def make_schedulers(engine):
+    profiles = {
+        "fast": DecodingProfile("fast", num_beams=1, new_tokens_ratio=1.2, new_tokens_margin=4),
+        "quality": DecodingProfile("quality"),
+    }
+    return build_profile_schedulers(engine, profiles, [8, 16]).values()
+
+def test_every_bucket_and_batch_size_is_warmed():
+    """Short and long inputs per bucket, per profile, per batch size"""
+    engine = RecordingEngine()
+    warmup = ModelWarmup(make_schedulers(engine), engine, max_tokens=32, batch_sizes=(1, 4))
+    assert not warmup.ready
+
+    warmup.run()
+    print(f"Status: {warmup.status()}")
+    assert warmup.ready
+    # 2 profiles x 3 buckets x 2 lengths x 2 batch sizes
+    assert len(engine.calls) == 24
+    assert (4, 16, 23, 1) in engine.calls      # fast profile, long input of the 8-16 bucket
+    assert (1, 17, None, None) in engine.calls  # quality profile, open-ended bucket
+    assert all(tokens <= 32 for _, tokens, _, _ in engine.calls)
+
+def test_failed_warmup_is_not_ready():
+    """A model that cannot run never reports ready"""
+    engine = RecordingEngine(fail=True)
+    warmup = ModelWarmup(make_schedulers(engine), engine, max_tokens=32)
+    warmup.run()
+    print(f"Failures: {warmup.status()['failures'][:1]}")
+    assert not warmup.ready
+
+def test_disabled_warmup_is_ready_at_once():
+    engine = RecordingEngine()
+    warmup = ModelWarmup(make_schedulers(engine), engine, max_tokens=32, enabled=False)
+    warmup.run()
+    assert warmup.ready and engine.calls == []
+
+def test_xla_padded_lengths():
+    """XLA inputs are padded to power-of-two lengths within the model limit"""
+    assert [_padded_length(n, 512) for n in (1, 8, 9, 100, 500)] == [8, 8, 16, 128, 512]
+
+def test_ready_endpoint():
+    try:
+        response = requests.get(f"{BASE_URL}/ready")
+        print(f"/ready: {response.status_code} {response.json()}")
+    except requests.exceptions.ConnectionError:
+        print("❌ Could not connect to server. Make sure Flask app is running.")
+
+if __name__ == "__main__":
+    test_every_bucket_and_batch_size_is_warmed()
+    test_failed_warmup_is_not_ready()
+    test_disabled_warmup_is_ready_at_once()
+    test_xla_padded_lengths()
+    test_ready_endpoint()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Train the character n-gram Somali classifier used by
+SomaliLanguageDetector (LANGUAGE_DETECTION_PRIMARY=ngram).
+
+Reads one text per line from a Somali and a non-Somali corpus, reports
+accuracy on every `--holdout`-th line (trained without them), then trains
+on everything and writes the model (.npz).
+
+Usage:
+    python train_ngram_classifier.py
+    python train_ngram_classifier.py --somali data/somali_corpus.txt --other data/non_somali_corpus.txt --output data/somali_ngram.npz
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.ngram_classifier import DEFAULT_MODEL_PATH, DEFAULT_NUM_FEATURES, NgramClassifier
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def accuracy(classifier, somali, other):
+    scores = classifier.scores(somali + other)
+    correct = (scores[:len(somali)] > 0).sum() + (scores[len(somali):] <= 0).sum()
+    return correct / (len(somali) + len(other))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the Somali character n-gram classifier")
+    parser.add_argument("--somali", default=os.path.join("data", "somali_corpus.txt"))
+    parser.add_argument("--other", default=os.path.join("data", "non_somali_corpus.txt"))
+    parser.add_argument("--output", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--orders", default="1,2,3,4", help="Character n-gram orders")
+    parser.add_argument("--num-features", type=int, default=DEFAULT_NUM_FEATURES, help="Hashed feature buckets")
+    parser.add_argument("--alpha", type=float, default=0.5, help="Additive smoothing")
+    parser.add_argument("--holdout", type=int, default=5, help="Evaluate on every Nth line (0 = skip)")
+    args = parser.parse_args()
+
+    somali = read_lines(args.somali)
+    other = read_lines(args.other)
+    options = {
+        "orders": tuple(int(order) for order in args.orders.split(",") if order.strip()),
+        "num_features": args.num_features,
+        "alpha": args.alpha,
+    }
+
+    if args.holdout > 1:
+        def split(lines):
+            return ([line for i, line in enumerate(lines) if i % args.holdout],
+                    [line for i, line in enumerate(lines) if not i % args.holdout])
+        somali_train, somali_test = split(somali)
+        other_train, other_test = split(other)
+        held_out = NgramClassifier.train(somali_train, other_train, **options)
+        print(f"Held-out accuracy: {accuracy(held_out, somali_test, other_test):.1%} "
+              f"({len(somali_test)} Somali, {len(other_test)} other)")
+
+    classifier = NgramClassifier.train(somali, other, **options)
+    print(f"Training accuracy: {accuracy(classifier, somali, other):.1%} ({len(somali)} Somali, {len(other)} other)")
+    classifier.save(args.output)
+    print(f"Model written to {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")